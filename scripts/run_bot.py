@@ -1,47 +1,81 @@
 #!/usr/bin/env python3
 """运行做市机器人 (定时任务版)"""
 
+import asyncio
+import atexit
 import logging
+import logging.handlers
 import signal
 import sys
-import time
 from datetime import datetime
 from pathlib import Path
 
 # 添加 src 目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+try:
+    import uvloop
+except ImportError:  # uvloop 为可选依赖 (speedups)
+    uvloop = None
 
 from gmx_mm.config import Config
 from gmx_mm.data.fetcher import GMXDataFetcher
 from gmx_mm.strategy.engine import StrategyEngine
 from gmx_mm.execution.risk import RiskManager
+from gmx_mm.utils.fetch import CachedFetcher, FetchContext, fetch_pool_stats
 from gmx_mm.utils.notifications import TelegramNotifier
+from gmx_mm.utils.positions import PositionBatch
+
+# 日志格式
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_DIR = Path("logs")
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("logs/bot.log"),
-    ],
-)
 logger = logging.getLogger(__name__)
 
 # 全局实例
 config: Config = None
-fetcher: GMXDataFetcher = None
+fetcher: CachedFetcher = None
 engine: StrategyEngine = None
 risk_manager: RiskManager = None
 notifier: TelegramNotifier = None
+log_buffer: logging.handlers.MemoryHandler = None
+
+
+def setup_logging():
+    """配置日志 (控制台 + 缓冲写入的文件日志)"""
+    global log_buffer
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+    # delay=True: 首条记录落盘时才打开文件
+    file_handler = logging.FileHandler(LOG_DIR / "bot.log", delay=True)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    # 文件日志先写入内存缓冲，满 1024 条或遇到 ERROR 时批量落盘，避免每条记录一次同步写
+    log_buffer = logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+    )
+    atexit.register(log_buffer.flush)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.StreamHandler(),
+            log_buffer,
+        ],
+    )
 
 
 def init():
     """初始化"""
     global config, fetcher, engine, risk_manager, notifier
 
+    setup_logging()
     logger.info("初始化 GMX Market Maker Bot...")
 
     config = Config.load()
@@ -49,10 +83,11 @@ def init():
     # 验证配置
     errors = config.validate()
     if errors:
-        logger.error(f"配置错误: {errors}")
+        logger.error(f"配置错误: {'; '.join(errors)}")
         sys.exit(1)
 
-    fetcher = GMXDataFetcher(config)
+    # 多个任务共享同一个带 TTL 缓存的获取器，避免重复 RPC
+    fetcher = CachedFetcher(GMXDataFetcher(config))
     engine = StrategyEngine(config, fetcher)
     risk_manager = RiskManager(config)
     notifier = TelegramNotifier(config)
@@ -65,11 +100,6 @@ def run_strategy_job():
     logger.info("=== 运行策略检查 ===")
 
     try:
-        # 获取持仓
-        positions = []
-        if config.wallet.address:
-            positions = fetcher.get_positions(config.wallet.address)
-
         # 计算可用资金 (这里简化处理，实际需要查询钱包余额)
         available_capital = 0
 
@@ -97,19 +127,17 @@ def run_risk_check_job():
 
     try:
         # 获取数据
+        ctx = FetchContext(fetcher)
         positions = []
         if config.wallet.address:
-            positions = fetcher.get_positions(config.wallet.address)
+            positions = ctx.get_positions(config.wallet.address)
 
-        markets = {m.market_key: m for m in fetcher.get_markets()}
-        stats = {}
-        for market_key in markets:
-            s = fetcher.get_pool_stats(market_key)
-            if s:
-                stats[market_key] = s
+        markets = ctx.get_markets().by_key
+        stats = fetch_pool_stats(ctx, risk_manager.stats_keys(positions))
 
-        # 检查风险
-        alerts = risk_manager.check_all(positions, markets, stats)
+        # 检查风险 (收益率等派生字段每轮只计算一次)
+        batch = PositionBatch.from_positions(positions)
+        alerts = risk_manager.check_all(batch, markets, stats)
 
         if alerts:
             logger.warning(f"发现 {len(alerts)} 个风险告警")
@@ -124,7 +152,7 @@ def run_risk_check_job():
             logger.info("风险状态正常")
 
         # 检查是否需要紧急退出
-        if risk_manager.should_emergency_exit(positions):
+        if risk_manager.should_emergency_exit(batch):
             logger.critical("触发紧急退出!")
             notifier.send_alert(
                 "紧急退出触发",
@@ -141,17 +169,17 @@ def send_daily_report_job():
     logger.info("=== 发送日报 ===")
 
     try:
+        ctx = FetchContext(fetcher)
         positions = []
         if config.wallet.address:
-            positions = fetcher.get_positions(config.wallet.address)
+            positions = ctx.get_positions(config.wallet.address)
 
-        total_value = sum(p.value_usd for p in positions)
-        daily_pnl = sum(p.unrealized_pnl for p in positions)
+        batch = PositionBatch.from_positions(positions)
 
         notifier.send_daily_report(
-            total_value=total_value,
-            daily_pnl=daily_pnl,
-            positions_count=len(positions),
+            total_value=batch.total_value,
+            daily_pnl=batch.total_pnl,
+            positions_count=len(batch),
         )
 
         logger.info("日报已发送")
@@ -164,23 +192,37 @@ def main():
     """主函数"""
     init()
 
-    # 创建调度器
-    scheduler = BlockingScheduler()
+    # 调度器和所有任务共用一个事件循环；同步任务由调度器放入线程池执行，
+    # 不会阻塞事件循环，风险检查和策略检查可以同时进行
+    loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    # 任务超时错过的触发合并为一次，同一任务不并发运行，避免网络变慢时任务堆积
+    scheduler = AsyncIOScheduler(
+        event_loop=loop,
+        job_defaults={
+            "coalesce": True,
+            "max_instances": 1,
+            "misfire_grace_time": 30,
+        },
+    )
 
-    # 策略检查 - 每 5 分钟
+    # 策略检查 - 每 5 分钟 (启动时立即运行一次)
     scheduler.add_job(
         run_strategy_job,
         "interval",
         minutes=config.execution.check_interval // 60 or 5,
         id="strategy_check",
+        next_run_time=datetime.now(),
     )
 
-    # 风险检查 - 每 1 分钟
+    # 风险检查 - 每 1 分钟 (启动时立即运行一次)
     scheduler.add_job(
         run_risk_check_job,
         "interval",
         minutes=1,
         id="risk_check",
+        next_run_time=datetime.now(),
     )
 
     # 日报 - 每天 UTC 0:00
@@ -193,27 +235,25 @@ def main():
     )
 
     # 处理退出信号
-    def signal_handler(signum, frame):
+    def signal_handler():
         logger.info("收到退出信号，正在关闭...")
-        scheduler.shutdown()
-        sys.exit(0)
+        log_buffer.flush()
+        scheduler.shutdown(wait=False)
+        loop.stop()
 
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, signal_handler)
 
     logger.info("🚀 GMX Market Maker Bot 已启动")
     logger.info(f"策略: {config.strategy.type}")
     logger.info(f"检查间隔: {config.execution.check_interval}s")
 
-    # 立即运行一次
-    run_strategy_job()
-    run_risk_check_job()
-
     # 开始调度
+    scheduler.start()
     try:
-        scheduler.start()
-    except (KeyboardInterrupt, SystemExit):
-        pass
+        loop.run_forever()
+    finally:
+        loop.close()
 
 
 if __name__ == "__main__":
@@ -21,7 +21,9 @@ def main():
     print("🚀 启动 GMX Market Maker Web UI...")
     print("📡 访问地址: http://localhost:8000")
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # 安装 speedups 依赖时 uvicorn 自动使用 uvloop 事件循环和 httptools 解析器；
+    # 响应缓存和后台刷新任务在进程内，只用单个 worker
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto", http="auto")
 
 
 if __name__ == "__main__":
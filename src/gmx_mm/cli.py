@@ -2,21 +2,18 @@
 
 import logging
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
 import click
+import yaml
 from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
-from rich.text import Text
-from rich import box
+from rich.style import Style
 
 from .config import Config
-from .data.fetcher import GMXDataFetcher
-from .strategy.engine import StrategyEngine
-from .execution.executor import TradeExecutor
-from .execution.risk import RiskManager
+
+# Rich 组件和数据/策略/执行模块 (依赖 web3) 在命令内按需导入，
+# 使 --help、info 等轻量命令无需加载它们
 
 # 配置日志
 logging.basicConfig(
@@ -27,10 +24,30 @@ logger = logging.getLogger(__name__)
 
 console = Console()
 
-
-def print_banner():
-    """打印启动横幅"""
-    banner = """
+# 预构建的样式对象，渲染时无需再解析 markup 字符串
+STYLE_BOLD = Style(bold=True)
+STYLE_LABEL = Style(color="cyan", bold=True)
+STYLE_GAIN = Style(color="green")
+STYLE_LOSS = Style(color="red")
+STYLE_GAIN_BOLD = STYLE_GAIN + STYLE_BOLD
+STYLE_LOSS_BOLD = STYLE_LOSS + STYLE_BOLD
+
+ALERT_LEVEL_STYLES = {
+    "info": Style(color="blue"),
+    "warning": Style(color="yellow"),
+    "critical": Style(color="red"),
+}
+STYLE_DEFAULT_LEVEL = Style(color="white")
+
+RISK_LEVEL_COLORS = {
+    "正常": "green",
+    "中等": "yellow",
+    "较高": "orange1",
+    "危险": "red",
+}
+
+
+BANNER = """
 ╔═══════════════════════════════════════════════════════════════╗
 ║                                                               ║
 ║     ██████╗ ███╗   ███╗██╗  ██╗    ███╗   ███╗███╗   ███╗    ║
@@ -44,7 +61,23 @@ def print_banner():
 ║                                                               ║
 ╚═══════════════════════════════════════════════════════════════╝
     """
-    console.print(banner, style="bold cyan")
+
+
+def print_banner():
+    """打印启动横幅"""
+    console.print(BANNER, style="bold cyan")
+
+
+def _info_grid(rows: list[tuple], label_style: Style = STYLE_BOLD):
+    """构建 "标签: 值" 两列信息表"""
+    from rich.table import Table
+
+    grid = Table.grid(padding=(0, 1))
+    grid.add_column(style=label_style, no_wrap=True)
+    grid.add_column()
+    for label, value in rows:
+        grid.add_row(label, value)
+    return grid
 
 
 @click.group()
@@ -66,6 +99,9 @@ def cli(ctx, config, debug):
 @click.pass_context
 def info(ctx):
     """显示系统信息"""
+    from rich import box
+    from rich.table import Table
+
     print_banner()
 
     config = ctx.obj["config"]
@@ -91,6 +127,13 @@ def info(ctx):
 @click.pass_context
 def pools(ctx):
     """查看池子排名"""
+    from rich import box
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.table import Table
+
+    from .data.fetcher import GMXDataFetcher
+    from .utils.fetch import fetch_pool_stats
+
     config = ctx.obj["config"]
 
     with Progress(
@@ -102,7 +145,8 @@ def pools(ctx):
 
         try:
             fetcher = GMXDataFetcher(config)
-            markets = fetcher.get_markets()
+            markets = fetcher.get_markets()[:15]
+            pool_stats = fetch_pool_stats(fetcher, (m.market_key for m in markets))
         except Exception as e:
             console.print(f"[red]错误: {e}[/red]")
             return
@@ -122,8 +166,8 @@ def pools(ctx):
     table.add_column("Short", justify="right", style="red")
     table.add_column("OI Balance", justify="right")
 
-    for i, market in enumerate(markets[:15], 1):
-        stats = fetcher.get_pool_stats(market.market_key)
+    for i, market in enumerate(markets, 1):
+        stats = pool_stats.get(market.market_key)
 
         # 计算 OI 平衡指示器
         imbalance = market.oi_imbalance
@@ -153,6 +197,15 @@ def pools(ctx):
 @click.pass_context
 def positions(ctx):
     """查看当前持仓"""
+    from rich import box
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.table import Table
+    from rich.text import Text
+
+    from .data.fetcher import GMXDataFetcher
+    from .utils.positions import PositionBatch
+
     config = ctx.obj["config"]
 
     if not config.wallet.address:
@@ -184,30 +237,29 @@ def positions(ctx):
     table.add_column("价值 (USD)", justify="right", style="green")
     table.add_column("收益", justify="right")
 
-    total_value = 0
-    total_pnl = 0
-
     for pos in pos_list:
-        pnl_style = "green" if pos.unrealized_pnl >= 0 else "red"
-        pnl_text = f"+${pos.unrealized_pnl:.2f}" if pos.unrealized_pnl >= 0 else f"-${abs(pos.unrealized_pnl):.2f}"
+        if pos.unrealized_pnl >= 0:
+            pnl_text = Text(f"+${pos.unrealized_pnl:.2f}", style=STYLE_GAIN)
+        else:
+            pnl_text = Text(f"-${abs(pos.unrealized_pnl):.2f}", style=STYLE_LOSS)
 
         table.add_row(
             pos.name,
             f"{pos.gm_balance:.4f}",
             f"${pos.value_usd:,.2f}",
-            Text(pnl_text, style=pnl_style),
+            pnl_text,
         )
-        total_value += pos.value_usd
-        total_pnl += pos.unrealized_pnl
 
     # 汇总行
+    batch = PositionBatch.from_positions(pos_list)
+    total_value = batch.total_value
+    total_pnl = batch.total_pnl
     table.add_section()
-    pnl_style = "green" if total_pnl >= 0 else "red"
     table.add_row(
-        "[bold]总计[/bold]",
+        Text("总计", style=STYLE_BOLD),
         "",
-        f"[bold]${total_value:,.2f}[/bold]",
-        Text(f"{'+' if total_pnl >= 0 else ''}{total_pnl:.2f}", style=f"bold {pnl_style}"),
+        Text(f"${total_value:,.2f}", style=STYLE_BOLD),
+        Text(f"{total_pnl:+.2f}", style=STYLE_GAIN_BOLD if total_pnl >= 0 else STYLE_LOSS_BOLD),
     )
 
     console.print()
@@ -221,6 +273,15 @@ def positions(ctx):
 @click.pass_context
 def run(ctx, capital, execute):
     """运行策略"""
+    from rich import box
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.table import Table
+    from rich.text import Text
+
+    from .data.fetcher import GMXDataFetcher
+    from .strategy.engine import StrategyEngine
+
     config = ctx.obj["config"]
     dry_run = not execute
 
@@ -281,6 +342,15 @@ def run(ctx, capital, execute):
 @click.pass_context
 def alerts(ctx):
     """查看风险告警"""
+    from rich import box
+    from rich.panel import Panel
+    from rich.table import Table
+    from rich.text import Text
+
+    from .data.fetcher import GMXDataFetcher
+    from .execution.risk import RiskManager
+    from .utils.fetch import MarketsIndex, fetch_pool_stats
+
     config = ctx.obj["config"]
 
     try:
@@ -293,12 +363,8 @@ def alerts(ctx):
             positions = fetcher.get_positions(config.wallet.address)
 
         # 获取市场数据
-        markets = {m.market_key: m for m in fetcher.get_markets()}
-        stats = {}
-        for market_key in markets:
-            s = fetcher.get_pool_stats(market_key)
-            if s:
-                stats[market_key] = s
+        markets = MarketsIndex.from_markets(fetcher.get_markets()).by_key
+        stats = fetch_pool_stats(fetcher, risk_manager.stats_keys(positions))
 
         # 检查风险
         new_alerts = risk_manager.check_all(positions, markets, stats)
@@ -321,18 +387,15 @@ def alerts(ctx):
     table.add_column("时间")
 
     for alert in active_alerts:
-        level_style = {
-            "info": "blue",
-            "warning": "yellow",
-            "critical": "red",
-        }.get(alert.level, "white")
+        level_style = ALERT_LEVEL_STYLES.get(alert.level, STYLE_DEFAULT_LEVEL)
+        alert_time = datetime.fromtimestamp(alert.timestamp, tz=timezone.utc)
 
         table.add_row(
             Text(f"{alert.emoji} {alert.level.upper()}", style=level_style),
             alert.type,
             alert.market_name or "-",
             alert.message,
-            alert.timestamp.strftime("%H:%M:%S"),
+            alert_time.strftime("%H:%M:%S"),
         )
 
     console.print()
@@ -344,6 +407,13 @@ def alerts(ctx):
 @click.pass_context
 def status(ctx):
     """显示状态仪表盘"""
+    from rich.panel import Panel
+    from rich.text import Text
+
+    from .data.fetcher import GMXDataFetcher
+    from .execution.risk import RiskManager
+    from .strategy.engine import StrategyEngine
+
     config = ctx.obj["config"]
 
     print_banner()
@@ -366,50 +436,61 @@ def status(ctx):
         return
 
     # 策略状态
+    strategy_config = engine_status["config"]
     strategy_panel = Panel(
-        f"""
-[bold cyan]策略:[/bold cyan] {engine_status['strategy']}
-[bold cyan]检查间隔:[/bold cyan] {engine_status['config']['check_interval']}s
-[bold cyan]最低 APY:[/bold cyan] {engine_status['config']['min_apy']}%
-[bold cyan]最大仓位:[/bold cyan] ${engine_status['config']['max_position']}
-        """,
+        _info_grid(
+            [
+                ("策略:", str(engine_status["strategy"])),
+                ("检查间隔:", f"{strategy_config['check_interval']}s"),
+                ("最低 APY:", f"{strategy_config['min_apy']}%"),
+                ("最大仓位:", f"${strategy_config['max_position']}"),
+            ],
+            label_style=STYLE_LABEL,
+        ),
         title="⚙️ 策略配置",
         border_style="cyan",
+        padding=(1, 1),
     )
 
     # 持仓状态
     total_value = risk_summary["total_value_usd"]
     pnl = risk_summary["total_pnl_usd"]
     pnl_pct = risk_summary["overall_pnl_pct"]
-    pnl_color = "green" if pnl >= 0 else "red"
 
     position_panel = Panel(
-        f"""
-[bold]总资产:[/bold] ${total_value:,.2f}
-[bold]未实现收益:[/bold] [{pnl_color}]{'+' if pnl >= 0 else ''}{pnl:.2f} ({pnl_pct:+.1f}%)[/{pnl_color}]
-[bold]持仓数:[/bold] {len(positions)} 个池子
-[bold]最大集中度:[/bold] {risk_summary['max_concentration_pct']:.1f}%
-        """,
+        _info_grid(
+            [
+                ("总资产:", f"${total_value:,.2f}"),
+                (
+                    "未实现收益:",
+                    Text(
+                        f"{pnl:+.2f} ({pnl_pct:+.1f}%)",
+                        style=STYLE_GAIN if pnl >= 0 else STYLE_LOSS,
+                    ),
+                ),
+                ("持仓数:", f"{len(positions)} 个池子"),
+                ("最大集中度:", f"{risk_summary['max_concentration_pct']:.1f}%"),
+            ]
+        ),
         title="💰 持仓概览",
         border_style="green",
+        padding=(1, 1),
     )
 
     # 风险状态
     risk_level = risk_summary["risk_level"]
-    risk_color = {
-        "正常": "green",
-        "中等": "yellow",
-        "较高": "orange1",
-        "危险": "red",
-    }.get(risk_level, "white")
+    risk_color = RISK_LEVEL_COLORS.get(risk_level, "white")
 
     risk_panel = Panel(
-        f"""
-[bold]风险等级:[/bold] [{risk_color}]{risk_level}[/{risk_color}]
-[bold]活跃告警:[/bold] {risk_summary['active_alerts']} 个
-        """,
+        _info_grid(
+            [
+                ("风险等级:", Text(risk_level, style=risk_color)),
+                ("活跃告警:", f"{risk_summary['active_alerts']} 个"),
+            ]
+        ),
         title="🛡️ 风险状态",
         border_style=risk_color,
+        padding=(1, 1),
     )
 
     console.print()
@@ -423,6 +504,8 @@ def status(ctx):
 @click.pass_context
 def init(ctx):
     """初始化配置向导"""
+    from rich.panel import Panel
+
     console.print()
     console.print(Panel("🚀 GMX Market Maker 初始化向导", border_style="cyan"))
     console.print()
@@ -445,42 +528,41 @@ def init(ctx):
     min_apy = click.prompt("最低 APY 阈值 (%)", type=float, default=10.0)
 
     # 生成配置文件
-    config_content = f"""# GMX Market Maker 配置文件
-# 生成时间: {__import__('datetime').datetime.now().isoformat()}
-
-network:
-  chain: "arbitrum"
-  rpc_url: "https://arb1.arbitrum.io/rpc"
-
-strategy:
-  type: "{strategy_type}"
-  min_apy: {min_apy}
-  max_single_pool_pct: 30.0
-
-risk:
-  max_position_usd: {max_position}
-  max_drawdown_pct: 10.0
-  stop_loss_pct: 15.0
-
-pools:
-  whitelist:
-    - "ETH-USDC"
-    - "BTC-USDC"
-    - "ARB-USDC"
-  blacklist: []
-
-execution:
-  check_interval: 300
-  slippage_tolerance: 0.5
-
-notifications:
-  telegram:
-    enabled: false
-"""
+    config_data = {
+        "network": {
+            "chain": "arbitrum",
+            "rpc_url": "https://arb1.arbitrum.io/rpc",
+        },
+        "strategy": {
+            "type": strategy_type,
+            "min_apy": min_apy,
+            "max_single_pool_pct": 30.0,
+        },
+        "risk": {
+            "max_position_usd": max_position,
+            "max_drawdown_pct": 10.0,
+            "stop_loss_pct": 15.0,
+        },
+        "pools": {
+            "whitelist": ["ETH-USDC", "BTC-USDC", "ARB-USDC"],
+            "blacklist": [],
+        },
+        "execution": {
+            "check_interval": 300,
+            "slippage_tolerance": 0.5,
+        },
+        "notifications": {
+            "telegram": {
+                "enabled": False,
+            },
+        },
+    }
 
     config_path = config_dir / "config.yaml"
-    with open(config_path, "w") as f:
-        f.write(config_content)
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write("# GMX Market Maker 配置文件\n")
+        f.write(f"# 生成时间: {datetime.now().isoformat()}\n\n")
+        yaml.safe_dump(config_data, f, sort_keys=False, allow_unicode=True)
 
     console.print()
     console.print(f"[green]✅ 配置文件已生成: {config_path}[/green]")
@@ -1,18 +1,67 @@
 """配置管理模块"""
 
+import copy
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, is_dataclass
+from enum import Enum
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import yaml
 from dotenv import load_dotenv
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # 未编译 libyaml 时回退到纯 Python 解析器
+    from yaml import SafeLoader
+
+
+@cache
+def _load_dotenv() -> None:
+    """
+    加载 .env (每个进程一次)
+
+    load_dotenv 不覆盖已存在的环境变量，之后再调用只会重复查找和解析文件，
+    不会改变已加载的值。环境变量本身每次直接读取 os.environ，不缓存。
+    """
+    load_dotenv()
+
+
+@lru_cache(maxsize=4)
+def _parse_yaml(path: str, mtime_ns: int, size: int) -> Optional[dict]:
+    """解析 YAML 文件，按 (路径, 修改时间, 大小) 缓存，文件变化后自动失效"""
+    with open(path) as f:
+        data: Optional[dict] = yaml.load(f, Loader=SafeLoader)
+    return data
+
+
+def _load_yaml(path: Path) -> Optional[dict]:
+    """读取 YAML 配置，返回可自由修改的副本"""
+    st = path.stat()
+    return copy.deepcopy(_parse_yaml(str(path.resolve()), st.st_mtime_ns, st.st_size))
+
+
+def _apply_section(obj, data: dict) -> None:
+    """将字典中与 dataclass 字段同名的值写入配置对象，未知键忽略"""
+    valid = {f.name for f in fields(obj)}
+    for key, value in data.items():
+        if key not in valid or key in _ENV_ONLY_FIELDS:
+            continue
+
+        current = getattr(obj, key)
+        if is_dataclass(current) and isinstance(value, dict):
+            _apply_section(current, value)
+        else:
+            setattr(obj, key, value)
+
 
 @dataclass
 class NetworkConfig:
     chain: str = "arbitrum"
     rpc_url: str = "https://arb1.arbitrum.io/rpc"
+    rpc_pool_size: int = 32  # RPC 连接池大小
+    rpc_timeout: float = 30.0  # 单次 RPC 超时 (秒)
 
 
 @dataclass
@@ -55,6 +104,8 @@ class ExecutionConfig:
     check_interval: int = 300
     gas_price_max_gwei: int = 50
     slippage_tolerance: float = 0.5
+    fetch_workers: int = 16  # 并发获取池子统计的线程数
+    history_size: int = 10_000  # 保留的历史信号条数
 
 
 @dataclass
@@ -73,6 +124,27 @@ class NotificationsConfig:
     apy_change_threshold: float = 5.0
 
 
+class ConfigError(str, Enum):
+    """配置错误 (值为错误信息，可直接与字符串比较)"""
+
+    MISSING_PRIVATE_KEY = "PRIVATE_KEY 未设置"
+    INVALID_POOL_PCT = "max_single_pool_pct 必须在 0-100 之间"
+    NEGATIVE_MIN_APY = "min_apy 不能为负数"
+    INVALID_MAX_POSITION = "max_position_usd 必须大于 0"
+
+    __str__ = str.__str__
+
+
+# YAML 中可加载的配置段
+_SECTIONS = ("network", "wallet", "strategy", "risk", "pools", "execution", "notifications")
+
+# 配置段内的分组键，其内容视为所在配置段的字段
+_FLATTENED_KEYS = {"pools": "filters", "notifications": "alerts"}
+
+# 敏感字段只从环境变量加载
+_ENV_ONLY_FIELDS = {"private_key", "bot_token", "chat_id"}
+
+
 @dataclass
 class Config:
     """主配置类"""
@@ -89,7 +161,7 @@ class Config:
     def load(cls, config_path: Optional[str] = None) -> "Config":
         """加载配置"""
         # 加载环境变量
-        load_dotenv()
+        _load_dotenv()
 
         config = cls()
 
@@ -106,80 +178,52 @@ class Config:
             config_file = Path("config/config.yaml")
 
         if config_file.exists():
-            with open(config_file) as f:
-                yaml_config = yaml.safe_load(f)
-                config._load_from_dict(yaml_config)
+            config._load_from_dict(_load_yaml(config_file))
+
+        return config
 
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "Config":
+        """从字典创建配置 (结构同 YAML 文件，不读取环境变量和 .env)"""
+        config = cls()
+        config._load_from_dict(copy.deepcopy(data))
         return config
 
-    def _load_from_dict(self, data: dict) -> None:
-        """从字典加载配置"""
+    def _load_from_dict(self, data: Optional[dict]) -> None:
+        """从字典加载配置 (空文件或 None 时保持默认值)"""
         if not data:
             return
 
-        if "network" in data:
-            self.network.chain = data["network"].get("chain", self.network.chain)
-            self.network.rpc_url = data["network"].get("rpc_url", self.network.rpc_url)
-
-        if "wallet" in data:
-            self.wallet.address = data["wallet"].get("address", self.wallet.address)
-
-        if "strategy" in data:
-            s = data["strategy"]
-            self.strategy.type = s.get("type", self.strategy.type)
-            self.strategy.min_apy = s.get("min_apy", self.strategy.min_apy)
-            self.strategy.target_apy = s.get("target_apy", self.strategy.target_apy)
-            self.strategy.max_single_pool_pct = s.get(
-                "max_single_pool_pct", self.strategy.max_single_pool_pct
-            )
-            self.strategy.min_pools = s.get("min_pools", self.strategy.min_pools)
-            self.strategy.max_pools = s.get("max_pools", self.strategy.max_pools)
-            self.strategy.rebalance_threshold = s.get(
-                "rebalance_threshold", self.strategy.rebalance_threshold
-            )
-
-        if "risk" in data:
-            r = data["risk"]
-            self.risk.max_position_usd = r.get("max_position_usd", self.risk.max_position_usd)
-            self.risk.min_position_usd = r.get("min_position_usd", self.risk.min_position_usd)
-            self.risk.max_drawdown_pct = r.get("max_drawdown_pct", self.risk.max_drawdown_pct)
-            self.risk.stop_loss_pct = r.get("stop_loss_pct", self.risk.stop_loss_pct)
-            self.risk.max_oi_imbalance = r.get("max_oi_imbalance", self.risk.max_oi_imbalance)
-
-        if "pools" in data:
-            p = data["pools"]
-            self.pools.whitelist = p.get("whitelist", self.pools.whitelist)
-            self.pools.blacklist = p.get("blacklist", self.pools.blacklist)
-            if "filters" in p:
-                self.pools.min_tvl = p["filters"].get("min_tvl", self.pools.min_tvl)
-                self.pools.min_volume_24h = p["filters"].get(
-                    "min_volume_24h", self.pools.min_volume_24h
-                )
-
-        if "execution" in data:
-            e = data["execution"]
-            self.execution.check_interval = e.get("check_interval", self.execution.check_interval)
-            self.execution.gas_price_max_gwei = e.get(
-                "gas_price_max_gwei", self.execution.gas_price_max_gwei
-            )
-            self.execution.slippage_tolerance = e.get(
-                "slippage_tolerance", self.execution.slippage_tolerance
-            )
-
-    def validate(self) -> list[str]:
-        """验证配置，返回错误列表"""
-        errors = []
+        for name in _SECTIONS:
+            section = data.get(name)
+            if not section:
+                continue
+
+            # 分组键 (如 pools.filters) 的内容平铺到所在配置段
+            group = _FLATTENED_KEYS.get(name)
+            if group and section.get(group):
+                section = {**section, **section[group]}
+
+            _apply_section(getattr(self, name), section)
 
+    def iter_errors(self) -> Iterator[ConfigError]:
+        """逐条产出配置错误 (惰性求值，最常见的错误最先检查)"""
         if not self.wallet.private_key:
-            errors.append("PRIVATE_KEY 未设置")
+            yield ConfigError.MISSING_PRIVATE_KEY
+
+        if not (0 < self.strategy.max_single_pool_pct <= 100):
+            yield ConfigError.INVALID_POOL_PCT
 
         if self.strategy.min_apy < 0:
-            errors.append("min_apy 不能为负数")
+            yield ConfigError.NEGATIVE_MIN_APY
 
         if self.risk.max_position_usd <= 0:
-            errors.append("max_position_usd 必须大于 0")
+            yield ConfigError.INVALID_MAX_POSITION
 
-        if not (0 < self.strategy.max_single_pool_pct <= 100):
-            errors.append("max_single_pool_pct 必须在 0-100 之间")
+    def is_valid(self) -> bool:
+        """配置是否有效 (遇到第一个错误即返回)"""
+        return next(self.iter_errors(), None) is None
 
-        return errors
+    def validate(self) -> list[ConfigError]:
+        """验证配置，返回错误列表 (按检查顺序)"""
+        return list(self.iter_errors())
@@ -0,0 +1,57 @@
+"""风控数值内核
+
+安装 numba 时使用 JIT 编译的单循环实现 (一次遍历，无中间数组)，
+否则退回 NumPy 向量实现。两者结果一致。
+"""
+
+import numpy as np
+
+# 回撤检查结果: 未触发 / 回撤预警 / 触发止损
+DRAWDOWN_OK = 0
+DRAWDOWN_WARNING = 1
+DRAWDOWN_STOP_LOSS = 2
+
+
+def _drawdown_levels_numpy(pnl_pct, cost_basis, max_drawdown, stop_loss):
+    """
+    批量判断各持仓的回撤等级
+
+    Args:
+        pnl_pct: 收益率 (%)
+        cost_basis: 成本 (USD)，零成本持仓不检查
+        max_drawdown: 回撤预警线 (%)
+        stop_loss: 止损线 (%)
+
+    Returns:
+        回撤等级 (int8，DRAWDOWN_* 之一)
+    """
+    has_cost = cost_basis > 0
+    levels = np.zeros(pnl_pct.shape[0], dtype=np.int8)
+    levels[has_cost & (pnl_pct <= -max_drawdown)] = DRAWDOWN_WARNING
+    levels[has_cost & (pnl_pct <= -stop_loss)] = DRAWDOWN_STOP_LOSS
+    return levels
+
+
+try:
+    from numba import njit
+except ImportError:  # numba 为可选依赖
+    njit = None  # type: ignore[assignment]
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _drawdown_levels_jit(pnl_pct, cost_basis, max_drawdown, stop_loss):
+        n = pnl_pct.shape[0]
+        levels = np.zeros(n, dtype=np.int8)
+        for i in range(n):
+            if cost_basis[i] > 0:
+                if pnl_pct[i] <= -stop_loss:
+                    levels[i] = DRAWDOWN_STOP_LOSS
+                elif pnl_pct[i] <= -max_drawdown:
+                    levels[i] = DRAWDOWN_WARNING
+        return levels
+
+    # 与 _drawdown_levels_numpy 相同的计算
+    drawdown_levels_kernel = _drawdown_levels_jit
+else:
+    drawdown_levels_kernel = _drawdown_levels_numpy
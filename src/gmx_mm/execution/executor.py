@@ -1,22 +1,35 @@
 """交易执行器"""
 
+import asyncio
 import logging
 import time
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Enum
-from typing import Optional
+from functools import lru_cache
+from secrets import token_hex
+from typing import Awaitable, Callable, Optional, cast
 
+import aiohttp
+from eth_abi import encode as abi_encode
 from eth_account import Account
-from web3 import Web3
+from eth_typing import ChecksumAddress
+from eth_utils import function_abi_to_4byte_selector
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
 from web3.exceptions import ContractLogicError
 
 from ..config import Config
 from ..data.fetcher import ARBITRUM_CONTRACTS
+from ..utils.http import create_async_session, json_rpc_batch
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _cs(address: str) -> ChecksumAddress:
+    """地址转为 checksum 格式 (每次转换需计算 keccak256，按地址缓存)"""
+    return Web3.to_checksum_address(address)
+
+
 class OrderStatus(Enum):
     PENDING = "pending"
     SUBMITTED = "submitted"
@@ -25,7 +38,11 @@ class OrderStatus(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+# 尚未完结的订单状态
+PENDING_STATUSES = frozenset({OrderStatus.PENDING, OrderStatus.SUBMITTED})
+
+
+@dataclass(slots=True)
 class Order:
     """订单"""
 
@@ -39,86 +56,110 @@ class Order:
     tx_hash: Optional[str] = None
     gas_used: Optional[int] = None
     error: Optional[str] = None
-    created_at: datetime = None
-    executed_at: datetime = None
+    created_at: float = 0.0  # epoch 秒，展示时再转 datetime
+    executed_at: Optional[float] = None
 
     def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.utcnow()
-
-
-# GMX v2 合约 ABI (简化版)
-EXCHANGE_ROUTER_ABI = [
-    {
-        "inputs": [
-            {
-                "components": [
-                    {"name": "receiver", "type": "address"},
-                    {"name": "callbackContract", "type": "address"},
-                    {"name": "uiFeeReceiver", "type": "address"},
-                    {"name": "market", "type": "address"},
-                    {"name": "initialLongToken", "type": "address"},
-                    {"name": "initialShortToken", "type": "address"},
-                    {"name": "longTokenSwapPath", "type": "address[]"},
-                    {"name": "shortTokenSwapPath", "type": "address[]"},
-                    {"name": "minMarketTokens", "type": "uint256"},
-                    {"name": "shouldUnwrapNativeToken", "type": "bool"},
-                    {"name": "executionFee", "type": "uint256"},
-                    {"name": "callbackGasLimit", "type": "uint256"},
-                ],
-                "name": "params",
-                "type": "tuple",
-            }
-        ],
-        "name": "createDeposit",
-        "outputs": [{"name": "", "type": "bytes32"}],
-        "stateMutability": "payable",
-        "type": "function",
-    },
-    {
-        "inputs": [
-            {
-                "components": [
-                    {"name": "receiver", "type": "address"},
-                    {"name": "callbackContract", "type": "address"},
-                    {"name": "uiFeeReceiver", "type": "address"},
-                    {"name": "market", "type": "address"},
-                    {"name": "longTokenSwapPath", "type": "address[]"},
-                    {"name": "shortTokenSwapPath", "type": "address[]"},
-                    {"name": "minLongTokenAmount", "type": "uint256"},
-                    {"name": "minShortTokenAmount", "type": "uint256"},
-                    {"name": "shouldUnwrapNativeToken", "type": "bool"},
-                    {"name": "executionFee", "type": "uint256"},
-                    {"name": "callbackGasLimit", "type": "uint256"},
-                ],
-                "name": "params",
-                "type": "tuple",
-            },
-            {"name": "marketTokenAmount", "type": "uint256"},
-        ],
-        "name": "createWithdrawal",
-        "outputs": [{"name": "", "type": "bytes32"}],
-        "stateMutability": "payable",
-        "type": "function",
-    },
-    {
-        "inputs": [{"name": "token", "type": "address"}, {"name": "amount", "type": "uint256"}],
-        "name": "sendTokens",
-        "outputs": [],
-        "stateMutability": "payable",
-        "type": "function",
-    },
-    {
-        "inputs": [],
-        "name": "sendWnt",
-        "outputs": [],
-        "stateMutability": "payable",
-        "type": "function",
-    },
+        if not self.created_at:
+            self.created_at = time.time()
+
+
+# GMX v2 ExchangeRouter 函数 ABI (简化版)
+CREATE_DEPOSIT_ABI = {
+    "inputs": [
+        {
+            "components": [
+                {"name": "receiver", "type": "address"},
+                {"name": "callbackContract", "type": "address"},
+                {"name": "uiFeeReceiver", "type": "address"},
+                {"name": "market", "type": "address"},
+                {"name": "initialLongToken", "type": "address"},
+                {"name": "initialShortToken", "type": "address"},
+                {"name": "longTokenSwapPath", "type": "address[]"},
+                {"name": "shortTokenSwapPath", "type": "address[]"},
+                {"name": "minMarketTokens", "type": "uint256"},
+                {"name": "shouldUnwrapNativeToken", "type": "bool"},
+                {"name": "executionFee", "type": "uint256"},
+                {"name": "callbackGasLimit", "type": "uint256"},
+            ],
+            "name": "params",
+            "type": "tuple",
+        }
+    ],
+    "name": "createDeposit",
+    "outputs": [{"name": "", "type": "bytes32"}],
+    "stateMutability": "payable",
+    "type": "function",
+}
+
+CREATE_WITHDRAWAL_ABI = {
+    "inputs": [
+        {
+            "components": [
+                {"name": "receiver", "type": "address"},
+                {"name": "callbackContract", "type": "address"},
+                {"name": "uiFeeReceiver", "type": "address"},
+                {"name": "market", "type": "address"},
+                {"name": "longTokenSwapPath", "type": "address[]"},
+                {"name": "shortTokenSwapPath", "type": "address[]"},
+                {"name": "minLongTokenAmount", "type": "uint256"},
+                {"name": "minShortTokenAmount", "type": "uint256"},
+                {"name": "shouldUnwrapNativeToken", "type": "bool"},
+                {"name": "executionFee", "type": "uint256"},
+                {"name": "callbackGasLimit", "type": "uint256"},
+            ],
+            "name": "params",
+            "type": "tuple",
+        },
+        {"name": "marketTokenAmount", "type": "uint256"},
+    ],
+    "name": "createWithdrawal",
+    "outputs": [{"name": "", "type": "bytes32"}],
+    "stateMutability": "payable",
+    "type": "function",
+}
+
+SEND_TOKENS_ABI = {
+    "inputs": [
+        {"name": "token", "type": "address"},
+        {"name": "receiver", "type": "address"},
+        {"name": "amount", "type": "uint256"},
+    ],
+    "name": "sendTokens",
+    "outputs": [],
+    "stateMutability": "payable",
+    "type": "function",
+}
+
+SEND_WNT_ABI = {
+    "inputs": [
+        {"name": "receiver", "type": "address"},
+        {"name": "amount", "type": "uint256"},
+    ],
+    "name": "sendWnt",
+    "outputs": [],
+    "stateMutability": "payable",
+    "type": "function",
+}
+
+MULTICALL_ABI = {
+    "inputs": [{"name": "data", "type": "bytes[]"}],
+    "name": "multicall",
+    "outputs": [{"name": "results", "type": "bytes[]"}],
+    "stateMutability": "payable",
+    "type": "function",
+}
+
+EXCHANGE_ROUTER_ABI: list[dict] = [
+    CREATE_DEPOSIT_ABI,
+    CREATE_WITHDRAWAL_ABI,
+    SEND_TOKENS_ABI,
+    SEND_WNT_ABI,
+    MULTICALL_ABI,
 ]
 
-# ERC20 ABI
-ERC20_ABI = [
+# ERC20 ABI (只包含用到的函数)
+ERC20_ABI: list[dict] = [
     {
         "inputs": [
             {"name": "spender", "type": "address"},
@@ -139,13 +180,6 @@ ERC20_ABI = [
         "stateMutability": "view",
         "type": "function",
     },
-    {
-        "inputs": [{"name": "account", "type": "address"}],
-        "name": "balanceOf",
-        "outputs": [{"name": "", "type": "uint256"}],
-        "stateMutability": "view",
-        "type": "function",
-    },
     {
         "inputs": [],
         "name": "decimals",
@@ -155,16 +189,100 @@ ERC20_ABI = [
     },
 ]
 
+# GMX v2 Router: ExchangeRouter.sendTokens 通过它转账，代币需授权给它
+ROUTER = "0x7452c558d45f8afC8c83dAe62C3f8A5BE19c71f6"
+
+MAX_UINT256 = 2**256 - 1
+
+# 费用缓存有效期 (秒)，同一批订单共用一次 eth_feeHistory 查询
+FEE_CACHE_TTL = 2.0
+
+# 交易回执轮询间隔 (秒)，所有待确认交易每轮合并为一次批量查询
+RECEIPT_POLL_INTERVAL = 0.5
+
+
+def _abi_type(param: dict) -> str:
+    """ABI 参数的规范类型字符串 (tuple 展开为 "(...)")"""
+    abi_type: str = param["type"]
+    if abi_type.startswith("tuple"):
+        components = ",".join(_abi_type(c) for c in param["components"])
+        return f"({components}){abi_type[len('tuple'):]}"
+    return abi_type
+
+
+def _abi_value(param: dict, value):
+    """将 dict 形式的 tuple 参数按字段顺序转为元组"""
+    if param["type"] == "tuple" and isinstance(value, dict):
+        return tuple(_abi_value(c, value[c["name"]]) for c in param["components"])
+    return value
+
+
+@dataclass(frozen=True)
+class CallEncoder:
+    """
+    预解析的函数调用编码器
+
+    选择器和参数类型在模块加载时计算一次，编码时直接调用 eth_abi，
+    不再经过 web3 合约对象的 ABI 查找与参数规范化。
+    """
+
+    selector: bytes
+    inputs: tuple
+    types: tuple[str, ...]
+
+    @classmethod
+    def from_abi(cls, fn_abi: dict) -> "CallEncoder":
+        inputs = tuple(fn_abi["inputs"])
+        return cls(
+            selector=function_abi_to_4byte_selector(fn_abi),
+            inputs=inputs,
+            types=tuple(_abi_type(p) for p in inputs),
+        )
+
+    def encode(self, *args) -> bytes:
+        """编码调用数据"""
+        values = [_abi_value(p, v) for p, v in zip(self.inputs, args)]
+        return self.selector + abi_encode(self.types, values)
+
+
+ROUTER_ENCODERS = {fn["name"]: CallEncoder.from_abi(fn) for fn in EXCHANGE_ROUTER_ABI}
+ERC20_ENCODERS = {fn["name"]: CallEncoder.from_abi(fn) for fn in ERC20_ABI}
+
+
+@dataclass(frozen=True)
+class GasFees:
+    """EIP-1559 费用"""
+
+    base_fee: int  # 下一个区块的 base fee (wei)
+    priority_fee: int  # 小费 (wei)
+
+    @property
+    def max_fee(self) -> int:
+        """maxFeePerGas: 容忍 base fee 连续上涨"""
+        return 2 * self.base_fee + self.priority_fee
+
+    @property
+    def gas_price(self) -> int:
+        """当前有效 gas 价格"""
+        return self.base_fee + self.priority_fee
+
 
 class TradeExecutor:
-    """交易执行器"""
+    """
+    交易执行器 (异步)
+
+    所有 RPC 通过 AsyncWeb3 发出，多个订单可用 deposit_many 并发执行。
+    使用前需调用 connect()，结束时调用 close()，或使用 async with。
+    """
 
     def __init__(self, config: Config):
         self.config = config
-        self.w3 = Web3(Web3.HTTPProvider(config.network.rpc_url))
+        # 在 connect() 中创建，所有 RPC 复用同一个连接池
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.w3 = AsyncWeb3(AsyncHTTPProvider(config.network.rpc_url))
 
-        if not self.w3.is_connected():
-            raise ConnectionError(f"无法连接到 RPC: {config.network.rpc_url}")
+        # 构建、签名、广播交易期间持有，保证各笔交易按 nonce 顺序广播
+        self._submit_lock = asyncio.Lock()
 
         # 初始化账户
         if config.wallet.private_key:
@@ -174,18 +292,69 @@ class TradeExecutor:
             self.account = None
             logger.warning("未配置私钥，只能进行模拟交易")
 
-        # 初始化合约
-        self.exchange_router = self.w3.eth.contract(
-            address=Web3.to_checksum_address(ARBITRUM_CONTRACTS["ExchangeRouter"]),
-            abi=EXCHANGE_ROUTER_ABI,
-        )
-        self.deposit_vault = Web3.to_checksum_address(ARBITRUM_CONTRACTS["DepositVault"])
-        self.withdrawal_vault = Web3.to_checksum_address(ARBITRUM_CONTRACTS["WithdrawalVault"])
+        # 合约地址 (调用数据由 ROUTER_ENCODERS / ERC20_ENCODERS 直接编码，不构造合约对象)
+        self.exchange_router = _cs(ARBITRUM_CONTRACTS["ExchangeRouter"])
+        self._decimals_cache: dict[str, int] = {}
+        self._approved: set[tuple[str, str]] = set()  # 已无限额授权的 (代币, 授权对象)
+        # 已广播、等待确认的授权 (代币, 授权对象) -> 等待回执的任务
+        self._approvals: dict[tuple[str, str], asyncio.Task] = {}
+        self._fee_cache: Optional[tuple[float, GasFees]] = None  # (过期时间, 费用)
+        self._nonce: Optional[int] = None  # 本地维护的下一个 nonce，None 表示需要从节点同步
+        # 在 connect() 中查询，之后构建交易不再请求 eth_chainId
+        self._chain_id: Optional[int] = None
+        self._pending_receipts: dict[str, asyncio.Future] = {}  # 交易哈希 -> 回执
+        self._receipt_task: Optional[asyncio.Task] = None
+        self.router = _cs(ROUTER)
+        self.deposit_vault = _cs(ARBITRUM_CONTRACTS["DepositVault"])
+        self.withdrawal_vault = _cs(ARBITRUM_CONTRACTS["WithdrawalVault"])
 
         # 订单历史
         self.orders: list[Order] = []
 
-    def deposit(
+    async def connect(self) -> None:
+        """创建 HTTP 会话并检查 RPC 连接"""
+        if self.session is None:
+            session = self.session = create_async_session(
+                pool_size=self.config.network.rpc_pool_size,
+                timeout=self.config.network.rpc_timeout,
+            )
+            await cast(AsyncHTTPProvider, self.w3.provider).cache_async_session(session)
+
+        if not await self.w3.is_connected():
+            await self.close()
+            raise ConnectionError(f"无法连接到 RPC: {self.config.network.rpc_url}")
+
+        if self._chain_id is None:
+            self._chain_id = await self.w3.eth.chain_id
+
+    async def close(self) -> None:
+        """关闭 HTTP 会话 (释放连接池中的 keep-alive 连接)"""
+        if self._receipt_task is not None:
+            self._receipt_task.cancel()
+            self._receipt_task = None
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _rpc_batch(
+        self, calls: list[tuple[str, list]], return_exceptions: bool = False
+    ) -> list:
+        """发送 JSON-RPC 批量请求，尚未调用 connect() 时先建立连接"""
+        if self.session is None:
+            await self.connect()
+        assert self.session is not None
+        return await json_rpc_batch(
+            self.session, self.config.network.rpc_url, calls, return_exceptions
+        )
+
+    async def __aenter__(self) -> "TradeExecutor":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def deposit(
         self,
         market_key: str,
         market_name: str,
@@ -212,10 +381,8 @@ class TradeExecutor:
         Returns:
             Order: 订单对象
         """
-        import uuid
-
         order = Order(
-            id=str(uuid.uuid4())[:8],
+            id=token_hex(4),
             order_type="deposit",
             market_key=market_key,
             market_name=market_name,
@@ -235,62 +402,28 @@ class TradeExecutor:
             return order
 
         try:
-            # 1. 检查并授权代币
-            if long_amount > 0:
-                self._ensure_allowance(long_token, self.deposit_vault, long_amount)
-
-            if short_amount > 0:
-                self._ensure_allowance(short_token, self.deposit_vault, short_amount)
-
-            # 2. 构建交易参数
-            execution_fee = self._calculate_execution_fee()
-
-            params = {
-                "receiver": self.account.address,
-                "callbackContract": "0x0000000000000000000000000000000000000000",
-                "uiFeeReceiver": "0x0000000000000000000000000000000000000000",
-                "market": Web3.to_checksum_address(market_key),
-                "initialLongToken": Web3.to_checksum_address(long_token),
-                "initialShortToken": Web3.to_checksum_address(short_token),
-                "longTokenSwapPath": [],
-                "shortTokenSwapPath": [],
-                "minMarketTokens": 0,  # TODO: 计算最小接收量
-                "shouldUnwrapNativeToken": False,
-                "executionFee": execution_fee,
-                "callbackGasLimit": 0,
-            }
-
-            # 3. 发送代币到 Vault
-            # TODO: 实现 multicall 批量发送
-
-            # 4. 创建存款订单
-            tx = self.exchange_router.functions.createDeposit(params).build_transaction(
-                {
-                    "from": self.account.address,
-                    "value": execution_fee,
-                    "nonce": self.w3.eth.get_transaction_count(self.account.address),
-                    "gas": 500000,
-                    "maxFeePerGas": self.w3.eth.gas_price * 2,
-                    "maxPriorityFeePerGas": self.w3.to_wei(0.1, "gwei"),
-                }
+            amounts = ((long_token, long_amount), (short_token, short_amount))
+            tokens = [token for token, amount in amounts if amount > 0]
+            tx_hash = await self._submit_after_approval(
+                tokens,
+                self.router,
+                lambda: self._submit_deposit(
+                    market_key, long_token, short_token, long_amount, short_amount
+                ),
             )
 
-            # 5. 签名并发送
-            signed_tx = self.w3.eth.account.sign_transaction(tx, self.config.wallet.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-
             order.tx_hash = tx_hash.hex()
             order.status = OrderStatus.SUBMITTED
 
             logger.info(f"存款订单已提交: {order.tx_hash}")
 
-            # 6. 等待确认
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            # 等待确认 (不持锁，多个订单可同时等待)
+            receipt = await self._wait_for_receipt(tx_hash, timeout=120)
 
             if receipt["status"] == 1:
                 order.status = OrderStatus.EXECUTED
                 order.gas_used = receipt["gasUsed"]
-                order.executed_at = datetime.utcnow()
+                order.executed_at = time.time()
                 logger.info(f"存款订单已执行: {order.id}")
             else:
                 order.status = OrderStatus.FAILED
@@ -309,7 +442,63 @@ class TradeExecutor:
         self.orders.append(order)
         return order
 
-    def withdraw(
+    async def deposit_many(self, orders: list[dict]) -> list[Order]:
+        """
+        并发存入多个池子
+
+        Args:
+            orders: deposit() 的参数列表
+
+        Returns:
+            list[Order]: 订单列表，顺序与 orders 一致
+        """
+        return list(await asyncio.gather(*(self.deposit(**o) for o in orders)))
+
+    async def _submit_deposit(
+        self,
+        market_key: str,
+        long_token: str,
+        short_token: str,
+        long_amount: float,
+        short_amount: float,
+    ) -> bytes:
+        """广播存款交易，返回交易哈希 (调用方持有 _submit_lock，代币已授权)"""
+        # 1. 一次批量请求获取 nonce、gas 价格和代币精度
+        deposits = [
+            (token, amount)
+            for token, amount in ((long_token, long_amount), (short_token, short_amount))
+            if amount > 0
+        ]
+        fees, token_states = await self._preflight([token for token, _ in deposits], self.router)
+
+        # 2. 构建交易参数
+        execution_fee = self._calculate_execution_fee(fees)
+
+        params = {
+            "receiver": self.account.address,
+            "callbackContract": "0x0000000000000000000000000000000000000000",
+            "uiFeeReceiver": "0x0000000000000000000000000000000000000000",
+            "market": _cs(market_key),
+            "initialLongToken": _cs(long_token),
+            "initialShortToken": _cs(short_token),
+            "longTokenSwapPath": [],
+            "shortTokenSwapPath": [],
+            "minMarketTokens": 0,  # TODO: 计算最小接收量
+            "shouldUnwrapNativeToken": False,
+            "executionFee": execution_fee,
+            "callbackGasLimit": 0,
+        }
+
+        # 3. 执行费、代币转入 Vault 和创建存款订单合并为一笔 multicall 交易
+        calls = [self._encode("sendWnt", self.deposit_vault, execution_fee)]
+        for token, amount in deposits:
+            amount_wei = int(amount * 10 ** token_states[_cs(token)][0])
+            calls.append(self._encode("sendTokens", _cs(token), self.deposit_vault, amount_wei))
+        calls.append(self._encode("createDeposit", params))
+
+        return await self._send_multicall(calls, execution_fee, fees)
+
+    async def withdraw(
         self,
         market_key: str,
         market_name: str,
@@ -334,10 +523,8 @@ class TradeExecutor:
         Returns:
             Order: 订单对象
         """
-        import uuid
-
         order = Order(
-            id=str(uuid.uuid4())[:8],
+            id=token_hex(4),
             order_type="withdraw",
             market_key=market_key,
             market_name=market_name,
@@ -357,58 +544,23 @@ class TradeExecutor:
             return order
 
         try:
-            # 1. 授权 GM 代币
-            self._ensure_allowance(market_key, self.withdrawal_vault, gm_amount)
-
-            # 2. 构建参数
-            execution_fee = self._calculate_execution_fee()
-            gm_amount_wei = int(gm_amount * 10**18)
-
-            params = {
-                "receiver": self.account.address,
-                "callbackContract": "0x0000000000000000000000000000000000000000",
-                "uiFeeReceiver": "0x0000000000000000000000000000000000000000",
-                "market": Web3.to_checksum_address(market_key),
-                "longTokenSwapPath": [],
-                "shortTokenSwapPath": [],
-                "minLongTokenAmount": 0,
-                "minShortTokenAmount": 0,
-                "shouldUnwrapNativeToken": False,
-                "executionFee": execution_fee,
-                "callbackGasLimit": 0,
-            }
-
-            # 3. 发送 GM 代币到 Vault
-            # TODO: 实现 multicall
-
-            # 4. 创建提款订单
-            tx = self.exchange_router.functions.createWithdrawal(
-                params, gm_amount_wei
-            ).build_transaction(
-                {
-                    "from": self.account.address,
-                    "value": execution_fee,
-                    "nonce": self.w3.eth.get_transaction_count(self.account.address),
-                    "gas": 500000,
-                    "maxFeePerGas": self.w3.eth.gas_price * 2,
-                    "maxPriorityFeePerGas": self.w3.to_wei(0.1, "gwei"),
-                }
+            tx_hash = await self._submit_after_approval(
+                [market_key],
+                self.router,
+                lambda: self._submit_withdrawal(market_key, gm_amount),
             )
 
-            signed_tx = self.w3.eth.account.sign_transaction(tx, self.config.wallet.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-
             order.tx_hash = tx_hash.hex()
             order.status = OrderStatus.SUBMITTED
 
             logger.info(f"提款订单已提交: {order.tx_hash}")
 
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            receipt = await self._wait_for_receipt(tx_hash, timeout=120)
 
             if receipt["status"] == 1:
                 order.status = OrderStatus.EXECUTED
                 order.gas_used = receipt["gasUsed"]
-                order.executed_at = datetime.utcnow()
+                order.executed_at = time.time()
             else:
                 order.status = OrderStatus.FAILED
                 order.error = "交易执行失败"
@@ -421,47 +573,331 @@ class TradeExecutor:
         self.orders.append(order)
         return order
 
-    def _ensure_allowance(self, token: str, spender: str, amount: float) -> None:
-        """确保代币授权足够"""
-        token_contract = self.w3.eth.contract(
-            address=Web3.to_checksum_address(token),
-            abi=ERC20_ABI,
+    async def _submit_withdrawal(self, market_key: str, gm_amount: float) -> bytes:
+        """广播提款交易，返回交易哈希 (调用方持有 _submit_lock，GM 代币已授权)"""
+        # 1. 获取 nonce、gas 价格和 GM 代币精度
+        fees, token_states = await self._preflight([market_key], self.router)
+
+        # 2. 构建参数
+        execution_fee = self._calculate_execution_fee(fees)
+        gm_amount_wei = int(gm_amount * 10 ** token_states[_cs(market_key)][0])
+
+        params = {
+            "receiver": self.account.address,
+            "callbackContract": "0x0000000000000000000000000000000000000000",
+            "uiFeeReceiver": "0x0000000000000000000000000000000000000000",
+            "market": _cs(market_key),
+            "longTokenSwapPath": [],
+            "shortTokenSwapPath": [],
+            "minLongTokenAmount": 0,
+            "minShortTokenAmount": 0,
+            "shouldUnwrapNativeToken": False,
+            "executionFee": execution_fee,
+            "callbackGasLimit": 0,
+        }
+
+        # 3. 执行费、GM 代币转入 Vault 和创建提款订单合并为一笔 multicall 交易
+        calls = [
+            self._encode("sendWnt", self.withdrawal_vault, execution_fee),
+            self._encode("sendTokens", _cs(market_key), self.withdrawal_vault, gm_amount_wei),
+            self._encode("createWithdrawal", params, gm_amount_wei),
+        ]
+
+        return await self._send_multicall(calls, execution_fee, fees)
+
+    async def _submit_after_approval(
+        self, tokens: list[str], spender: str, submit: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """
+        确保代币已授权后广播交易，返回交易哈希
+
+        授权交易在持有 _submit_lock 时广播，等待其回执时释放锁，其他订单可以继续广播；
+        授权确认后重新持锁调用 submit，submit 重新预检，等待期间过期的费用在此刷新。
+
+        Args:
+            tokens: 需要授权的代币地址
+            spender: 授权对象地址
+            submit: 构建并广播主交易 (持锁调用)
+        """
+        async with self._submit_lock:
+            fees, token_states = await self._preflight(tokens, spender)
+            approvals = []
+            for token in dict.fromkeys(tokens):
+                approval = await self._ensure_allowance(token, spender, token_states, fees)
+                if approval is not None:
+                    approvals.append(approval)
+            if not approvals:
+                return await submit()
+
+        await asyncio.gather(*approvals)
+
+        async with self._submit_lock:
+            return await submit()
+
+    def _encode(self, fn_name: str, *args) -> bytes:
+        """编码 ExchangeRouter 调用数据"""
+        return ROUTER_ENCODERS[fn_name].encode(*args)
+
+    async def _send_multicall(self, calls: list[bytes], value: int, fees: GasFees) -> bytes:
+        """签名并广播 ExchangeRouter.multicall 交易，返回交易哈希"""
+        return await self._send_transaction(
+            self.exchange_router, self._encode("multicall", calls), fees, value=value, gas=500000
         )
 
-        decimals = token_contract.functions.decimals().call()
-        amount_wei = int(amount * 10**decimals)
-
-        current_allowance = token_contract.functions.allowance(
-            self.account.address,
-            Web3.to_checksum_address(spender),
-        ).call()
-
-        if current_allowance < amount_wei:
-            logger.info(f"授权 {token} 到 {spender}")
-
-            tx = token_contract.functions.approve(
-                Web3.to_checksum_address(spender),
-                amount_wei,
-            ).build_transaction(
-                {
-                    "from": self.account.address,
-                    "nonce": self.w3.eth.get_transaction_count(self.account.address),
-                    "gas": 100000,
-                    "maxFeePerGas": self.w3.eth.gas_price * 2,
-                    "maxPriorityFeePerGas": self.w3.to_wei(0.1, "gwei"),
-                }
-            )
+    def _next_nonce(self) -> int:
+        """
+        分配下一个 nonce
+
+        无 await，在事件循环中是原子操作；调用方持有 _submit_lock 保证广播顺序。
+        """
+        assert self._nonce is not None, "_sync_nonce() 未调用"
+        nonce = self._nonce
+        self._nonce = nonce + 1
+        return nonce
+
+    async def _sync_nonce(self) -> None:
+        """从节点同步 nonce (含待打包交易)"""
+        self._nonce = await self.w3.eth.get_transaction_count(self.account.address, "pending")
+
+    async def _send_transaction(
+        self, to: str, data: bytes, fees: GasFees, value: int = 0, gas: int = 100000
+    ) -> bytes:
+        """
+        分配 nonce，组装、签名并广播 EIP-1559 交易
+
+        交易字段全部在本地给出 (固定 gas 上限、缓存的 chain id 和费用)，
+        不经过 build_transaction，不触发 eth_estimateGas 等额外 RPC。
+        节点返回 nonce 错误时重新同步并重试一次；其他错误后下次交易前重新同步，
+        避免已分配但未广播的 nonce 留下空洞。
+        """
+        if self._nonce is None:
+            await self._sync_nonce()
+        if self._chain_id is None:
+            self._chain_id = await self.w3.eth.chain_id
+
+        for attempt in range(2):
+            tx = {
+                "to": to,
+                "data": data,
+                "value": value,
+                "gas": gas,
+                "maxFeePerGas": fees.max_fee,
+                "maxPriorityFeePerGas": fees.priority_fee,
+                "nonce": self._next_nonce(),
+                "chainId": self._chain_id,
+                "type": 2,
+            }
+            signed_tx = self.account.sign_transaction(tx)
+
+            try:
+                return await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception as e:
+                if attempt == 0 and "nonce" in str(e).lower():
+                    logger.warning(f"nonce 不同步，重新同步后重试: {e}")
+                    await self._sync_nonce()
+                    continue
+                self._nonce = None
+                raise
+
+        # 第二次尝试失败时已在循环内抛出
+        raise RuntimeError("交易广播重试次数已用尽")
+
+    async def _wait_for_receipt(self, tx_hash: bytes, timeout: float) -> dict:
+        """
+        等待交易回执
+
+        所有待确认交易共用一个轮询任务，每轮一次 eth_getTransactionReceipt 批量请求，
+        而不是每笔交易各自轮询。
+
+        Returns:
+            回执 (status、gasUsed 已转为 int)
+
+        Raises:
+            TimeoutError: 超时仍未上链
+        """
+        key = Web3.to_hex(tx_hash)
+        future = asyncio.get_running_loop().create_future()
+        self._pending_receipts[key] = future
+        if self._receipt_task is None or self._receipt_task.done():
+            self._receipt_task = asyncio.create_task(self._poll_receipts())
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"等待交易回执超时: {key}") from None
+        finally:
+            self._pending_receipts.pop(key, None)
+
+    async def _poll_receipts(self) -> None:
+        """批量查询待确认交易的回执，没有待确认交易时退出"""
+        while self._pending_receipts:
+            await asyncio.sleep(RECEIPT_POLL_INTERVAL)
+            hashes = [h for h, f in self._pending_receipts.items() if not f.done()]
+            if not hashes:
+                continue
+
+            try:
+                # 单笔查询出错只跳过该交易，不影响其他交易的回执
+                receipts = await self._rpc_batch(
+                    [("eth_getTransactionReceipt", [h]) for h in hashes], return_exceptions=True
+                )
+            except Exception as e:
+                logger.warning(f"查询交易回执失败: {e}")
+                continue
+
+            for tx_hash, receipt in zip(hashes, receipts):
+                if isinstance(receipt, Exception):
+                    logger.warning(f"查询交易回执失败 ({tx_hash}): {receipt}")
+                    continue
+                future = self._pending_receipts.get(tx_hash)
+                if receipt is None or future is None or future.done():
+                    continue  # 尚未打包或等待方已超时
+                future.set_result(
+                    {
+                        **receipt,
+                        "status": int(receipt["status"], 16),
+                        "gasUsed": int(receipt["gasUsed"], 16),
+                    }
+                )
+
+    async def _preflight(
+        self, tokens: list[str], spender: str
+    ) -> tuple[GasFees, dict[str, tuple[int, int]]]:
+        """
+        交易前查询 (一次 JSON-RPC 批量请求)
+
+        费用缓存未过期时不查询 eth_feeHistory；nonce 已在本地维护时不查询交易数。
+
+        Args:
+            tokens: 需要授权的代币地址
+            spender: 授权对象地址
+
+        Returns:
+            (费用, 代币地址 -> (精度, 当前授权额度))
+        """
+        owner = self.account.address
+        spender = _cs(spender)
+
+        fees = self._cached_fees()
+        need_nonce = self._nonce is None
+        calls = []
+        if need_nonce:
+            calls.append(("eth_getTransactionCount", [owner, "pending"]))
+        if fees is None:
+            calls.append(("eth_feeHistory", [1, "latest", [50]]))
+        pending = []  # (代币地址, 是否查询 decimals, 是否查询授权额度)
+        for token in dict.fromkeys(_cs(t) for t in tokens):
+            need_decimals = token not in self._decimals_cache
+            need_allowance = (token, spender) not in self._approved
+            if need_decimals:
+                data = ERC20_ENCODERS["decimals"].encode()
+                calls.append(("eth_call", [{"to": token, "data": "0x" + data.hex()}, "latest"]))
+            if need_allowance:
+                data = ERC20_ENCODERS["allowance"].encode(owner, spender)
+                calls.append(("eth_call", [{"to": token, "data": "0x" + data.hex()}, "latest"]))
+            pending.append((token, need_decimals, need_allowance))
+
+        results = iter(await self._rpc_batch(calls) if calls else [])
+        if need_nonce:
+            self._nonce = int(next(results), 16)
+        if fees is None:
+            fees = self._update_fees(next(results))
+
+        token_states: dict[str, tuple[int, int]] = {}
+        for token, need_decimals, need_allowance in pending:
+            if need_decimals:
+                self._decimals_cache[token] = int(next(results), 16)
+            allowance = int(next(results), 16) if need_allowance else MAX_UINT256
+            token_states[token] = (self._decimals_cache[token], allowance)
+
+        return fees, token_states
+
+    def _cached_fees(self) -> Optional[GasFees]:
+        """返回未过期的费用缓存"""
+        if self._fee_cache is not None and self._fee_cache[0] > time.monotonic():
+            return self._fee_cache[1]
+        return None
+
+    def _update_fees(self, fee_history: dict) -> GasFees:
+        """
+        由 eth_feeHistory 结果更新费用缓存
+
+        baseFeePerGas 最后一项为下一个区块的 base fee，reward 为最新区块小费的中位数。
+        """
+        reward = fee_history.get("reward") or [["0x0"]]
+        fees = GasFees(
+            base_fee=int(fee_history["baseFeePerGas"][-1], 16),
+            priority_fee=int(reward[-1][0], 16),
+        )
+        self._fee_cache = (time.monotonic() + FEE_CACHE_TTL, fees)
+        return fees
+
+    async def _ensure_allowance(
+        self,
+        token: str,
+        spender: str,
+        token_states: dict[str, tuple[int, int]],
+        fees: GasFees,
+    ) -> Optional[asyncio.Task]:
+        """
+        确保代币已无限额授权 (调用方持有 _submit_lock)
+
+        每个 (代币, 授权对象) 只需授权一次，之后的订单跳过授权额度查询。
+        额度不足时广播 approve 交易，不等待回执；同一授权已在途时复用等待任务，不重复授权。
+
+        Args:
+            token: 代币地址
+            spender: 授权对象地址
+            token_states: _preflight 返回的代币状态
+            fees: 交易费用
+
+        Returns:
+            等待授权确认的任务 (授权失败时抛出 RuntimeError)，无需授权时为 None
+        """
+        key = (_cs(token), _cs(spender))
+        if key in self._approved:
+            return None
+        approval = self._approvals.get(key)
+        if approval is not None:
+            return approval
+
+        _, current_allowance = token_states[key[0]]
+
+        # 无限额授权会随转账递减，剩余额度仍远超任何订单
+        if current_allowance >= MAX_UINT256 // 2:
+            self._approved.add(key)
+            return None
+
+        logger.info(f"授权 {key[0]} 到 {key[1]}")
+
+        tx_hash = await self._send_transaction(
+            key[0], ERC20_ENCODERS["approve"].encode(key[1], MAX_UINT256), fees, gas=100000
+        )
+        approval = self._approvals[key] = asyncio.create_task(self._confirm_approval(key, tx_hash))
+        return approval
+
+    async def _confirm_approval(self, key: tuple[str, str], tx_hash: bytes) -> None:
+        """
+        等待授权交易回执，成功后记录为已授权
+
+        Raises:
+            RuntimeError: 授权交易执行失败
+        """
+        try:
+            receipt = await self._wait_for_receipt(tx_hash, timeout=60)
+        finally:
+            self._approvals.pop(key, None)
 
-            signed_tx = self.w3.eth.account.sign_transaction(tx, self.config.wallet.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        if receipt["status"] != 1:
+            # 授权未生效，不记录为已授权，下次订单重新查询授权额度
+            raise RuntimeError(f"授权交易失败: {key[0]} -> {key[1]} ({Web3.to_hex(tx_hash)})")
+        self._approved.add(key)
 
-    def _calculate_execution_fee(self) -> int:
+    def _calculate_execution_fee(self, fees: GasFees) -> int:
         """计算执行费用"""
         # 估算 keeper 执行需要的 gas
         gas_limit = 1_000_000
-        gas_price = self.w3.eth.gas_price
-        return gas_limit * gas_price
+        return gas_limit * fees.gas_price
 
     def get_order_history(self) -> list[Order]:
         """获取订单历史"""
@@ -469,4 +905,4 @@ class TradeExecutor:
 
     def get_pending_orders(self) -> list[Order]:
         """获取待处理订单"""
-        return [o for o in self.orders if o.status in [OrderStatus.PENDING, OrderStatus.SUBMITTED]]
+        return [o for o in self.orders if o.status in PENDING_STATUSES]
@@ -1,17 +1,43 @@
 """风险管理模块"""
 
 import logging
+import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Union
+
+import numpy as np
 
 from ..config import Config
 from ..data.models import Market, PoolStats, Position
+from ..utils.positions import PositionBatch
+from ._kernels import DRAWDOWN_STOP_LOSS, drawdown_levels_kernel
 
 logger = logging.getLogger(__name__)
 
+# 每个市场保留的持仓价值历史数据点数
+POSITION_HISTORY_SIZE = 100
+
+# 最多保留的告警条数，超出后丢弃最早的告警
+MAX_ALERTS = 10_000
+
+# 告警级别对应的 emoji
+LEVEL_EMOJI = {
+    "info": "ℹ️",
+    "warning": "⚠️",
+    "critical": "🚨",
+}
+
 
-@dataclass
+def _as_batch(positions: Union[list[Position], PositionBatch]) -> PositionBatch:
+    """持仓列表转为列式视图 (已是 PositionBatch 时直接返回)"""
+    if isinstance(positions, PositionBatch):
+        return positions
+    return PositionBatch.from_positions(positions)
+
+
+@dataclass(slots=True)
 class RiskAlert:
     """风险告警"""
 
@@ -22,21 +48,82 @@ class RiskAlert:
     message: str
     value: float  # 触发值
     threshold: float  # 阈值
-    timestamp: datetime = None
+    timestamp: float = 0.0  # epoch 秒，展示时再转 datetime
     acknowledged: bool = False
 
     def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = datetime.utcnow()
+        if not self.timestamp:
+            self.timestamp = time.time()
 
     @property
     def emoji(self) -> str:
-        emojis = {
-            "info": "ℹ️",
-            "warning": "⚠️",
-            "critical": "🚨",
-        }
-        return emojis.get(self.level, "📢")
+        return LEVEL_EMOJI.get(self.level, "📢")
+
+
+class AlertLog:
+    """
+    定长告警记录
+
+    单独维护未确认告警及其按等级的计数，查询未确认告警和计算风险等级时
+    无需扫描全部告警。告警超过 maxlen 后丢弃最早的记录。确认告警需通过 acknowledge()。
+    """
+
+    def __init__(self, maxlen: int = MAX_ALERTS):
+        self._alerts: deque[RiskAlert] = deque(maxlen=maxlen)
+        self._active_counts: dict[str, int] = {}
+        self._active: dict[int, RiskAlert] = {}  # id(告警) -> 告警，保持添加顺序
+        self._active_list: Optional[list[RiskAlert]] = None  # active() 结果缓存，变更后置空
+
+    def _count(self, alert: RiskAlert, delta: int) -> None:
+        if not alert.acknowledged:
+            self._active_counts[alert.level] = self._active_counts.get(alert.level, 0) + delta
+            if delta > 0:
+                self._active[id(alert)] = alert
+            else:
+                self._active.pop(id(alert), None)
+            self._active_list = None
+
+    def append(self, alert: RiskAlert) -> None:
+        """添加告警"""
+        if len(self._alerts) == self._alerts.maxlen:
+            self._count(self._alerts[0], -1)
+        self._alerts.append(alert)
+        self._count(alert, 1)
+
+    def extend(self, alerts) -> None:
+        """批量添加告警"""
+        for alert in alerts:
+            self.append(alert)
+
+    def acknowledge(self, index: int) -> bool:
+        """确认告警"""
+        if not 0 <= index < len(self._alerts):
+            return False
+        alert = self._alerts[index]
+        self._count(alert, -1)
+        alert.acknowledged = True
+        return True
+
+    def active(self) -> list[RiskAlert]:
+        """未确认的告警 (按添加顺序，告警无变化时返回同一个列表，调用方不应修改)"""
+        if self._active_list is None:
+            self._active_list = list(self._active.values())
+        return self._active_list
+
+    def active_count(self, level: Optional[str] = None) -> int:
+        """未确认告警数 (可按等级)"""
+        if level is None:
+            return sum(self._active_counts.values())
+        return self._active_counts.get(level, 0)
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def __iter__(self):
+        return iter(self._alerts)
+
+    def __getitem__(self, index: int) -> RiskAlert:
+        return self._alerts[index]
 
 
 class RiskManager:
@@ -52,31 +139,47 @@ class RiskManager:
 
     def __init__(self, config: Config):
         self.config = config
-        self.alerts: list[RiskAlert] = []
-        self.position_history: dict[str, list[float]] = {}  # market_key -> [values]
+        self.alerts = AlertLog()
+        self.position_history: dict[str, deque[float]] = {}  # market_key -> 最近的持仓价值
         self.last_check: Optional[datetime] = None
 
+    @staticmethod
+    def stats_keys(positions: list[Position]) -> set[str]:
+        """
+        check_all 实际读取池子统计的市场
+
+        只有持仓所在的池子会被检查 APY，其余市场的统计无需获取。
+        """
+        return {pos.market_key for pos in positions}
+
     def check_all(
         self,
-        positions: list[Position],
+        positions: Union[list[Position], PositionBatch],
         markets: dict[str, Market],
         stats: dict[str, PoolStats],
     ) -> list[RiskAlert]:
         """
         执行全面风险检查
 
+        传入 PositionBatch 时，收益率等派生列只计算一次，可在同一轮的
+        should_emergency_exit / get_risk_summary 中复用。
+
         Args:
             positions: 当前持仓列表
             markets: 市场信息 (market_key -> Market)
-            stats: 池子统计 (market_key -> PoolStats)
+            stats: 池子统计 (market_key -> PoolStats)，只需包含 stats_keys 中的市场
 
         Returns:
             新产生的告警列表
         """
         new_alerts = []
 
+        # 数值字段只打包一次，各项检查共用
+        batch = _as_batch(positions)
+        positions = batch.positions
+
         # 1. 检查回撤
-        alerts = self._check_drawdown(positions)
+        alerts = self._check_drawdown(batch)
         new_alerts.extend(alerts)
 
         # 2. 检查多空失衡
@@ -88,7 +191,7 @@ class RiskManager:
         new_alerts.extend(alerts)
 
         # 4. 检查仓位集中度
-        alerts = self._check_concentration(positions)
+        alerts = self._check_concentration(batch)
         new_alerts.extend(alerts)
 
         # 记录检查时间
@@ -99,49 +202,57 @@ class RiskManager:
 
         # 记录持仓历史
         for pos in positions:
-            if pos.market_key not in self.position_history:
-                self.position_history[pos.market_key] = []
-            self.position_history[pos.market_key].append(pos.value_usd)
-            # 只保留最近 100 个数据点
-            if len(self.position_history[pos.market_key]) > 100:
-                self.position_history[pos.market_key] = self.position_history[pos.market_key][-100:]
+            # 定长环形缓冲，超出后自动丢弃最早的数据点
+            history = self.position_history.get(pos.market_key)
+            if history is None:
+                history = self.position_history[pos.market_key] = deque(
+                    maxlen=POSITION_HISTORY_SIZE
+                )
+            history.append(pos.value_usd)
 
         return new_alerts
 
-    def _check_drawdown(self, positions: list[Position]) -> list[RiskAlert]:
+    def _check_drawdown(self, positions: Union[list[Position], PositionBatch]) -> list[RiskAlert]:
         """检查回撤"""
         alerts = []
         max_drawdown = self.config.risk.max_drawdown_pct
         stop_loss = self.config.risk.stop_loss_pct
 
-        for pos in positions:
-            if pos.cost_basis > 0:
-                pnl_pct = pos.pnl_pct
-
-                if pnl_pct <= -stop_loss:
-                    alerts.append(
-                        RiskAlert(
-                            level="critical",
-                            type="stop_loss",
-                            market_key=pos.market_key,
-                            market_name=pos.name,
-                            message=f"触发止损! 亏损 {abs(pnl_pct):.1f}%",
-                            value=pnl_pct,
-                            threshold=-stop_loss,
-                        )
+        batch = _as_batch(positions)
+        pnl_pct = batch.pnl_pct
+        levels = drawdown_levels_kernel(
+            pnl_pct, batch.cost_basis, float(max_drawdown), float(stop_loss)
+        )
+
+        # 只对触发的持仓构建告警
+        for i in np.flatnonzero(levels):
+            pos = batch.positions[i]
+            value = float(pnl_pct[i])
+
+            if levels[i] == DRAWDOWN_STOP_LOSS:
+                alerts.append(
+                    RiskAlert(
+                        level="critical",
+                        type="stop_loss",
+                        market_key=pos.market_key,
+                        market_name=pos.name,
+                        message=f"触发止损! 亏损 {abs(value):.1f}%",
+                        value=value,
+                        threshold=-stop_loss,
                     )
-                elif pnl_pct <= -max_drawdown:
-                    alerts.append(
-                        RiskAlert(
-                            level="warning",
-                            type="drawdown",
-                            market_key=pos.market_key,
-                            market_name=pos.name,
-                            message=f"回撤预警: 亏损 {abs(pnl_pct):.1f}%",
-                            value=pnl_pct,
-                            threshold=-max_drawdown,
-                        )
+                )
+            else:
+                alerts.append(
+                    RiskAlert(
+                        level="warning",
+                        type="drawdown",
+                        market_key=pos.market_key,
+                        market_name=pos.name,
+                        message=f"回撤预警: 亏损 {abs(value):.1f}%",
+                        value=value,
+                        threshold=-max_drawdown,
                     )
+                )
 
         return alerts
 
@@ -152,26 +263,29 @@ class RiskManager:
         alerts = []
         max_imbalance = self.config.risk.max_oi_imbalance
 
-        for pos in positions:
-            if pos.market_key in markets:
-                market = markets[pos.market_key]
-                imbalance = market.oi_imbalance
-
-                if imbalance > max_imbalance:
-                    # 判断哪边更多
-                    side = "多头" if market.long_oi > market.short_oi else "空头"
-
-                    alerts.append(
-                        RiskAlert(
-                            level="warning",
-                            type="imbalance",
-                            market_key=pos.market_key,
-                            market_name=pos.name,
-                            message=f"{side}偏重: 失衡比 {imbalance:.2f}",
-                            value=imbalance,
-                            threshold=max_imbalance,
-                        )
-                    )
+        pairs = [(pos, markets[pos.market_key]) for pos in positions if pos.market_key in markets]
+        imbalances = np.fromiter(
+            (market.oi_imbalance for _, market in pairs), dtype=np.float64, count=len(pairs)
+        )
+
+        # 只对超过阈值的持仓构建告警
+        for i in np.flatnonzero(imbalances > max_imbalance):
+            pos, market = pairs[i]
+            imbalance = float(imbalances[i])
+            # 判断哪边更多
+            side = "多头" if market.long_oi > market.short_oi else "空头"
+
+            alerts.append(
+                RiskAlert(
+                    level="warning",
+                    type="imbalance",
+                    market_key=pos.market_key,
+                    market_name=pos.name,
+                    message=f"{side}偏重: 失衡比 {imbalance:.2f}",
+                    value=imbalance,
+                    threshold=max_imbalance,
+                )
+            )
 
         return alerts
 
@@ -180,112 +294,109 @@ class RiskManager:
     ) -> list[RiskAlert]:
         """检查 APY 大幅变化"""
         alerts = []
-        apy_threshold = self.config.notifications.apy_change_threshold
-
-        for pos in positions:
-            if pos.market_key in stats:
-                pool_stats = stats[pos.market_key]
-                current_apy = pool_stats.apy
-                min_apy = self.config.strategy.min_apy
-
-                # APY 低于最低阈值
-                if current_apy < min_apy:
-                    alerts.append(
-                        RiskAlert(
-                            level="info",
-                            type="apy_low",
-                            market_key=pos.market_key,
-                            market_name=pos.name,
-                            message=f"APY 低于阈值: {current_apy:.1f}% < {min_apy}%",
-                            value=current_apy,
-                            threshold=min_apy,
-                        )
-                    )
+        min_apy = self.config.strategy.min_apy
+
+        pairs = [(pos, stats[pos.market_key]) for pos in positions if pos.market_key in stats]
+        apys = np.fromiter((s.apy for _, s in pairs), dtype=np.float64, count=len(pairs))
+
+        # APY 低于最低阈值
+        for i in np.flatnonzero(apys < min_apy):
+            pos = pairs[i][0]
+            current_apy = float(apys[i])
+            alerts.append(
+                RiskAlert(
+                    level="info",
+                    type="apy_low",
+                    market_key=pos.market_key,
+                    market_name=pos.name,
+                    message=f"APY 低于阈值: {current_apy:.1f}% < {min_apy}%",
+                    value=current_apy,
+                    threshold=min_apy,
+                )
+            )
 
         return alerts
 
-    def _check_concentration(self, positions: list[Position]) -> list[RiskAlert]:
+    def _check_concentration(
+        self, positions: Union[list[Position], PositionBatch]
+    ) -> list[RiskAlert]:
         """检查仓位集中度"""
         alerts = []
         max_single_pct = self.config.strategy.max_single_pool_pct
 
-        total_value = sum(p.value_usd for p in positions)
-        if total_value == 0:
-            return alerts
-
-        for pos in positions:
-            pct = (pos.value_usd / total_value) * 100
-
-            if pct > max_single_pct * 1.2:  # 超出 20% 告警
-                alerts.append(
-                    RiskAlert(
-                        level="warning",
-                        type="concentration",
-                        market_key=pos.market_key,
-                        market_name=pos.name,
-                        message=f"仓位过于集中: {pct:.1f}% > {max_single_pct}%",
-                        value=pct,
-                        threshold=max_single_pct,
-                    )
+        batch = _as_batch(positions)
+        pct = batch.concentration_pct
+
+        for i in np.flatnonzero(pct > max_single_pct * 1.2):  # 超出 20% 告警
+            pos = batch.positions[i]
+            value = float(pct[i])
+            alerts.append(
+                RiskAlert(
+                    level="warning",
+                    type="concentration",
+                    market_key=pos.market_key,
+                    market_name=pos.name,
+                    message=f"仓位过于集中: {value:.1f}% > {max_single_pct}%",
+                    value=value,
+                    threshold=max_single_pct,
                 )
+            )
 
         return alerts
 
-    def should_emergency_exit(self, positions: list[Position]) -> bool:
+    def should_emergency_exit(self, positions: Union[list[Position], PositionBatch]) -> bool:
         """判断是否需要紧急退出"""
         # 检查是否有触发止损的持仓
         stop_loss = self.config.risk.stop_loss_pct
 
-        for pos in positions:
-            if pos.cost_basis > 0 and pos.pnl_pct <= -stop_loss:
-                logger.warning(f"紧急退出触发: {pos.name} 亏损 {abs(pos.pnl_pct):.1f}%")
-                return True
+        batch = _as_batch(positions)
+        triggered = np.flatnonzero((batch.cost_basis > 0) & (batch.pnl_pct <= -stop_loss))
+        if triggered.size == 0:
+            return False
 
-        return False
+        i = triggered[0]
+        logger.warning(f"紧急退出触发: {batch.positions[i].name} 亏损 {abs(batch.pnl_pct[i]):.1f}%")
+        return True
 
     def get_active_alerts(self) -> list[RiskAlert]:
         """获取未确认的告警"""
-        return [a for a in self.alerts if not a.acknowledged]
+        return self.alerts.active()
 
     def acknowledge_alert(self, index: int) -> bool:
         """确认告警"""
-        if 0 <= index < len(self.alerts):
-            self.alerts[index].acknowledged = True
-            return True
-        return False
+        return self.alerts.acknowledge(index)
 
-    def get_risk_summary(self, positions: list[Position]) -> dict:
+    def get_risk_summary(self, positions: Union[list[Position], PositionBatch]) -> dict:
         """获取风险摘要"""
-        total_value = sum(p.value_usd for p in positions)
-        total_pnl = sum(p.unrealized_pnl for p in positions)
+        batch = _as_batch(positions)
+        total_value = batch.total_value
+        total_pnl = batch.total_pnl
 
         # 计算整体回撤
         overall_pnl_pct = 0
         if total_value > 0:
-            total_cost = sum(p.cost_basis for p in positions if p.cost_basis > 0)
+            total_cost = batch.total_cost
             if total_cost > 0:
                 overall_pnl_pct = (total_pnl / total_cost) * 100
 
         # 最大单仓位占比
-        max_concentration = 0
+        max_concentration: float = 0
         if total_value > 0:
-            max_concentration = max((p.value_usd / total_value) * 100 for p in positions)
+            max_concentration = float(batch.concentration_pct.max())
 
         return {
             "total_value_usd": total_value,
             "total_pnl_usd": total_pnl,
             "overall_pnl_pct": overall_pnl_pct,
             "max_concentration_pct": max_concentration,
-            "active_alerts": len(self.get_active_alerts()),
-            "risk_level": self._calculate_risk_level(positions),
+            "active_alerts": self.alerts.active_count(),
+            "risk_level": self._calculate_risk_level(batch.positions),
         }
 
     def _calculate_risk_level(self, positions: list[Position]) -> str:
         """计算整体风险等级"""
-        active_alerts = self.get_active_alerts()
-
-        critical_count = len([a for a in active_alerts if a.level == "critical"])
-        warning_count = len([a for a in active_alerts if a.level == "warning"])
+        critical_count = self.alerts.active_count("critical")
+        warning_count = self.alerts.active_count("warning")
 
         if critical_count > 0:
             return "危险"
@@ -1,8 +1,15 @@
 """策略模块"""
 
-from .base import BaseStrategy
+from .base import BaseStrategy, Signal, SignalBatch
 from .balanced import BalancedStrategy
 from .high_yield import HighYieldStrategy
 from .engine import StrategyEngine
 
-__all__ = ["BaseStrategy", "BalancedStrategy", "HighYieldStrategy", "StrategyEngine"]
+__all__ = [
+    "BaseStrategy",
+    "Signal",
+    "SignalBatch",
+    "BalancedStrategy",
+    "HighYieldStrategy",
+    "StrategyEngine",
+]
@@ -0,0 +1,78 @@
+"""池子评分数值内核
+
+分项评分: 安装 numba 时使用 JIT 编译的单循环实现 (一次遍历)，否则退回 NumPy
+向量实现，两者结果一致。综合评分只在 score_pools_kernel 中按 分项评分 @ 权重 计算。
+"""
+
+import numpy as np
+
+
+def _score_components_numpy(apys, tvls, imbalances, risk_raws, apy_full, apy_cap, tvl_full):
+    """
+    批量计算池子分项评分
+
+    Args:
+        apys: APY (%)
+        tvls: 池子 TVL (USD)
+        imbalances: 多空 OI 失衡度 (0-1)
+        risk_raws: 原始风险分 (1-10)
+        apy_full: 达到该 APY 记 100 分
+        apy_cap: APY 评分上限
+        tvl_full: 达到该 TVL 流动性记满分
+
+    Returns:
+        (N, 4) 分项评分，列依次为 APY、风险、流动性、多空平衡
+    """
+    components = np.empty((apys.shape[0], 4))
+    components[:, 0] = np.minimum(apy_cap, apys / apy_full * 100)
+    components[:, 1] = (10 - risk_raws) * 10
+    components[:, 2] = np.minimum(100.0, tvls / tvl_full * 100)
+    components[:, 3] = (1 - imbalances) * 100
+    return components
+
+
+try:
+    from numba import njit
+except ImportError:  # numba 为可选依赖
+    njit = None  # type: ignore[assignment]
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _score_components_jit(apys, tvls, imbalances, risk_raws, apy_full, apy_cap, tvl_full):
+        n = apys.shape[0]
+        components = np.empty((n, 4))
+        for i in range(n):
+            a = apys[i] / apy_full * 100.0
+            if a > apy_cap:
+                a = apy_cap
+            liq = tvls[i] / tvl_full * 100.0
+            if liq > 100.0:
+                liq = 100.0
+            components[i, 0] = a
+            components[i, 1] = (10.0 - risk_raws[i]) * 10.0
+            components[i, 2] = liq
+            components[i, 3] = (1.0 - imbalances[i]) * 100.0
+        return components
+
+    # 与 _score_components_numpy 相同的计算
+    _score_components = _score_components_jit
+else:
+    _score_components = _score_components_numpy
+
+
+def score_pools_kernel(apys, tvls, imbalances, risk_raws, apy_full, apy_cap, tvl_full, weights):
+    """
+    批量计算池子评分
+
+    综合评分即 PoolScore.calculate_total_score 的加权和，按矩阵乘法一次算出。
+
+    Args:
+        apys, tvls, imbalances, risk_raws, apy_full, apy_cap, tvl_full: 见 _score_components_numpy
+        weights: [apy, risk, liquidity, balance] 权重
+
+    Returns:
+        (分项评分 (N, 4)，列顺序与 weights 一致, 综合评分)
+    """
+    components = _score_components(apys, tvls, imbalances, risk_raws, apy_full, apy_cap, tvl_full)
+    return components, components @ weights
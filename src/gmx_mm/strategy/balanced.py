@@ -1,5 +1,7 @@
 """平衡策略 - 综合考虑收益和风险"""
 
+import heapq
+
 from ..config import Config
 from ..data.models import Market, PoolStats, PoolScore, Position
 from .base import BaseStrategy, Signal
@@ -19,6 +21,11 @@ class BalancedStrategy(BaseStrategy):
     name = "balanced"
     description = "平衡策略 - 综合考虑收益和风险，分散投资"
 
+    # 评分参数: 30% APY 为满分，TVL $50M 为满分
+    apy_full_score = 30.0
+    apy_score_cap = 100.0
+    full_liquidity_tvl = 50_000_000
+
     def __init__(self, config: Config):
         super().__init__(config)
 
@@ -32,37 +39,7 @@ class BalancedStrategy(BaseStrategy):
 
     def score_pool(self, market: Market, stats: PoolStats) -> PoolScore:
         """给池子打分"""
-        score = PoolScore(
-            market_key=market.market_key,
-            name=market.name,
-            stats=stats,
-            market=market,
-        )
-
-        # 1. APY 评分 (0-100)
-        # 假设 30% APY 为满分
-        score.apy_score = min(100, (stats.apy / 30) * 100)
-
-        # 2. 风险评分 (转换为正向, 风险低=分数高)
-        # risk_score 1-10, 转换为 0-100
-        risk_raw = stats.calculate_risk_score(market)
-        score.risk_score = (10 - risk_raw) * 10
-
-        # 3. 流动性评分
-        # TVL $50M 为满分
-        if market.pool_tvl >= 50_000_000:
-            score.liquidity_score = 100
-        else:
-            score.liquidity_score = (market.pool_tvl / 50_000_000) * 100
-
-        # 4. 多空平衡评分
-        # imbalance 0 为满分
-        score.balance_score = (1 - market.oi_imbalance) * 100
-
-        # 计算综合评分
-        score.calculate_total_score(self.weights)
-
-        return score
+        return self.score_pools([market], {market.market_key: stats})[0]
 
     def generate_signals(
         self,
@@ -78,33 +55,29 @@ class BalancedStrategy(BaseStrategy):
         filtered_markets = self.filter_pools(markets)
 
         # 给所有池子打分
-        scores = []
-        for market in filtered_markets:
-            if market.market_key in stats:
-                pool_stats = stats[market.market_key]
-                score = self.score_pool(market, pool_stats)
-                scores.append(score)
+        scores = self.score_pools(filtered_markets, stats)
 
-        # 按综合评分排序
-        scores.sort(key=lambda x: x.total_score, reverse=True)
+        scores_by_key = {s.market_key: s for s in scores}
 
         # 当前持仓的市场
         position_markets = {p.market_key for p in positions}
-        total_position = sum(p.value_usd for p in positions)
+        pos_value_by_key, total_position = self.position_values(positions)
 
-        # 策略参数
+        # 策略参数 (循环外取一次)
         strategy = self.config.strategy
         risk = self.config.risk
         min_apy = strategy.min_apy
         max_pools = strategy.max_pools
         rebalance_threshold = strategy.rebalance_threshold
+        min_position = risk.min_position_usd
+        max_single = risk.max_position_usd * (strategy.max_single_pool_pct / 100)
 
-        # 1. 检查是否需要退出低评分池
+        # 1. 遍历一次持仓: 生成退出信号，同时收集再平衡所需的 (持仓, 评分) 和合计值
+        position_scores = []
+        total_current = 0.0
+        total_position_score = 0.0
         for position in positions:
-            score = next(
-                (s for s in scores if s.market_key == position.market_key),
-                None,
-            )
+            score = scores_by_key.get(position.market_key)
 
             if score is None:
                 # 池子不在候选列表，可能被加入黑名单
@@ -120,6 +93,10 @@ class BalancedStrategy(BaseStrategy):
                 )
                 continue
 
+            position_scores.append((position, score))
+            total_current += position.value_usd
+            total_position_score += score.total_score
+
             # APY 低于阈值
             if score.stats and score.stats.apy < min_apy:
                 signals.append(
@@ -135,8 +112,12 @@ class BalancedStrategy(BaseStrategy):
 
         # 2. 计算目标分配
         if available_capital > 0:
-            # 取前 N 个高分池
-            top_pools = [s for s in scores if s.stats and s.stats.apy >= min_apy][:max_pools]
+            # 取前 N 个高分池 (堆选择，无需对全部池子排序)
+            top_pools = heapq.nlargest(
+                max_pools,
+                (s for s in scores if s.stats and s.stats.apy >= min_apy),
+                key=lambda s: s.total_score,
+            )
 
             if top_pools:
                 # 按评分加权分配
@@ -148,14 +129,10 @@ class BalancedStrategy(BaseStrategy):
                     target_amount = available_capital * weight
 
                     # 限制单池仓位
-                    max_single = risk.max_position_usd * (strategy.max_single_pool_pct / 100)
-                    current_in_pool = next(
-                        (p.value_usd for p in positions if p.market_key == score.market_key),
-                        0,
-                    )
+                    current_in_pool = pos_value_by_key.get(score.market_key, 0)
                     target_amount = min(target_amount, max_single - current_in_pool)
 
-                    if target_amount >= risk.min_position_usd:
+                    if target_amount >= min_position:
                         signals.append(
                             Signal(
                                 action="deposit",
@@ -168,39 +145,26 @@ class BalancedStrategy(BaseStrategy):
                             )
                         )
 
-        # 3. 检查再平衡需求
-        if len(positions) >= 2 and not signals:
-            # 计算当前分配偏差
-            position_scores = []
-            for pos in positions:
-                score = next((s for s in scores if s.market_key == pos.market_key), None)
-                if score:
-                    position_scores.append((pos, score))
-
-            if position_scores:
-                # 计算目标分配
-                total_current = sum(p.value_usd for p, _ in position_scores)
-                total_score = sum(s.total_score for _, s in position_scores)
-
-                for pos, score in position_scores:
-                    target_pct = score.total_score / total_score
-                    current_pct = pos.value_usd / total_current
-                    deviation = abs(current_pct - target_pct) * 100
-
-                    if deviation > rebalance_threshold:
-                        if current_pct > target_pct:
-                            # 需要减仓
-                            reduce_amount = (current_pct - target_pct) * total_current
-                            signals.append(
-                                Signal(
-                                    action="withdraw",
-                                    market_key=pos.market_key,
-                                    market_name=pos.name,
-                                    amount_usd=reduce_amount,
-                                    reason=f"再平衡: 偏差 {deviation:.1f}%",
-                                    priority=4,
-                                )
-                            )
+        # 3. 检查再平衡需求 (无其他信号时)
+        if len(positions) >= 2 and not signals and position_scores:
+            for pos, score in position_scores:
+                target_pct = score.total_score / total_position_score
+                current_pct = pos.value_usd / total_current
+                deviation = abs(current_pct - target_pct) * 100
+
+                if deviation > rebalance_threshold and current_pct > target_pct:
+                    # 需要减仓
+                    reduce_amount = (current_pct - target_pct) * total_current
+                    signals.append(
+                        Signal(
+                            action="withdraw",
+                            market_key=pos.market_key,
+                            market_name=pos.name,
+                            amount_usd=reduce_amount,
+                            reason=f"再平衡: 偏差 {deviation:.1f}%",
+                            priority=4,
+                        )
+                    )
 
         # 按优先级排序
         signals.sort(key=lambda x: x.priority)
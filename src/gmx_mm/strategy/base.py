@@ -2,15 +2,18 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Optional
+
+import numpy as np
 
 from ..config import Config
 from ..data.models import Market, PoolStats, PoolScore, Position
+from ._kernels import score_pools_kernel
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Signal:
-    """交易信号"""
+    """交易信号 (不可变，需要修改时用 dataclasses.replace)"""
 
     action: str  # "deposit" / "withdraw" / "rebalance" / "hold"
     market_key: str
@@ -24,14 +27,48 @@ class Signal:
         return f"[{self.action.upper()}] {self.market_name}: ${self.amount_usd:.2f} ({self.reason})"
 
 
+class SignalBatch(list):
+    """
+    信号列表
+
+    创建时一次性统计存款总额，调用方 (测试、仪表盘) 直接读取，
+    不再各自遍历求和。创建后不应再增删信号。
+    """
+
+    __slots__ = ("total_deposit_usd",)
+
+    def __init__(self, signals: Iterable[Signal] = ()):
+        super().__init__(signals)
+        self.total_deposit_usd = sum(s.amount_usd for s in self if s.action == "deposit")
+
+
 class BaseStrategy(ABC):
     """策略基类"""
 
     name: str = "base"
     description: str = "基础策略"
 
+    # 评分参数 (子类按风格覆盖)
+    apy_full_score: float = 30.0  # 达到该 APY (%) 记 100 分
+    apy_score_cap: float = 100.0  # APY 评分上限
+    full_liquidity_tvl: float = 50_000_000  # 达到该 TVL 流动性记满分
+    # 评分权重 (apy/risk/liquidity/balance，子类在 __init__ 中覆盖)
+    weights: dict[str, float] = {"apy": 0.25, "risk": 0.25, "liquidity": 0.25, "balance": 0.25}
+
     def __init__(self, config: Config):
         self.config = config
+        # 白名单/黑名单在创建策略时转为集合
+        self._whitelist = frozenset(config.pools.whitelist or ())
+        self._blacklist = frozenset(config.pools.blacklist or ())
+        # 最近一次 filter_pools() 的结果 (市场列表, 过滤结果)
+        self._filter_cache: Optional[tuple[list[Market], list[Market]]] = None
+        # market_key -> (统计, 市场, 原始风险分)，统计和市场对象不变时复用
+        self._risk_cache: dict[str, tuple[PoolStats, Market, float]] = {}
+        # 最近一次 position_values() 的结果 (持仓列表, 各市场持仓价值, 总价值)
+        self._position_cache: Optional[tuple[list[Position], dict[str, float], float]] = None
+        # 最近一次 cached_signals() 的输入指纹和信号
+        self._last_fingerprint: Optional[tuple] = None
+        self._last_signals: list[Signal] = []
 
     @abstractmethod
     def score_pool(self, market: Market, stats: PoolStats) -> PoolScore:
@@ -69,29 +106,175 @@ class BaseStrategy(ABC):
         """
         pass
 
+    def cached_signals(
+        self,
+        markets: list[Market],
+        stats: dict[str, PoolStats],
+        positions: list[Position],
+        available_capital: float,
+    ) -> list[Signal]:
+        """
+        生成交易信号，输入与上一次相同时直接返回上一次的信号
+
+        指纹由可用资金、各池子 (APY, TVL, 多空失衡度, 原始风险分) 和各持仓价值组成，
+        链上状态没有变化时跳过整个打分和信号生成流程。参数同 generate_signals。
+        """
+        fingerprint = (
+            available_capital,
+            tuple(
+                (
+                    m.market_key,
+                    round(stats[m.market_key].apy, 4),
+                    m.pool_tvl,
+                    round(m.oi_imbalance, 4),
+                    self._risk_score(m, stats[m.market_key]),
+                )
+                for m in markets
+                if m.market_key in stats
+            ),
+            tuple((p.market_key, p.value_usd) for p in positions),
+        )
+        if fingerprint == self._last_fingerprint:
+            return list(self._last_signals)
+
+        signals = self.generate_signals(markets, stats, positions, available_capital)
+        self._last_fingerprint = fingerprint
+        self._last_signals = signals
+        return list(signals)
+
+    def score_pools(self, markets: list[Market], stats: dict[str, PoolStats]) -> list[PoolScore]:
+        """
+        批量给池子打分
+
+        分项评分和综合评分由 score_pools_kernel 按列一次算出 (分项评分在安装 numba 时
+        JIT 编译)，再生成 PoolScore。
+        没有统计数据的市场跳过。
+
+        Args:
+            markets: 市场列表
+            stats: 池子统计 (market_key -> stats)
+
+        Returns:
+            list[PoolScore]: 评分结果，顺序与 markets 一致
+        """
+        pairs = [(m, stats[m.market_key]) for m in markets if m.market_key in stats]
+        if not pairs:
+            return []
+
+        count = len(pairs)
+        apys = np.fromiter((s.apy for _, s in pairs), dtype=np.float64, count=count)
+        tvls = np.fromiter((m.pool_tvl for m, _ in pairs), dtype=np.float64, count=count)
+        imbalances = np.fromiter((m.oi_imbalance for m, _ in pairs), dtype=np.float64, count=count)
+        risk_raws = np.fromiter(
+            (self._risk_score(m, s) for m, s in pairs), dtype=np.float64, count=count
+        )
+
+        w = self.weights
+        weights = np.array([w["apy"], w["risk"], w["liquidity"], w["balance"]], dtype=np.float64)
+        components, total = score_pools_kernel(
+            apys,
+            tvls,
+            imbalances,
+            risk_raws,
+            float(self.apy_full_score),
+            float(self.apy_score_cap),
+            float(self.full_liquidity_tvl),
+            weights,
+        )
+
+        return [
+            PoolScore(
+                market_key=market.market_key,
+                name=market.name,
+                stats=pool_stats,
+                market=market,
+                apy_score=a,
+                risk_score=r,
+                liquidity_score=liq,
+                balance_score=b,
+                total_score=t,
+            )
+            for (market, pool_stats), (a, r, liq, b), t in zip(
+                pairs, components.tolist(), total.tolist()
+            )
+        ]
+
+    def _risk_score(self, market: Market, stats: PoolStats) -> float:
+        """
+        原始风险分 (按市场缓存)
+
+        同一轮数据 (同一个 market/stats 对象) 在 run 和 get_pool_rankings 之间
+        重复打分时只计算一次；新一轮数据是新对象，不会命中缓存。
+        """
+        cached = self._risk_cache.get(market.market_key)
+        if cached is not None and cached[0] is stats and cached[1] is market:
+            return cached[2]
+        risk_raw: float = stats.calculate_risk_score(market)
+        self._risk_cache[market.market_key] = (stats, market, risk_raw)
+        return risk_raw
+
     def filter_pools(self, markets: list[Market]) -> list[Market]:
-        """过滤池子 (白名单/黑名单)"""
-        pools_config = self.config.pools
+        """
+        过滤池子 (白名单/黑名单)
+
+        同一个市场列表连续调用时直接返回上次结果 (调用方不应修改返回的列表)。
+        """
+        cached = self._filter_cache
+        if cached is not None and cached[0] is markets:
+            return cached[1]
+
+        whitelist = self._whitelist
+        blacklist = self._blacklist
 
         filtered = []
         for market in markets:
             # 检查白名单
-            if pools_config.whitelist:
-                if market.name not in pools_config.whitelist:
-                    continue
+            if whitelist and market.name not in whitelist:
+                continue
 
             # 检查黑名单
-            if market.name in pools_config.blacklist:
+            if market.name in blacklist:
                 continue
 
             filtered.append(market)
 
+        self._filter_cache = (markets, filtered)
         return filtered
 
-    def check_risk_limits(self, signal: Signal, positions: list[Position]) -> Optional[str]:
+    def position_values(self, positions: list[Position]) -> tuple[dict[str, float], float]:
+        """
+        按市场索引持仓价值
+
+        同一个持仓列表连续调用时直接返回上次结果，引擎逐个信号做风控检查时
+        不必每次重新扫描持仓。
+
+        Returns:
+            (market_key -> 持仓价值, 总持仓价值)
+        """
+        cached = self._position_cache
+        if cached is None or cached[0] is not positions:
+            values = {p.market_key: p.value_usd for p in positions}
+            cached = (positions, values, sum(p.value_usd for p in positions))
+            self._position_cache = cached
+        return cached[1], cached[2]
+
+    def check_risk_limits(
+        self,
+        signal: Signal,
+        positions: list[Position],
+        *,
+        total_position: Optional[float] = None,
+        pos_value_by_key: Optional[dict[str, float]] = None,
+    ) -> Optional[str]:
         """
         检查风控限制
 
+        Args:
+            signal: 待检查信号
+            positions: 当前持仓
+            total_position: 总持仓价值 (逐个信号检查时由调用方预先计算)
+            pos_value_by_key: market_key -> 持仓价值 (同上)
+
         Returns:
             None 如果通过，否则返回拒绝原因
         """
@@ -99,7 +282,8 @@ class BaseStrategy(ABC):
         strategy = self.config.strategy
 
         # 计算当前总仓位
-        total_position = sum(p.value_usd for p in positions)
+        if total_position is None or pos_value_by_key is None:
+            pos_value_by_key, total_position = self.position_values(positions)
 
         if signal.action == "deposit":
             # 检查总仓位限制
@@ -107,10 +291,7 @@ class BaseStrategy(ABC):
                 return f"超出总仓位限制 (${risk.max_position_usd})"
 
             # 检查单池仓位限制
-            current_in_pool = next(
-                (p.value_usd for p in positions if p.market_key == signal.market_key),
-                0,
-            )
+            current_in_pool = pos_value_by_key.get(signal.market_key, 0)
             max_single = risk.max_position_usd * (strategy.max_single_pool_pct / 100)
             if current_in_pool + signal.amount_usd > max_single:
                 return f"超出单池限制 (${max_single:.0f})"
@@ -1,18 +1,27 @@
 """策略执行引擎"""
 
 import logging
-from datetime import datetime
+import time
+from collections import deque
+from datetime import datetime, timezone
 from typing import Optional
 
 from ..config import Config
 from ..data.fetcher import GMXDataFetcher
-from ..data.models import Position
-from .base import BaseStrategy, Signal
+from ..data.models import Market, PoolStats, Position
+from ..utils.fetch import CachedFetcher, fetch_pool_stats
+from .base import BaseStrategy, Signal, SignalBatch
 from .balanced import BalancedStrategy
 from .high_yield import HighYieldStrategy
 
 logger = logging.getLogger(__name__)
 
+# 策略类型 -> 策略类 (新增策略在此注册)
+STRATEGIES: dict[str, type[BaseStrategy]] = {
+    "balanced": BalancedStrategy,
+    "high_yield": HighYieldStrategy,
+}
+
 
 class StrategyEngine:
     """
@@ -27,10 +36,15 @@ class StrategyEngine:
 
     def __init__(self, config: Config, fetcher: GMXDataFetcher):
         self.config = config
+        # run() 和 get_pool_rankings() 在半个检查周期内共用市场和统计数据
+        if not isinstance(fetcher, CachedFetcher):
+            ttl = config.execution.check_interval / 2
+            fetcher = CachedFetcher(fetcher, markets_ttl=ttl, stats_ttl=ttl)
         self.fetcher = fetcher
         self.strategy: Optional[BaseStrategy] = None
-        self.last_run: Optional[datetime] = None
-        self.signals_history: list[Signal] = []
+        self.last_run: Optional[float] = None  # epoch 秒，get_status 时再转 ISO 格式
+        # 最近的信号记录，超过 history_size 后丢弃最早的信号
+        self.signals_history: deque[Signal] = deque(maxlen=config.execution.history_size)
 
         # 加载策略
         self._load_strategy()
@@ -39,18 +53,14 @@ class StrategyEngine:
         """加载策略"""
         strategy_type = self.config.strategy.type
 
-        strategies = {
-            "balanced": BalancedStrategy,
-            "high_yield": HighYieldStrategy,
-        }
-
-        if strategy_type not in strategies:
+        strategy_cls = STRATEGIES.get(strategy_type)
+        if strategy_cls is None:
             raise ValueError(f"未知策略类型: {strategy_type}")
 
-        self.strategy = strategies[strategy_type](self.config)
+        self.strategy = strategy_cls(self.config)
         logger.info(f"已加载策略: {self.strategy.name} - {self.strategy.description}")
 
-    def run(self, available_capital: float = 0.0, dry_run: bool = True) -> list[Signal]:
+    def run(self, available_capital: float = 0.0, dry_run: bool = True) -> SignalBatch:
         """
         运行策略
 
@@ -59,7 +69,7 @@ class StrategyEngine:
             dry_run: 是否模拟运行 (不执行交易)
 
         Returns:
-            生成的信号列表
+            风控通过的信号列表 (附带存款总额)
         """
         logger.info(f"开始运行策略 (dry_run={dry_run}, 可用资金=${available_capital:.2f})")
 
@@ -67,12 +77,8 @@ class StrategyEngine:
         markets = self.fetcher.get_markets()
         logger.info(f"获取到 {len(markets)} 个市场")
 
-        # 2. 获取池子统计
-        stats = {}
-        for market in markets:
-            pool_stats = self.fetcher.get_pool_stats(market.market_key)
-            if pool_stats:
-                stats[market.market_key] = pool_stats
+        # 2. 获取池子统计 (并发请求)
+        stats = self._fetch_stats(markets)
 
         logger.info(f"获取到 {len(stats)} 个池子的统计数据")
 
@@ -85,25 +91,40 @@ class StrategyEngine:
                 logger.info(f"  - {pos.name}: {pos.gm_balance:.4f} GM (${pos.value_usd:.2f})")
 
         # 4. 生成信号
-        signals = self.strategy.generate_signals(markets, stats, positions, available_capital)
+        signals = self.strategy.cached_signals(markets, stats, positions, available_capital)
         logger.info(f"生成 {len(signals)} 个信号")
 
-        # 5. 风控过滤
-        filtered_signals = []
-        for signal in signals:
-            rejection = self.strategy.check_risk_limits(signal, positions)
-            if rejection:
+        # 5. 风控过滤 (持仓索引只计算一次)
+        pos_value_by_key, total_position = self.strategy.position_values(positions)
+        checked = [
+            (
+                signal,
+                self.strategy.check_risk_limits(
+                    signal,
+                    positions,
+                    total_position=total_position,
+                    pos_value_by_key=pos_value_by_key,
+                ),
+            )
+            for signal in signals
+        ]
+        filtered_signals = SignalBatch(signal for signal, rejection in checked if rejection is None)
+
+        for signal, rejection in checked:
+            if rejection is not None:
                 logger.warning(f"信号被拒绝: {signal} - {rejection}")
-            else:
-                filtered_signals.append(signal)
-                logger.info(f"信号通过: {signal}")
+        logger.info(f"风控通过 {len(filtered_signals)}/{len(signals)} 个信号")
+        if logger.isEnabledFor(logging.DEBUG):
+            for signal in filtered_signals:
+                logger.debug(f"信号通过: {signal}")
 
         # 6. 执行 (如果不是模拟)
         if not dry_run and filtered_signals:
             self._execute_signals(filtered_signals)
+            self.refresh()  # 链上状态已变化
 
         # 记录
-        self.last_run = datetime.utcnow()
+        self.last_run = time.time()
         self.signals_history.extend(filtered_signals)
 
         return filtered_signals
@@ -114,30 +135,40 @@ class StrategyEngine:
         for signal in signals:
             logger.info(f"执行信号: {signal}")
 
+    def refresh(self) -> None:
+        """丢弃缓存的市场、统计和持仓数据，下次调用重新获取"""
+        self.fetcher.invalidate()
+
+    def _fetch_stats(self, markets: list[Market]) -> dict[str, PoolStats]:
+        """并发获取池子统计 (market_key -> stats)"""
+        return fetch_pool_stats(
+            self.fetcher,
+            [m.market_key for m in markets],
+            max_workers=self.config.execution.fetch_workers,
+        )
+
     def get_pool_rankings(self) -> list[dict]:
         """获取池子排名"""
         markets = self.fetcher.get_markets()
         filtered = self.strategy.filter_pools(markets)
 
-        rankings = []
-        for market in filtered:
-            stats = self.fetcher.get_pool_stats(market.market_key)
-            if stats:
-                score = self.strategy.score_pool(market, stats)
-                rankings.append(
-                    {
-                        "name": market.name,
-                        "market_key": market.market_key,
-                        "apy": stats.apy,
-                        "tvl": market.pool_tvl,
-                        "oi_imbalance": market.oi_imbalance,
-                        "score": score.total_score,
-                        "apy_score": score.apy_score,
-                        "risk_score": score.risk_score,
-                        "liquidity_score": score.liquidity_score,
-                        "balance_score": score.balance_score,
-                    }
-                )
+        stats = self._fetch_stats(filtered)
+
+        rankings = [
+            {
+                "name": score.name,
+                "market_key": score.market_key,
+                "apy": score.stats.apy,
+                "tvl": score.market.pool_tvl,
+                "oi_imbalance": score.market.oi_imbalance,
+                "score": score.total_score,
+                "apy_score": score.apy_score,
+                "risk_score": score.risk_score,
+                "liquidity_score": score.liquidity_score,
+                "balance_score": score.balance_score,
+            }
+            for score in self.strategy.score_pools(filtered, stats)
+        ]
 
         rankings.sort(key=lambda x: x["score"], reverse=True)
         return rankings
@@ -146,7 +177,14 @@ class StrategyEngine:
         """获取引擎状态"""
         return {
             "strategy": self.strategy.name if self.strategy else None,
-            "last_run": self.last_run.isoformat() if self.last_run else None,
+            # 与原接口一致: 不带时区后缀的 UTC 时间
+            "last_run": (
+                datetime.fromtimestamp(self.last_run, tz=timezone.utc)
+                .replace(tzinfo=None)
+                .isoformat()
+                if self.last_run
+                else None
+            ),
             "signals_count": len(self.signals_history),
             "config": {
                 "min_apy": self.config.strategy.min_apy,
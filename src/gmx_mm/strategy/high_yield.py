@@ -19,6 +19,11 @@ class HighYieldStrategy(BaseStrategy):
     name = "high_yield"
     description = "高收益策略 - 追求最高 APY，接受较高风险"
 
+    # 评分参数: 对高 APY 更敏感，50% APY 为满分、超过也有加分；流动性阈值较低
+    apy_full_score = 50.0
+    apy_score_cap = 120.0
+    full_liquidity_tvl = 10_000_000
+
     def __init__(self, config: Config):
         super().__init__(config)
 
@@ -32,34 +37,7 @@ class HighYieldStrategy(BaseStrategy):
 
     def score_pool(self, market: Market, stats: PoolStats) -> PoolScore:
         """给池子打分"""
-        score = PoolScore(
-            market_key=market.market_key,
-            name=market.name,
-            stats=stats,
-            market=market,
-        )
-
-        # 1. APY 评分 - 对高 APY 更敏感
-        # 50% APY 为满分，超过也有加分
-        score.apy_score = min(120, (stats.apy / 50) * 100)
-
-        # 2. 风险评分 - 权重较低
-        risk_raw = stats.calculate_risk_score(market)
-        score.risk_score = (10 - risk_raw) * 10
-
-        # 3. 流动性评分 - 阈值较低
-        if market.pool_tvl >= 10_000_000:
-            score.liquidity_score = 100
-        else:
-            score.liquidity_score = (market.pool_tvl / 10_000_000) * 100
-
-        # 4. 多空平衡评分
-        score.balance_score = (1 - market.oi_imbalance) * 100
-
-        # 计算综合评分
-        score.calculate_total_score(self.weights)
-
-        return score
+        return self.score_pools([market], {market.market_key: stats})[0]
 
     def generate_signals(
         self,
@@ -75,34 +53,29 @@ class HighYieldStrategy(BaseStrategy):
         filtered_markets = self.filter_pools(markets)
 
         # 给所有池子打分
-        scores = []
-        for market in filtered_markets:
-            if market.market_key in stats:
-                pool_stats = stats[market.market_key]
-                score = self.score_pool(market, pool_stats)
-                scores.append(score)
-
-        # 按 APY 排序
-        scores.sort(key=lambda x: x.stats.apy if x.stats else 0, reverse=True)
+        scores = self.score_pools(filtered_markets, stats)
 
         if not scores:
             return signals
 
+        scores_by_key = {s.market_key: s for s in scores}
+
         # 最高 APY 的池子
-        best_pool = scores[0]
+        best_pool = max(scores, key=lambda x: x.stats.apy if x.stats else 0)
         best_apy = best_pool.stats.apy if best_pool.stats else 0
 
         # 当前持仓
-        total_position = sum(p.value_usd for p in positions)
+        pos_value_by_key, total_position = self.position_values(positions)
+        # 策略参数 (循环外取一次)
         strategy = self.config.strategy
         risk = self.config.risk
+        min_apy = strategy.min_apy
+        min_position = risk.min_position_usd
+        max_single = risk.max_position_usd * (strategy.max_single_pool_pct / 100)
 
         # 1. 检查是否应该切换到更高收益池
         for position in positions:
-            current_score = next(
-                (s for s in scores if s.market_key == position.market_key),
-                None,
-            )
+            current_score = scores_by_key.get(position.market_key)
 
             if current_score is None:
                 continue
@@ -136,18 +109,14 @@ class HighYieldStrategy(BaseStrategy):
                 )
 
         # 2. 新资金投入最高 APY 池
-        if available_capital >= risk.min_position_usd:
+        if available_capital >= min_position:
             # 检查是否满足最低 APY 要求
-            if best_apy >= strategy.min_apy:
+            if best_apy >= min_apy:
                 # 可投入金额
-                current_in_best = next(
-                    (p.value_usd for p in positions if p.market_key == best_pool.market_key),
-                    0,
-                )
-                max_single = risk.max_position_usd * (strategy.max_single_pool_pct / 100)
+                current_in_best = pos_value_by_key.get(best_pool.market_key, 0)
                 deposit_amount = min(available_capital, max_single - current_in_best)
 
-                if deposit_amount >= risk.min_position_usd:
+                if deposit_amount >= min_position:
                     signals.append(
                         Signal(
                             action="deposit",
@@ -162,19 +131,16 @@ class HighYieldStrategy(BaseStrategy):
 
         # 3. 退出低于阈值的池子
         for position in positions:
-            score = next(
-                (s for s in scores if s.market_key == position.market_key),
-                None,
-            )
+            score = scores_by_key.get(position.market_key)
 
-            if score and score.stats and score.stats.apy < strategy.min_apy:
+            if score and score.stats and score.stats.apy < min_apy:
                 signals.append(
                     Signal(
                         action="withdraw",
                         market_key=position.market_key,
                         market_name=position.name,
                         amount_usd=position.value_usd,
-                        reason=f"APY {score.stats.apy:.1f}% 低于阈值 {strategy.min_apy}%",
+                        reason=f"APY {score.stats.apy:.1f}% 低于阈值 {min_apy}%",
                         priority=2,
                     )
                 )
@@ -1,5 +1,20 @@
 """工具模块"""
 
+from .fetch import CachedFetcher, FetchContext, MarketsIndex, fetch_pool_stats
+from .http import create_async_session, create_session, json_rpc_batch
 from .notifications import TelegramNotifier
+from .positions import PositionBatch
+from .serialization import dumps
 
-__all__ = ["TelegramNotifier"]
+__all__ = [
+    "TelegramNotifier",
+    "CachedFetcher",
+    "FetchContext",
+    "MarketsIndex",
+    "PositionBatch",
+    "fetch_pool_stats",
+    "create_session",
+    "create_async_session",
+    "json_rpc_batch",
+    "dumps",
+]
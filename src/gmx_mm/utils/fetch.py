@@ -0,0 +1,259 @@
+"""数据获取辅助工具"""
+
+import logging
+import math
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+from ..data.fetcher import GMXDataFetcher
+from ..data.models import Market, PoolStats, Position
+
+logger = logging.getLogger(__name__)
+
+# 并发 RPC 请求的最大线程数
+MAX_FETCH_WORKERS = 16
+
+# 单次 multicall 批量查询的最大市场数
+MAX_BATCH_SIZE = 100
+
+T = TypeVar("T")
+
+
+def fetch_pool_stats(
+    fetcher: GMXDataFetcher,
+    market_keys: Iterable[str],
+    max_workers: int = MAX_FETCH_WORKERS,
+    batch_size: int = MAX_BATCH_SIZE,
+) -> dict[str, PoolStats]:
+    """
+    并发获取多个池子的统计数据
+
+    每次 get_pool_stats 都是一次网络往返，串行调用的耗时随市场数线性增长。
+    如果获取器提供 get_pool_stats_multicall (Multicall3 批量查询)，所有市场
+    每 batch_size 个合并为一次 RPC，某一批失败时跳过该批、返回其余结果；
+    否则用线程池让所有请求同时在途，某个市场失败时跳过该市场。
+
+    Args:
+        fetcher: 数据获取器
+        market_keys: 市场地址列表
+        max_workers: 最大并发数
+        batch_size: 单次批量查询的最大市场数
+
+    Returns:
+        池子统计 (market_key -> PoolStats)，获取失败的市场不包含在内
+    """
+    keys = list(market_keys)
+    if not keys:
+        return {}
+
+    if isinstance(fetcher, CachedFetcher):
+        return fetcher.fetch_pool_stats(keys, max_workers, batch_size)
+
+    multicall = getattr(fetcher, "get_pool_stats_multicall", None)
+    if multicall is not None:
+        result: dict[str, PoolStats] = {}
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start : start + batch_size]
+            try:
+                stats_by_key = multicall(batch)
+            except Exception as e:
+                logger.warning(f"批量获取池子统计失败 ({len(batch)} 个市场): {e}")
+                continue
+            result.update((key, stats) for key, stats in stats_by_key.items() if stats)
+        return result
+
+    return _fetch_each(fetcher.get_pool_stats, keys, max_workers)
+
+
+def _fetch_each(
+    get_pool_stats: Callable[[str], Optional[PoolStats]], keys: list[str], max_workers: int
+) -> dict[str, PoolStats]:
+    """线程池逐个获取池子统计，单个市场失败时跳过该市场"""
+
+    def fetch_one(key: str) -> Optional[PoolStats]:
+        try:
+            return get_pool_stats(key)
+        except Exception as e:
+            logger.warning(f"获取池子统计失败 ({key}): {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(keys))) as pool:
+        results = pool.map(fetch_one, keys)
+        return {key: stats for key, stats in zip(keys, results) if stats}
+
+
+@dataclass(frozen=True)
+class MarketsIndex(Sequence):
+    """
+    市场列表及其按地址索引的只读视图
+
+    行为与市场列表一致 (可迭代/切片/len)，同时通过 by_key 按 market_key 查找，
+    避免每个任务重建 {m.market_key: m} 字典。
+    """
+
+    markets: tuple[Market, ...]
+    by_key: Mapping[str, Market]
+
+    @classmethod
+    def from_markets(cls, markets: Iterable[Market]) -> "MarketsIndex":
+        """从市场列表构建索引"""
+        markets = tuple(markets)
+        return cls(markets, MappingProxyType({m.market_key: m for m in markets}))
+
+    def __getitem__(self, index):
+        return self.markets[index]
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def __iter__(self) -> Iterator[Market]:
+        return iter(self.markets)
+
+
+class CachedFetcher:
+    """
+    带 TTL 缓存的数据获取器
+
+    包装 GMXDataFetcher，在 TTL 窗口内对相同参数的调用直接返回内存结果，
+    避免同一分钟内触发的多个任务重复请求 RPC。多个线程同时请求同一个未缓存的键时
+    只发起一次请求，其余线程等待其结果。未缓存的方法透传给原获取器。
+    """
+
+    def __init__(
+        self,
+        fetcher: GMXDataFetcher,
+        markets_ttl: float = 30.0,
+        stats_ttl: float = 15.0,
+        positions_ttl: float = 5.0,
+    ):
+        self.fetcher = fetcher
+        self.markets_ttl = markets_ttl
+        self.stats_ttl = stats_ttl
+        self.positions_ttl = positions_ttl
+        self._cache: dict[tuple, tuple[float, Any]] = {}  # key -> (过期时间, 结果)
+        self._inflight: dict[tuple, Future] = {}  # 正在请求的 key -> 结果
+        self._inflight_lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.fetcher, name)
+
+    def _lookup(self, key: tuple) -> Any:
+        """读取未过期的缓存，未命中返回 None"""
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _store(self, key: tuple, ttl: float, value: Any) -> None:
+        """写入缓存 (空结果不缓存)"""
+        if value:
+            self._cache[key] = (time.monotonic() + ttl, value)
+
+    def _cached(self, key: tuple, ttl: float, load: Callable[[], T]) -> T:
+        """读取缓存，过期或未命中时调用 load 并写入缓存"""
+        cached: Optional[T] = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        future: Future = Future()
+        with self._inflight_lock:
+            inflight = self._inflight.setdefault(key, future)
+        if inflight is not future:
+            shared: T = inflight.result()
+            return shared
+
+        try:
+            value = load()
+            self._store(key, ttl, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def get_markets(self, force_refresh: bool = False) -> MarketsIndex:
+        """获取所有市场 (索引在每个 TTL 窗口内只构建一次)"""
+        if force_refresh:
+            self.invalidate_markets()
+        return self._cached(
+            ("markets",),
+            self.markets_ttl,
+            lambda: MarketsIndex.from_markets(
+                self.fetcher.get_markets(force_refresh=force_refresh)
+            ),
+        )
+
+    def invalidate_markets(self) -> None:
+        """清空市场列表缓存 (下次 get_markets 重新请求)"""
+        self._cache.pop(("markets",), None)
+
+    def get_pool_stats(self, market_key: str) -> Optional[PoolStats]:
+        """获取池子统计"""
+        return self._cached(
+            ("pool_stats", market_key),
+            self.stats_ttl,
+            lambda: self.fetcher.get_pool_stats(market_key),
+        )
+
+    def fetch_pool_stats(
+        self,
+        market_keys: list[str],
+        max_workers: int = MAX_FETCH_WORKERS,
+        batch_size: int = MAX_BATCH_SIZE,
+    ) -> dict[str, PoolStats]:
+        """
+        批量获取池子统计 (见模块函数 fetch_pool_stats)
+
+        原获取器支持 multicall 时只对未命中缓存的市场批量查询，
+        否则逐个调用带缓存的 get_pool_stats。
+        """
+        if not hasattr(self.fetcher, "get_pool_stats_multicall"):
+            return _fetch_each(self.get_pool_stats, market_keys, max_workers)
+
+        result = {}
+        missing = []
+        for key in market_keys:
+            stats = self._lookup(("pool_stats", key))
+            if stats is None:
+                missing.append(key)
+            else:
+                result[key] = stats
+
+        fetched = fetch_pool_stats(self.fetcher, missing, max_workers, batch_size)
+        for key, stats in fetched.items():
+            self._store(("pool_stats", key), self.stats_ttl, stats)
+            result[key] = stats
+
+        return result
+
+    def get_positions(self, address: str) -> list[Position]:
+        """获取持仓"""
+        return self._cached(
+            ("positions", address),
+            self.positions_ttl,
+            lambda: self.fetcher.get_positions(address),
+        )
+
+    def invalidate(self) -> None:
+        """清空缓存 (链上状态变化后调用)"""
+        self._cache.clear()
+
+
+class FetchContext(CachedFetcher):
+    """
+    单次任务的数据快照
+
+    在一个任务的生命周期内，同一参数的查询只请求一次，并且任务内所有读取
+    看到的是同一份数据，不会因中途 TTL 过期而前后不一致。每个任务开始时新建。
+    """
+
+    def __init__(self, fetcher: GMXDataFetcher):
+        super().__init__(fetcher, markets_ttl=math.inf, stats_ttl=math.inf, positions_ttl=math.inf)
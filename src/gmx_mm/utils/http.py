@@ -0,0 +1,109 @@
+"""HTTP 连接工具"""
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_size: int = 32, retries: int = 3) -> requests.Session:
+    """
+    创建带连接池的 HTTP 会话
+
+    同一会话内的请求复用 keep-alive 连接，省去每次请求的 TCP/TLS 握手。
+
+    Args:
+        pool_size: 每个主机的最大连接数
+        retries: 连接失败时的重试次数
+
+    Returns:
+        requests.Session: HTTP 会话
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=retries, backoff_factor=0.2),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def create_async_session(
+    pool_size: int = 32,
+    timeout: float = 30,
+    keepalive: float = 75,
+) -> aiohttp.ClientSession:
+    """
+    创建带连接池的异步 HTTP 会话 (需在事件循环内调用)
+
+    空闲连接保留 keepalive 秒，覆盖每分钟一次的定时任务间隔，
+    使后续 RPC 复用已完成 TLS 握手的连接。
+
+    Args:
+        pool_size: 最大并发连接数
+        timeout: 单次请求总超时 (秒)
+        keepalive: 空闲连接保留时间 (秒)
+
+    Returns:
+        aiohttp.ClientSession: 异步 HTTP 会话
+    """
+    connector = aiohttp.TCPConnector(
+        limit=pool_size,
+        limit_per_host=pool_size,
+        keepalive_timeout=keepalive,
+        ttl_dns_cache=300,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    )
+
+
+async def json_rpc_batch(
+    session: aiohttp.ClientSession,
+    url: str,
+    calls: list[tuple[str, list]],
+    return_exceptions: bool = False,
+) -> list:
+    """
+    以一次 HTTP 请求发送多个 JSON-RPC 调用
+
+    Args:
+        session: 异步 HTTP 会话
+        url: RPC 地址
+        calls: (method, params) 列表
+        return_exceptions: 为 True 时失败的调用以 RuntimeError 对象放在结果中，不抛出
+
+    Returns:
+        各调用的 result，顺序与 calls 一致
+
+    Raises:
+        RuntimeError: 任一调用返回错误或缺少响应 (return_exceptions 为 False 时)
+    """
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    async with session.post(url, json=payload) as response:
+        response.raise_for_status()
+        body = await response.json()
+
+    # 节点不保证按请求顺序返回，按 id 对齐
+    replies = {reply.get("id"): reply for reply in body}
+
+    results = []
+    for i, (method, _) in enumerate(calls):
+        reply = replies.get(i)
+        if reply is None:
+            error = RuntimeError(f"RPC 批量请求缺少响应: {method}")
+        elif "error" in reply:
+            error = RuntimeError(f"RPC 调用失败: {method}: {reply['error']}")
+        else:
+            results.append(reply.get("result"))
+            continue
+        if not return_exceptions:
+            raise error
+        results.append(error)
+    return results
@@ -1,17 +1,56 @@
 """通知模块"""
 
+import atexit
 import logging
+import queue
+import threading
 from typing import Optional
 
-import requests
-
 from ..config import Config
+from .http import create_session
+from .serialization import dumps
 
 logger = logging.getLogger(__name__)
 
+# (连接超时, 读取超时)，避免 Telegram 无响应时阻塞后台发送线程
+SEND_TIMEOUT = (2, 5)
+
+# 退出时等待队列中消息发送完毕的最长时间 (秒)
+DRAIN_TIMEOUT = 10.0
+
+# 告警级别对应的 emoji
+_LEVEL_EMOJI = {
+    "info": "ℹ️",
+    "warning": "⚠️",
+    "critical": "🚨",
+    "success": "✅",
+}
+
 
 class TelegramNotifier:
-    """Telegram 通知器"""
+    """
+    Telegram 通知器
+
+    send() 只把消息放入队列，由后台线程通过持久会话依次发送，
+    调度任务不会因 Telegram 网络延迟而阻塞。进程退出时等待队列发送完毕。
+    """
+
+    # 消息模板
+    _ALERT_TMPL = "{emoji} <b>{title}</b>\n\n{content}\n\n<i>GMX Market Maker Bot</i>"
+    _TRADE_TMPL = (
+        "{emoji} <b>交易执行</b>\n\n"
+        "<b>操作:</b> {action_text}\n"
+        "<b>池子:</b> {pool}\n"
+        "<b>金额:</b> ${amount:,.2f}"
+    )
+    _TX_LINK_TMPL = "\n\n<b>交易:</b> <a href='https://arbiscan.io/tx/{tx_hash}'>查看</a>"
+    _DAILY_TMPL = (
+        "📊 <b>每日报告</b>\n\n"
+        "💰 <b>总资产:</b> ${total_value:,.2f}\n"
+        "{pnl_emoji} <b>今日收益:</b> {pnl_sign}${daily_pnl:,.2f}\n"
+        "🏊 <b>持仓池数:</b> {positions_count}\n\n"
+        "<i>继续加油! 💪</i>"
+    )
 
     def __init__(self, config: Config):
         self.enabled = config.notifications.telegram.enabled
@@ -22,21 +61,67 @@ class TelegramNotifier:
             logger.warning("Telegram 已启用但未配置 bot_token 或 chat_id")
             self.enabled = False
 
+        self._url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+
+        self.session = create_session(pool_size=4)
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
     def send(self, message: str, parse_mode: str = "HTML") -> bool:
-        """发送消息"""
+        """
+        发送消息 (异步，放入发送队列后立即返回)
+
+        Returns:
+            是否已放入发送队列
+        """
         if not self.enabled:
             logger.debug(f"[Telegram 禁用] {message}")
             return False
 
+        if self._worker is None:
+            self._start_worker()
+        self._queue.put((message, parse_mode))
+        return True
+
+    def close(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """等待队列中的消息发送完毕并停止后台线程"""
+        worker = self._worker
+        if worker is None:
+            return
+        self._worker = None
+        self._queue.put(None)
+        worker.join(timeout)
+        if worker.is_alive():
+            logger.warning("Telegram 队列未在超时前发送完毕")
+
+    def _start_worker(self) -> None:
+        self._worker = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        """后台线程: 依次发送队列中的消息，收到 None 时退出"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._post(*item)
+
+    def _post(self, message: str, parse_mode: str) -> bool:
+        """调用 Telegram API 发送一条消息"""
         try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
             data = {
                 "chat_id": self.chat_id,
                 "text": message,
                 "parse_mode": parse_mode,
             }
 
-            response = requests.post(url, json=data, timeout=10)
+            response = self.session.post(
+                self._url,
+                data=dumps(data),
+                headers={"Content-Type": "application/json"},
+                timeout=SEND_TIMEOUT,
+            )
             response.raise_for_status()
 
             logger.info("Telegram 消息已发送")
@@ -53,22 +138,8 @@ class TelegramNotifier:
         level: str = "info",
     ) -> bool:
         """发送告警"""
-        emoji = {
-            "info": "ℹ️",
-            "warning": "⚠️",
-            "critical": "🚨",
-            "success": "✅",
-        }.get(level, "📢")
-
-        message = f"""
-{emoji} <b>{title}</b>
-
-{content}
-
-<i>GMX Market Maker Bot</i>
-        """.strip()
-
-        return self.send(message)
+        emoji = _LEVEL_EMOJI.get(level, "📢")
+        return self.send(self._ALERT_TMPL.format(emoji=emoji, title=title, content=content))
 
     def send_trade_notification(
         self,
@@ -81,18 +152,13 @@ class TelegramNotifier:
         emoji = "📥" if action == "deposit" else "📤"
         action_text = "存入" if action == "deposit" else "提取"
 
-        message = f"""
-{emoji} <b>交易执行</b>
-
-<b>操作:</b> {action_text}
-<b>池子:</b> {pool}
-<b>金额:</b> ${amount:,.2f}
-"""
-
+        message = self._TRADE_TMPL.format(
+            emoji=emoji, action_text=action_text, pool=pool, amount=amount
+        )
         if tx_hash:
-            message += f"\n<b>交易:</b> <a href='https://arbiscan.io/tx/{tx_hash}'>查看</a>"
+            message += self._TX_LINK_TMPL.format(tx_hash=tx_hash)
 
-        return self.send(message.strip())
+        return self.send(message)
 
     def send_daily_report(
         self,
@@ -104,14 +170,12 @@ class TelegramNotifier:
         pnl_emoji = "📈" if daily_pnl >= 0 else "📉"
         pnl_sign = "+" if daily_pnl >= 0 else ""
 
-        message = f"""
-📊 <b>每日报告</b>
-
-💰 <b>总资产:</b> ${total_value:,.2f}
-{pnl_emoji} <b>今日收益:</b> {pnl_sign}${daily_pnl:,.2f}
-🏊 <b>持仓池数:</b> {positions_count}
-
-<i>继续加油! 💪</i>
-        """.strip()
-
-        return self.send(message)
+        return self.send(
+            self._DAILY_TMPL.format(
+                total_value=total_value,
+                pnl_emoji=pnl_emoji,
+                pnl_sign=pnl_sign,
+                daily_pnl=daily_pnl,
+                positions_count=positions_count,
+            )
+        )
@@ -0,0 +1,80 @@
+"""持仓批量计算"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterator
+
+import numpy as np
+
+from ..data.models import Position
+
+
+@dataclass
+class PositionBatch:
+    """
+    持仓的列式视图
+
+    将各持仓的数值字段打包为连续的 NumPy 数组，汇总计算时
+    不再逐个遍历 Position 对象。原始持仓列表保留用于逐行展示。
+    """
+
+    positions: list[Position]
+    value_usd: np.ndarray
+    unrealized_pnl: np.ndarray
+    gm_balance: np.ndarray
+    cost_basis: np.ndarray
+
+    @classmethod
+    def from_positions(cls, positions: list[Position]) -> "PositionBatch":
+        """从持仓列表构建"""
+        count = len(positions)
+
+        def column(attr: str) -> np.ndarray:
+            return np.fromiter((getattr(p, attr) for p in positions), dtype=np.float64, count=count)
+
+        return cls(
+            positions=list(positions),
+            value_usd=column("value_usd"),
+            unrealized_pnl=column("unrealized_pnl"),
+            gm_balance=column("gm_balance"),
+            cost_basis=column("cost_basis"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator[Position]:
+        return iter(self.positions)
+
+    @property
+    def total_value(self) -> float:
+        """总价值 (USD)"""
+        return float(self.value_usd.sum())
+
+    @property
+    def total_pnl(self) -> float:
+        """总未实现收益 (USD)"""
+        return float(self.unrealized_pnl.sum())
+
+    @property
+    def total_cost(self) -> float:
+        """总成本 (USD)，不含零成本持仓"""
+        return float(self.cost_basis[self.cost_basis > 0].sum())
+
+    @cached_property
+    def pnl_pct(self) -> np.ndarray:
+        """各持仓收益率 (%)，读取 Position.pnl_pct，零成本持仓为 0"""
+        return np.fromiter(
+            (p.pnl_pct if p.cost_basis > 0 else 0.0 for p in self.positions),
+            dtype=np.float64,
+            count=len(self.positions),
+        )
+
+    @cached_property
+    def concentration_pct(self) -> np.ndarray:
+        """各持仓占总价值比例 (%)，总价值为 0 时全为 0"""
+        total = self.value_usd.sum()
+        if total == 0:
+            return np.zeros_like(self.value_usd)
+        pct: np.ndarray = self.value_usd / total * 100
+        return pct
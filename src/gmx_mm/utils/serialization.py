@@ -0,0 +1,24 @@
+"""JSON 序列化"""
+
+from datetime import datetime
+
+try:
+    import orjson
+
+    def dumps(obj) -> bytes:
+        """序列化为 UTF-8 JSON (orjson 原生支持 datetime)"""
+        return orjson.dumps(obj)
+
+except ImportError:  # orjson 为可选依赖
+    import json
+
+    def _default(obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def dumps(obj) -> bytes:
+        """序列化为 UTF-8 JSON"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode(
+            "utf-8"
+        )
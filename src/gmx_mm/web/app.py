@@ -1,117 +1,459 @@
 """Web 应用"""
 
-import json
+import asyncio
+import contextlib
+import functools
+import hashlib
+import inspect
 import logging
-from datetime import datetime
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Optional, cast
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 from ..config import Config
 from ..data.fetcher import GMXDataFetcher
 from ..strategy.engine import StrategyEngine
+from ..utils.fetch import CachedFetcher, fetch_pool_stats
+from ..utils.serialization import dumps
 from ..execution.risk import RiskManager
 
 logger = logging.getLogger(__name__)
 
-# 全局实例
-_config: Optional[Config] = None
-_fetcher: Optional[GMXDataFetcher] = None
-_engine: Optional[StrategyEngine] = None
-_risk_manager: Optional[RiskManager] = None
+# 市场列表很少变化，缓存 5 分钟；持仓与钱包相关，不缓存
+MARKETS_CACHE_TTL = 300.0
+
+# /api/pools 返回的最大池子数
+MAX_POOLS = 20
+
+# 接口响应缓存时间 (秒)，只用于与请求者无关的接口
+POOLS_CACHE_TTL = 30.0
+STATUS_CACHE_TTL = 5.0
+ALERTS_CACHE_TTL = 5.0
+
+# 后台刷新池子快照的间隔 (秒)；快照超过 POOLS_MAX_AGE 未更新时 /healthz 报告异常
+POOLS_REFRESH_INTERVAL = 30.0
+POOLS_MAX_AGE = 300.0
+
+# /api/stream 推送间隔和心跳间隔 (秒)
+STREAM_INTERVAL = 30.0
+STREAM_KEEPALIVE = 15.0
+
+# 每个订阅者最多积压的事件数，超过时丢弃最旧的事件
+STREAM_QUEUE_SIZE = 16
+
+
+class ResponseCache:
+    """
+    接口响应缓存
+
+    按接口路径缓存序列化后的 JSON 响应体和 ETag，TTL 窗口内所有客户端共享同一份快照，
+    命中时既不请求 RPC 也不重新编码 JSON。客户端带 If-None-Match 且内容未变化时
+    返回 304 (无响应体)。只缓存成功的响应。
+    """
+
+    def __init__(self):
+        # key -> (过期时间, 响应体, ETag)
+        self._entries: dict[str, tuple[float, bytes, str]] = {}
+
+    def cached(self, key: str, ttl: float):
+        """装饰返回 dict 的异步接口 (额外注入 Request 以读取 If-None-Match)"""
+
+        def decorator(handler):
+            @functools.wraps(handler)
+            async def wrapper(*args, http_request: Request, **kwargs):
+                body, etag = await self.get(key, ttl, lambda: handler(*args, **kwargs))
+                headers = {"ETag": etag, "Cache-Control": "no-cache"}
+                if http_request.headers.get("if-none-match") == etag:
+                    return Response(status_code=304, headers=headers)
+                return Response(content=body, media_type="application/json", headers=headers)
+
+            signature = inspect.signature(handler)
+            wrapper.__signature__ = signature.replace(
+                parameters=[
+                    *signature.parameters.values(),
+                    inspect.Parameter(
+                        "http_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request
+                    ),
+                ]
+            )
+            return wrapper
+
+        return decorator
+
+    async def get(self, key: str, ttl: float, load) -> tuple[bytes, str]:
+        """
+        读取缓存的 (响应体, ETag)
+
+        Args:
+            key: 接口路径
+            ttl: 缓存时间 (秒)
+            load: 未命中时调用的协程函数，返回响应 dict
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1], entry[2]
+
+        return self.put(key, ttl, await load())
+
+    def put(self, key: str, ttl: float, result: dict) -> tuple[bytes, str]:
+        """序列化响应并写入缓存 (失败的响应不缓存)，返回 (响应体, ETag)"""
+        body = dumps(result)
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if result.get("success"):
+            self._entries[key] = (time.monotonic() + ttl, body, etag)
+        return body, etag
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+
+
+class EventBroadcaster:
+    """
+    SSE 事件广播
+
+    一个后台任务按固定间隔刷新数据并推送给所有订阅者，RPC 请求次数与客户端数量无关。
+    内容未变化的事件不重复推送；新订阅者立即收到每类事件的最新一份。
+    """
+
+    def __init__(self, interval: float = STREAM_INTERVAL):
+        self.interval = interval
+        self._subscribers: set[asyncio.Queue] = set()
+        self._last: dict[str, bytes] = {}  # 事件名 -> 最近一次推送的消息
+
+    def subscribe(self) -> asyncio.Queue:
+        """订阅事件 (返回接收 SSE 消息的队列)"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        for message in self._last.values():
+            queue.put_nowait(message)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """取消订阅"""
+        self._subscribers.discard(queue)
+
+    def publish(self, event: str, data: bytes) -> None:
+        """推送事件 (已序列化的 JSON) 给所有订阅者"""
+        message = b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+        if self._last.get(event) == message:
+            return
+        self._last[event] = message
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def run(self, refresh) -> None:
+        """
+        定时刷新并推送 (后台任务)
+
+        Args:
+            refresh: 返回 {事件名: JSON} 的协程函数，只在有订阅者时调用
+        """
+        while True:
+            if self._subscribers:
+                try:
+                    for event, data in (await refresh()).items():
+                        self.publish(event, data)
+                except Exception as e:
+                    logger.warning(f"推送数据刷新失败: {e}")
+            await asyncio.sleep(self.interval)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON 响应 (安装 orjson 时用 orjson 编码)"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def _isoformat(ts: float) -> str:
+    """epoch 秒转 ISO 8601 UTC 时间 (不带时区后缀，与原接口一致)"""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+# 依赖注入: 组件保存在 app.state，由 create_app 初始化
+def get_config(request: Request) -> Config:
+    return cast(Config, request.app.state.config)
+
+
+def get_fetcher(request: Request) -> Optional[GMXDataFetcher]:
+    return cast(Optional[GMXDataFetcher], request.app.state.fetcher)
+
+
+def get_engine(request: Request) -> Optional[StrategyEngine]:
+    return cast(Optional[StrategyEngine], request.app.state.engine)
+
+
+def get_risk_manager(request: Request) -> Optional[RiskManager]:
+    return cast(Optional[RiskManager], request.app.state.risk_manager)
+
+
+async def status_payload(
+    config: Config,
+    fetcher: Optional[GMXDataFetcher],
+    engine: Optional[StrategyEngine],
+    risk_manager: Optional[RiskManager],
+) -> dict:
+    """系统状态"""
+    try:
+        positions = []
+        if config.wallet.address and fetcher:
+            positions = await asyncio.to_thread(fetcher.get_positions, config.wallet.address)
+
+        engine_status = engine.get_status() if engine else {}
+        risk_summary = risk_manager.get_risk_summary(positions) if risk_manager else {}
+
+        return {
+            "success": True,
+            "data": {
+                "strategy": engine_status,
+                "risk": risk_summary,
+                "positions_count": len(positions),
+                # 与原接口一致: 不带时区后缀的 UTC 时间
+                "timestamp": datetime.now(timezone.utc).replace(tzinfo=None),
+            },
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+async def pools_payload(config: Config, fetcher: Optional[GMXDataFetcher]) -> dict:
+    """池子列表"""
+    try:
+        if not fetcher:
+            raise HTTPException(status_code=500, detail="Fetcher 未初始化")
+
+        # RPC 请求在线程中执行，不阻塞事件循环；各池子统计并发获取
+        markets = (await asyncio.to_thread(fetcher.get_markets))[:MAX_POOLS]
+        stats = await asyncio.to_thread(
+            fetch_pool_stats,
+            fetcher,
+            [m.market_key for m in markets],
+            config.execution.fetch_workers,
+        )
+
+        pools_data = []
+        for market in markets:
+            pool_stats = stats.get(market.market_key)
+            pools_data.append(
+                {
+                    "name": market.name,
+                    "market_key": market.market_key,
+                    "gm_price": market.gm_price,
+                    "tvl": market.pool_tvl,
+                    "long_oi": market.long_oi,
+                    "short_oi": market.short_oi,
+                    "oi_imbalance": market.oi_imbalance,
+                    "apy": pool_stats.apy if pool_stats else 0,
+                }
+            )
+
+        return {"success": True, "data": pools_data}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+async def alerts_payload(risk_manager: Optional[RiskManager]) -> dict:
+    """未确认告警"""
+    try:
+        if not risk_manager:
+            return {"success": True, "data": []}
+
+        alerts = risk_manager.get_active_alerts()
+
+        return {
+            "success": True,
+            "data": [
+                {
+                    "level": a.level,
+                    "type": a.type,
+                    "market": a.market_name,
+                    "message": a.message,
+                    "timestamp": _isoformat(a.timestamp),
+                }
+                for a in alerts
+            ],
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
 
 def create_app(config: Config) -> FastAPI:
     """创建 FastAPI 应用"""
-    global _config, _fetcher, _engine, _risk_manager
-
-    _config = config
+    broadcaster = EventBroadcaster()
+
+    async def refresh_stream() -> dict[str, bytes]:
+        (status, _), (pools, _), (alerts, _) = await cached_payloads(
+            app.state.config, app.state.fetcher, app.state.engine, app.state.risk_manager
+        )
+        return {"status": status, "pools": pools, "alerts": alerts}
+
+    async def refresh_pools() -> None:
+        """后台维护池子快照，/api/pools 只读取缓存，不受 RPC 延迟影响"""
+        while True:
+            result = await pools_payload(app.state.config, app.state.fetcher)
+            if result.get("success"):
+                # 缓存时间覆盖下一次刷新，请求始终命中快照
+                response_cache.put("/api/pools", POOLS_CACHE_TTL + POOLS_REFRESH_INTERVAL, result)
+                app.state.pools_updated_at = time.time()
+            else:
+                logger.warning(f"刷新池子快照失败: {result.get('error')}")
+            await asyncio.sleep(POOLS_REFRESH_INTERVAL)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: FastAPI):
+        tasks = [
+            asyncio.create_task(refresh_pools()),
+            asyncio.create_task(broadcaster.run(refresh_stream)),
+        ]
+        try:
+            yield
+        finally:
+            for task in tasks:
+                task.cancel()
 
     app = FastAPI(
         title="GMX Market Maker",
         description="GMX v2 做市策略机器人",
         version="0.1.0",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan,
     )
+    app.state.broadcaster = broadcaster
+    app.state.pools_updated_at = None
+
+    # 超过 1KB 的响应 (JSON 和仪表盘页面) 均由 GZipMiddleware 压缩传输
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
 
     # 初始化组件
+    app.state.config = config
+    app.state.fetcher = None
+    app.state.engine = None
+    app.state.risk_manager = None
     try:
-        _fetcher = GMXDataFetcher(config)
-        _engine = StrategyEngine(config, _fetcher)
-        _risk_manager = RiskManager(config)
+        app.state.fetcher = CachedFetcher(
+            GMXDataFetcher(config),
+            markets_ttl=MARKETS_CACHE_TTL,
+            stats_ttl=POOLS_CACHE_TTL,
+            positions_ttl=0,
+        )
+        app.state.engine = StrategyEngine(config, app.state.fetcher)
+        app.state.risk_manager = RiskManager(config)
     except Exception as e:
         logger.error(f"初始化失败: {e}")
 
+    # 公共接口的响应缓存 (/api/positions 与钱包相关，不缓存)
+    response_cache = ResponseCache()
+    app.state.response_cache = response_cache
+
+    async def cached_payloads(config, fetcher, engine, risk_manager):
+        """从响应缓存读取 (状态, 池子, 告警) 的 (响应体, ETag)"""
+        return await asyncio.gather(
+            response_cache.get(
+                "/api/status",
+                STATUS_CACHE_TTL,
+                lambda: status_payload(config, fetcher, engine, risk_manager),
+            ),
+            response_cache.get(
+                "/api/pools", POOLS_CACHE_TTL, lambda: pools_payload(config, fetcher)
+            ),
+            response_cache.get(
+                "/api/alerts", ALERTS_CACHE_TTL, lambda: alerts_payload(risk_manager)
+            ),
+        )
+
     # API 路由
     @app.get("/", response_class=HTMLResponse)
-    async def index():
-        """主页"""
-        return get_dashboard_html()
+    async def index(
+        request: Request,
+        config: Config = Depends(get_config),
+        fetcher: Optional[GMXDataFetcher] = Depends(get_fetcher),
+        engine: Optional[StrategyEngine] = Depends(get_engine),
+        risk_manager: Optional[RiskManager] = Depends(get_risk_manager),
+    ):
+        """
+        主页
+
+        首屏数据 (状态/池子/告警) 直接内嵌到页面，浏览器不必再发三次请求；
+        数据取自接口响应缓存。数据和页面都未变化时返回 304。
+        """
+        (status, status_etag), (pools, pools_etag), (alerts, alerts_etag) = await cached_payloads(
+            config, fetcher, engine, risk_manager
+        )
+        digest = hashlib.blake2b(
+            (_DASHBOARD_ETAG + status_etag + pools_etag + alerts_etag).encode(), digest_size=8
+        )
+        etag = f'"{digest.hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+
+        boot = b'{"status":' + status + b',"pools":' + pools + b',"alerts":' + alerts + b"}"
+        content = _DASHBOARD_HEAD + boot.replace(b"</", b"<\\/") + _DASHBOARD_TAIL
+        return Response(content=content, media_type="text/html", headers=headers)
+
+    @app.get("/static/{filename}")
+    async def static_asset(filename: str):
+        """仪表盘 CSS/JS (内容变化时 URL 随之变化，浏览器可永久缓存)"""
+        asset = _STATIC_ASSETS.get(f"/static/{filename}")
+        if asset is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return Response(
+            content=asset.content,
+            media_type=asset.media_type,
+            headers={"Cache-Control": "public, max-age=31536000, immutable"},
+        )
+
+    @app.get("/healthz")
+    async def healthz():
+        """健康检查 (池子快照超过 POOLS_MAX_AGE 未更新时返回 503)"""
+        updated_at = app.state.pools_updated_at
+        age = time.time() - updated_at if updated_at is not None else None
+        healthy = age is not None and age <= POOLS_MAX_AGE
+        return FastJSONResponse(
+            {"success": healthy, "pools_age": age}, status_code=200 if healthy else 503
+        )
 
     @app.get("/api/status")
-    async def get_status():
+    @response_cache.cached("/api/status", STATUS_CACHE_TTL)
+    async def get_status(
+        config: Config = Depends(get_config),
+        fetcher: Optional[GMXDataFetcher] = Depends(get_fetcher),
+        engine: Optional[StrategyEngine] = Depends(get_engine),
+        risk_manager: Optional[RiskManager] = Depends(get_risk_manager),
+    ):
         """获取系统状态"""
-        try:
-            positions = []
-            if _config.wallet.address and _fetcher:
-                positions = _fetcher.get_positions(_config.wallet.address)
-
-            engine_status = _engine.get_status() if _engine else {}
-            risk_summary = _risk_manager.get_risk_summary(positions) if _risk_manager else {}
-
-            return {
-                "success": True,
-                "data": {
-                    "strategy": engine_status,
-                    "risk": risk_summary,
-                    "positions_count": len(positions),
-                    "timestamp": datetime.utcnow().isoformat(),
-                },
-            }
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await status_payload(config, fetcher, engine, risk_manager)
 
     @app.get("/api/pools")
-    async def get_pools():
+    @response_cache.cached("/api/pools", POOLS_CACHE_TTL)
+    async def get_pools(
+        config: Config = Depends(get_config),
+        fetcher: Optional[GMXDataFetcher] = Depends(get_fetcher),
+    ):
         """获取池子列表"""
-        try:
-            if not _fetcher:
-                raise HTTPException(status_code=500, detail="Fetcher 未初始化")
-
-            markets = _fetcher.get_markets()
-            pools_data = []
-
-            for market in markets[:20]:  # 限制数量
-                stats = _fetcher.get_pool_stats(market.market_key)
-
-                pools_data.append(
-                    {
-                        "name": market.name,
-                        "market_key": market.market_key,
-                        "gm_price": market.gm_price,
-                        "tvl": market.pool_tvl,
-                        "long_oi": market.long_oi,
-                        "short_oi": market.short_oi,
-                        "oi_imbalance": market.oi_imbalance,
-                        "apy": stats.apy if stats else 0,
-                    }
-                )
-
-            return {"success": True, "data": pools_data}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await pools_payload(config, fetcher)
 
     @app.get("/api/positions")
-    async def get_positions():
+    async def get_positions(
+        config: Config = Depends(get_config),
+        fetcher: Optional[GMXDataFetcher] = Depends(get_fetcher),
+    ):
         """获取持仓"""
-        try:
-            if not _fetcher or not _config.wallet.address:
-                return {"success": True, "data": []}
+        if not fetcher or not config.wallet.address:
+            return Response(content=_EMPTY_DATA, media_type="application/json")
 
-            positions = _fetcher.get_positions(_config.wallet.address)
+        try:
+            positions = await asyncio.to_thread(fetcher.get_positions, config.wallet.address)
 
             return {
                 "success": True,
@@ -130,45 +472,51 @@ def create_app(config: Config) -> FastAPI:
             return {"success": False, "error": str(e)}
 
     @app.get("/api/alerts")
-    async def get_alerts():
+    @response_cache.cached("/api/alerts", ALERTS_CACHE_TTL)
+    async def get_alerts(risk_manager: Optional[RiskManager] = Depends(get_risk_manager)):
         """获取告警"""
-        try:
-            if not _risk_manager:
-                return {"success": True, "data": []}
-
-            alerts = _risk_manager.get_active_alerts()
-
-            return {
-                "success": True,
-                "data": [
-                    {
-                        "level": a.level,
-                        "type": a.type,
-                        "market": a.market_name,
-                        "message": a.message,
-                        "timestamp": a.timestamp.isoformat(),
-                    }
-                    for a in alerts
-                ],
-            }
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await alerts_payload(risk_manager)
+
+    @app.get("/api/stream")
+    async def stream():
+        """推送状态、池子和告警 (Server-Sent Events)"""
+        queue = broadcaster.subscribe()
+
+        async def events():
+            try:
+                while True:
+                    try:
+                        yield await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE)
+                    except asyncio.TimeoutError:
+                        yield b": keepalive\n\n"
+            finally:
+                broadcaster.unsubscribe(queue)
+
+        return StreamingResponse(
+            events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+        )
 
     class RunStrategyRequest(BaseModel):
         capital: float = 0
         dry_run: bool = True
 
     @app.post("/api/run")
-    async def run_strategy(request: RunStrategyRequest):
+    async def run_strategy(
+        request: RunStrategyRequest,
+        engine: Optional[StrategyEngine] = Depends(get_engine),
+    ):
         """运行策略"""
         try:
-            if not _engine:
+            if not engine:
                 raise HTTPException(status_code=500, detail="Engine 未初始化")
 
-            signals = _engine.run(
+            signals = await asyncio.to_thread(
+                engine.run,
                 available_capital=request.capital,
                 dry_run=request.dry_run,
             )
+            if not request.dry_run:
+                response_cache.clear()
 
             return {
                 "success": True,
@@ -199,454 +547,7 @@ def get_dashboard_html() -> str:
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>GMX Market Maker</title>
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        :root {
-            --bg-primary: #0d1117;
-            --bg-secondary: #161b22;
-            --bg-tertiary: #21262d;
-            --border-color: #30363d;
-            --text-primary: #f0f6fc;
-            --text-secondary: #8b949e;
-            --accent-green: #3fb950;
-            --accent-red: #f85149;
-            --accent-blue: #58a6ff;
-            --accent-purple: #a371f7;
-            --accent-yellow: #d29922;
-            --gradient-1: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            --gradient-2: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-            --gradient-3: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-        }
-
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-            background: var(--bg-primary);
-            color: var(--text-primary);
-            min-height: 100vh;
-        }
-
-        /* Header */
-        .header {
-            background: var(--bg-secondary);
-            border-bottom: 1px solid var(--border-color);
-            padding: 1rem 2rem;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-
-        .logo {
-            display: flex;
-            align-items: center;
-            gap: 0.75rem;
-        }
-
-        .logo-icon {
-            width: 40px;
-            height: 40px;
-            background: var(--gradient-1);
-            border-radius: 10px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 1.5rem;
-        }
-
-        .logo-text {
-            font-size: 1.25rem;
-            font-weight: 700;
-            background: var(--gradient-1);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-
-        .status-badge {
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            padding: 0.5rem 1rem;
-            background: var(--bg-tertiary);
-            border-radius: 20px;
-            font-size: 0.875rem;
-        }
-
-        .status-dot {
-            width: 8px;
-            height: 8px;
-            border-radius: 50%;
-            background: var(--accent-green);
-            animation: pulse 2s infinite;
-        }
-
-        @keyframes pulse {
-            0%, 100% { opacity: 1; }
-            50% { opacity: 0.5; }
-        }
-
-        /* Main Content */
-        .main {
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 2rem;
-        }
-
-        /* Stats Cards */
-        .stats-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-            gap: 1.5rem;
-            margin-bottom: 2rem;
-        }
-
-        .stat-card {
-            background: var(--bg-secondary);
-            border: 1px solid var(--border-color);
-            border-radius: 16px;
-            padding: 1.5rem;
-            transition: transform 0.2s, box-shadow 0.2s;
-        }
-
-        .stat-card:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 8px 30px rgba(0, 0, 0, 0.3);
-        }
-
-        .stat-card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 1rem;
-        }
-
-        .stat-card-title {
-            color: var(--text-secondary);
-            font-size: 0.875rem;
-            font-weight: 500;
-        }
-
-        .stat-card-icon {
-            width: 40px;
-            height: 40px;
-            border-radius: 10px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 1.25rem;
-        }
-
-        .stat-card-icon.green { background: rgba(63, 185, 80, 0.15); }
-        .stat-card-icon.blue { background: rgba(88, 166, 255, 0.15); }
-        .stat-card-icon.purple { background: rgba(163, 113, 247, 0.15); }
-        .stat-card-icon.yellow { background: rgba(210, 153, 34, 0.15); }
-
-        .stat-card-value {
-            font-size: 2rem;
-            font-weight: 700;
-            margin-bottom: 0.5rem;
-        }
-
-        .stat-card-change {
-            font-size: 0.875rem;
-            display: flex;
-            align-items: center;
-            gap: 0.25rem;
-        }
-
-        .stat-card-change.positive { color: var(--accent-green); }
-        .stat-card-change.negative { color: var(--accent-red); }
-
-        /* Panels */
-        .panels-grid {
-            display: grid;
-            grid-template-columns: 2fr 1fr;
-            gap: 1.5rem;
-        }
-
-        @media (max-width: 1024px) {
-            .panels-grid {
-                grid-template-columns: 1fr;
-            }
-        }
-
-        .panel {
-            background: var(--bg-secondary);
-            border: 1px solid var(--border-color);
-            border-radius: 16px;
-            overflow: hidden;
-        }
-
-        .panel-header {
-            padding: 1.25rem 1.5rem;
-            border-bottom: 1px solid var(--border-color);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-
-        .panel-title {
-            font-size: 1rem;
-            font-weight: 600;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-
-        .panel-body {
-            padding: 1rem;
-            max-height: 400px;
-            overflow-y: auto;
-        }
-
-        /* Pool List */
-        .pool-item {
-            display: flex;
-            align-items: center;
-            padding: 1rem;
-            border-radius: 12px;
-            margin-bottom: 0.5rem;
-            background: var(--bg-tertiary);
-            transition: background 0.2s;
-        }
-
-        .pool-item:hover {
-            background: rgba(88, 166, 255, 0.1);
-        }
-
-        .pool-icon {
-            width: 40px;
-            height: 40px;
-            border-radius: 50%;
-            background: var(--gradient-3);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-weight: 600;
-            margin-right: 1rem;
-        }
-
-        .pool-info {
-            flex: 1;
-        }
-
-        .pool-name {
-            font-weight: 600;
-            margin-bottom: 0.25rem;
-        }
-
-        .pool-meta {
-            font-size: 0.75rem;
-            color: var(--text-secondary);
-        }
-
-        .pool-stats {
-            text-align: right;
-        }
-
-        .pool-apy {
-            font-weight: 600;
-            color: var(--accent-green);
-            font-size: 1.125rem;
-        }
-
-        .pool-tvl {
-            font-size: 0.75rem;
-            color: var(--text-secondary);
-        }
-
-        /* Balance Indicator */
-        .balance-bar {
-            display: flex;
-            height: 6px;
-            border-radius: 3px;
-            overflow: hidden;
-            margin-top: 0.5rem;
-        }
-
-        .balance-long {
-            background: var(--accent-green);
-        }
-
-        .balance-short {
-            background: var(--accent-red);
-        }
-
-        /* Alerts */
-        .alert-item {
-            display: flex;
-            align-items: flex-start;
-            padding: 1rem;
-            border-radius: 12px;
-            margin-bottom: 0.5rem;
-            background: var(--bg-tertiary);
-        }
-
-        .alert-item.warning {
-            border-left: 3px solid var(--accent-yellow);
-        }
-
-        .alert-item.critical {
-            border-left: 3px solid var(--accent-red);
-        }
-
-        .alert-icon {
-            margin-right: 1rem;
-            font-size: 1.25rem;
-        }
-
-        .alert-content {
-            flex: 1;
-        }
-
-        .alert-message {
-            font-size: 0.875rem;
-            margin-bottom: 0.25rem;
-        }
-
-        .alert-time {
-            font-size: 0.75rem;
-            color: var(--text-secondary);
-        }
-
-        /* Buttons */
-        .btn {
-            padding: 0.75rem 1.5rem;
-            border-radius: 10px;
-            font-weight: 600;
-            font-size: 0.875rem;
-            cursor: pointer;
-            border: none;
-            transition: all 0.2s;
-        }
-
-        .btn-primary {
-            background: var(--gradient-1);
-            color: white;
-        }
-
-        .btn-primary:hover {
-            transform: translateY(-1px);
-            box-shadow: 0 4px 20px rgba(102, 126, 234, 0.4);
-        }
-
-        .btn-secondary {
-            background: var(--bg-tertiary);
-            color: var(--text-primary);
-            border: 1px solid var(--border-color);
-        }
-
-        /* Run Strategy Modal */
-        .modal {
-            display: none;
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(0, 0, 0, 0.7);
-            justify-content: center;
-            align-items: center;
-            z-index: 1000;
-        }
-
-        .modal.active {
-            display: flex;
-        }
-
-        .modal-content {
-            background: var(--bg-secondary);
-            border-radius: 16px;
-            padding: 2rem;
-            width: 90%;
-            max-width: 400px;
-            border: 1px solid var(--border-color);
-        }
-
-        .modal-title {
-            font-size: 1.25rem;
-            font-weight: 600;
-            margin-bottom: 1.5rem;
-        }
-
-        .form-group {
-            margin-bottom: 1rem;
-        }
-
-        .form-label {
-            display: block;
-            font-size: 0.875rem;
-            color: var(--text-secondary);
-            margin-bottom: 0.5rem;
-        }
-
-        .form-input {
-            width: 100%;
-            padding: 0.75rem 1rem;
-            background: var(--bg-tertiary);
-            border: 1px solid var(--border-color);
-            border-radius: 10px;
-            color: var(--text-primary);
-            font-size: 1rem;
-        }
-
-        .form-input:focus {
-            outline: none;
-            border-color: var(--accent-blue);
-        }
-
-        .checkbox-group {
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-
-        .modal-actions {
-            display: flex;
-            gap: 1rem;
-            margin-top: 1.5rem;
-        }
-
-        .modal-actions .btn {
-            flex: 1;
-        }
-
-        /* Loading */
-        .loading {
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            padding: 2rem;
-        }
-
-        .spinner {
-            width: 40px;
-            height: 40px;
-            border: 3px solid var(--border-color);
-            border-top-color: var(--accent-blue);
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-        }
-
-        @keyframes spin {
-            to { transform: rotate(360deg); }
-        }
-
-        /* Empty State */
-        .empty-state {
-            text-align: center;
-            padding: 2rem;
-            color: var(--text-secondary);
-        }
-
-        .empty-state-icon {
-            font-size: 3rem;
-            margin-bottom: 1rem;
-        }
-    </style>
+    <link rel="stylesheet" href="__DASHBOARD_CSS__">
 </head>
 <body>
     <!-- Header -->
@@ -767,158 +668,54 @@ def get_dashboard_html() -> str:
     </div>
 
     <script>
-        // API 调用函数
-        async function fetchAPI(endpoint, options = {}) {
-            try {
-                const response = await fetch(endpoint, options);
-                return await response.json();
-            } catch (error) {
-                console.error('API Error:', error);
-                return { success: false, error: error.message };
-            }
-        }
+        // 首屏数据 (服务端内嵌)
+        window.__BOOT = __BOOT__;
+    </script>
+    <script src="__DASHBOARD_JS__"></script>
+</body>
+</html>
+    """
 
-        // 刷新状态
-        async function refreshStatus() {
-            const result = await fetchAPI('/api/status');
-            if (result.success) {
-                const data = result.data;
 
-                document.getElementById('total-value').textContent =
-                    `$${(data.risk?.total_value_usd || 0).toLocaleString('en-US', {minimumFractionDigits: 2})}`;
+# 空列表响应 (未配置钱包时的持仓接口)
+_EMPTY_DATA = dumps({"success": True, "data": []})
 
-                const pnl = data.risk?.total_pnl_usd || 0;
-                const pnlElement = document.getElementById('daily-pnl');
-                pnlElement.textContent = `${pnl >= 0 ? '+' : ''}$${pnl.toFixed(2)}`;
-                pnlElement.style.color = pnl >= 0 ? 'var(--accent-green)' : 'var(--accent-red)';
+# 仪表盘静态资源目录
+STATIC_DIR = Path(__file__).parent / "static"
 
-                document.getElementById('positions-count').textContent = data.positions_count || 0;
-                document.getElementById('risk-level').textContent = data.risk?.risk_level || '正常';
-                document.getElementById('alerts-count').textContent = `${data.risk?.active_alerts || 0} 个告警`;
-            }
-        }
 
-        // 刷新池子列表
-        async function refreshPools() {
-            const container = document.getElementById('pools-list');
-            container.innerHTML = '<div class="loading"><div class="spinner"></div></div>';
-
-            const result = await fetchAPI('/api/pools');
-            if (result.success && result.data.length > 0) {
-                container.innerHTML = result.data.map(pool => {
-                    const longPct = pool.long_oi + pool.short_oi > 0
-                        ? (pool.long_oi / (pool.long_oi + pool.short_oi)) * 100
-                        : 50;
-
-                    return `
-                        <div class="pool-item">
-                            <div class="pool-icon">${pool.name.split('-')[0].slice(0, 2)}</div>
-                            <div class="pool-info">
-                                <div class="pool-name">${pool.name}</div>
-                                <div class="pool-meta">
-                                    OI: $${(pool.long_oi / 1e6).toFixed(1)}M / $${(pool.short_oi / 1e6).toFixed(1)}M
-                                </div>
-                                <div class="balance-bar">
-                                    <div class="balance-long" style="width: ${longPct}%"></div>
-                                    <div class="balance-short" style="width: ${100 - longPct}%"></div>
-                                </div>
-                            </div>
-                            <div class="pool-stats">
-                                <div class="pool-apy">${pool.apy.toFixed(1)}%</div>
-                                <div class="pool-tvl">TVL: $${(pool.tvl / 1e6).toFixed(1)}M</div>
-                            </div>
-                        </div>
-                    `;
-                }).join('');
-            } else {
-                container.innerHTML = '<div class="empty-state"><div class="empty-state-icon">🏊</div><p>暂无池子数据</p></div>';
-            }
-        }
+@dataclass(frozen=True)
+class StaticAsset:
+    """内存中的静态资源 (URL 带内容哈希，可永久缓存)"""
 
-        // 刷新告警
-        async function refreshAlerts() {
-            const container = document.getElementById('alerts-list');
-            const result = await fetchAPI('/api/alerts');
-
-            if (result.success && result.data.length > 0) {
-                container.innerHTML = result.data.map(alert => `
-                    <div class="alert-item ${alert.level}">
-                        <div class="alert-icon">${alert.level === 'critical' ? '🚨' : '⚠️'}</div>
-                        <div class="alert-content">
-                            <div class="alert-message">${alert.message}</div>
-                            <div class="alert-time">${alert.market || ''} • ${new Date(alert.timestamp).toLocaleTimeString()}</div>
-                        </div>
-                    </div>
-                `).join('');
-            } else {
-                container.innerHTML = '<div class="empty-state"><div class="empty-state-icon">✅</div><p>暂无告警</p></div>';
-            }
-        }
+    url: str
+    content: bytes
+    media_type: str
 
-        // 刷新所有数据
-        async function refreshAll() {
-            await Promise.all([
-                refreshStatus(),
-                refreshPools(),
-                refreshAlerts()
-            ]);
-        }
 
-        // 打开运行策略模态框
-        function openRunModal() {
-            document.getElementById('run-modal').classList.add('active');
-        }
+def _minify(text: str) -> str:
+    """去掉行首缩进和空行"""
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
 
-        // 关闭模态框
-        function closeRunModal() {
-            document.getElementById('run-modal').classList.remove('active');
-        }
 
-        // 运行策略
-        async function runStrategy() {
-            const capital = parseFloat(document.getElementById('capital-input').value) || 0;
-            const dryRun = document.getElementById('dry-run-check').checked;
-
-            const result = await fetchAPI('/api/run', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ capital, dry_run: dryRun })
-            });
-
-            closeRunModal();
-
-            if (result.success) {
-                if (result.data.length === 0) {
-                    alert('✅ 无需调整');
-                } else {
-                    const signals = result.data.map(s =>
-                        `${s.action === 'deposit' ? '📥' : '📤'} ${s.market}: $${s.amount_usd.toFixed(2)}`
-                    ).join('\\n');
-                    alert(`策略信号:\\n${signals}`);
-                }
-            } else {
-                alert(`❌ 错误: ${result.error}`);
-            }
+def _load_asset(name: str, media_type: str) -> StaticAsset:
+    """读取并压缩静态资源，文件名加上内容哈希"""
+    content = _minify((STATIC_DIR / name).read_text(encoding="utf-8")).encode("utf-8")
+    stem, ext = name.rsplit(".", 1)
+    digest = hashlib.md5(content).hexdigest()[:12]
+    return StaticAsset(f"/static/{stem}.{digest}.{ext}", content, media_type)
 
-            refreshAll();
-        }
-
-        // 初始化
-        document.addEventListener('DOMContentLoaded', () => {
-            refreshAll();
 
-            // 定时刷新
-            setInterval(refreshStatus, 30000);
-            setInterval(refreshPools, 60000);
-        });
+_DASHBOARD_CSS = _load_asset("dashboard.css", "text/css")
+_DASHBOARD_JS = _load_asset("dashboard.js", "application/javascript")
+_STATIC_ASSETS = {asset.url: asset for asset in (_DASHBOARD_CSS, _DASHBOARD_JS)}
 
-        // 点击模态框外部关闭
-        document.getElementById('run-modal').addEventListener('click', (e) => {
-            if (e.target.id === 'run-modal') {
-                closeRunModal();
-            }
-        });
-    </script>
-</body>
-</html>
-    """
+# 仪表盘模板不变，导入时编码一次，在首屏数据占位处切分
+_DASHBOARD_BYTES = (
+    get_dashboard_html()
+    .replace("__DASHBOARD_CSS__", _DASHBOARD_CSS.url)
+    .replace("__DASHBOARD_JS__", _DASHBOARD_JS.url)
+    .encode("utf-8")
+)
+_DASHBOARD_HEAD, _DASHBOARD_TAIL = _DASHBOARD_BYTES.split(b"__BOOT__")
+_DASHBOARD_ETAG = f'"{hashlib.md5(_DASHBOARD_BYTES).hexdigest()}"'
@@ -0,0 +1,262 @@
+// API 调用函数
+async function fetchAPI(endpoint, options = {}) {
+    try {
+        const response = await fetch(endpoint, options);
+        return await response.json();
+    } catch (error) {
+        console.error('API Error:', error);
+        return { success: false, error: error.message };
+    }
+}
+
+// 刷新状态
+async function refreshStatus() {
+    renderStatus(await fetchAPI('/api/status'));
+}
+
+function renderStatus(result) {
+    if (result.success) {
+        const data = result.data;
+
+        document.getElementById('total-value').textContent =
+            `$${(data.risk?.total_value_usd || 0).toLocaleString('en-US', {minimumFractionDigits: 2})}`;
+
+        const pnl = data.risk?.total_pnl_usd || 0;
+        const pnlElement = document.getElementById('daily-pnl');
+        pnlElement.textContent = `${pnl >= 0 ? '+' : ''}$${pnl.toFixed(2)}`;
+        pnlElement.style.color = pnl >= 0 ? 'var(--accent-green)' : 'var(--accent-red)';
+
+        document.getElementById('positions-count').textContent = data.positions_count || 0;
+        document.getElementById('risk-level').textContent = data.risk?.risk_level || '正常';
+        document.getElementById('alerts-count').textContent = `${data.risk?.active_alerts || 0} 个告警`;
+    }
+}
+
+// 刷新池子列表
+async function refreshPools() {
+    const container = document.getElementById('pools-list');
+    if (poolNodes.size === 0) {
+        container.innerHTML = '<div class="loading"><div class="spinner"></div></div>';
+    }
+    renderPools(await fetchAPI('/api/pools'));
+}
+
+// 池子节点 (market_key -> 元素)，刷新时复用节点，只更新变化的字段
+const poolNodes = new Map();
+
+function createPoolNode(pool) {
+    const node = document.createElement('div');
+    node.className = 'pool-item';
+    node.innerHTML = `
+        <div class="pool-icon"></div>
+        <div class="pool-info">
+            <div class="pool-name"></div>
+            <div class="pool-meta"></div>
+            <div class="balance-bar">
+                <div class="balance-long"></div>
+                <div class="balance-short"></div>
+            </div>
+        </div>
+        <div class="pool-stats">
+            <div class="pool-apy"></div>
+            <div class="pool-tvl"></div>
+        </div>
+    `;
+    node.querySelector('.pool-icon').textContent = pool.name.split('-')[0].slice(0, 2);
+    node.querySelector('.pool-name').textContent = pool.name;
+    return node;
+}
+
+function setText(node, selector, text) {
+    const element = node.querySelector(selector);
+    if (element.textContent !== text) {
+        element.textContent = text;
+    }
+}
+
+function setWidth(node, selector, pct) {
+    const element = node.querySelector(selector);
+    const width = `${pct}%`;
+    if (element.style.width !== width) {
+        element.style.width = width;
+    }
+}
+
+function updatePoolNode(node, pool) {
+    const longPct = pool.long_oi + pool.short_oi > 0
+        ? (pool.long_oi / (pool.long_oi + pool.short_oi)) * 100
+        : 50;
+
+    setText(node, '.pool-meta',
+        `OI: $${(pool.long_oi / 1e6).toFixed(1)}M / $${(pool.short_oi / 1e6).toFixed(1)}M`);
+    setWidth(node, '.balance-long', longPct);
+    setWidth(node, '.balance-short', 100 - longPct);
+    setText(node, '.pool-apy', `${pool.apy.toFixed(1)}%`);
+    setText(node, '.pool-tvl', `TVL: $${(pool.tvl / 1e6).toFixed(1)}M`);
+}
+
+function renderPools(result) {
+    const container = document.getElementById('pools-list');
+    if (!(result.success && result.data.length > 0)) {
+        poolNodes.clear();
+        container.innerHTML = '<div class="empty-state"><div class="empty-state-icon">🏊</div><p>暂无池子数据</p></div>';
+        return;
+    }
+
+    if (poolNodes.size === 0) {
+        container.replaceChildren();  // 移除加载/空状态提示
+    }
+
+    const seen = new Set();
+    result.data.forEach((pool, index) => {
+        let node = poolNodes.get(pool.market_key);
+        if (!node) {
+            node = createPoolNode(pool);
+            poolNodes.set(pool.market_key, node);
+        }
+        updatePoolNode(node, pool);
+        if (container.children[index] !== node) {
+            container.insertBefore(node, container.children[index] || null);
+        }
+        seen.add(pool.market_key);
+    });
+
+    // 移除已不在列表中的池子
+    for (const [key, node] of poolNodes) {
+        if (!seen.has(key)) {
+            node.remove();
+            poolNodes.delete(key);
+        }
+    }
+}
+
+// 刷新告警
+async function refreshAlerts() {
+    renderAlerts(await fetchAPI('/api/alerts'));
+}
+
+function renderAlerts(result) {
+    const container = document.getElementById('alerts-list');
+    if (result.success && result.data.length > 0) {
+        container.innerHTML = result.data.map(alert => `
+            <div class="alert-item ${alert.level}">
+                <div class="alert-icon">${alert.level === 'critical' ? '🚨' : '⚠️'}</div>
+                <div class="alert-content">
+                    <div class="alert-message">${alert.message}</div>
+                    <div class="alert-time">${alert.market || ''} • ${new Date(alert.timestamp).toLocaleTimeString()}</div>
+                </div>
+            </div>
+        `).join('');
+    } else {
+        container.innerHTML = '<div class="empty-state"><div class="empty-state-icon">✅</div><p>暂无告警</p></div>';
+    }
+}
+
+// 刷新所有数据
+async function refreshAll() {
+    await Promise.all([
+        refreshStatus(),
+        refreshPools(),
+        refreshAlerts()
+    ]);
+}
+
+// 打开运行策略模态框
+function openRunModal() {
+    document.getElementById('run-modal').classList.add('active');
+}
+
+// 关闭模态框
+function closeRunModal() {
+    document.getElementById('run-modal').classList.remove('active');
+}
+
+// 运行策略
+async function runStrategy() {
+    const capital = parseFloat(document.getElementById('capital-input').value) || 0;
+    const dryRun = document.getElementById('dry-run-check').checked;
+
+    const result = await fetchAPI('/api/run', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ capital, dry_run: dryRun })
+    });
+
+    closeRunModal();
+
+    if (result.success) {
+        if (result.data.length === 0) {
+            alert('✅ 无需调整');
+        } else {
+            const signals = result.data.map(s =>
+                `${s.action === 'deposit' ? '📥' : '📤'} ${s.market}: $${s.amount_usd.toFixed(2)}`
+            ).join('\n');
+            alert(`策略信号:\n${signals}`);
+        }
+    } else {
+        alert(`❌ 错误: ${result.error}`);
+    }
+
+    refreshAll();
+}
+
+// 服务端推送: 页面隐藏时断开，连接失败时按指数退避重连
+const STREAM_RETRY_BASE_MS = 1000;
+const STREAM_RETRY_MAX_MS = 60000;
+let stream = null;
+let streamRetryMs = STREAM_RETRY_BASE_MS;
+let streamRetryTimer = null;
+
+function openStream() {
+    if (stream || document.visibilityState !== 'visible') {
+        return;
+    }
+    stream = new EventSource('/api/stream');
+    stream.addEventListener('open', () => { streamRetryMs = STREAM_RETRY_BASE_MS; });
+    stream.addEventListener('status', e => renderStatus(JSON.parse(e.data)));
+    stream.addEventListener('pools', e => renderPools(JSON.parse(e.data)));
+    stream.addEventListener('alerts', e => renderAlerts(JSON.parse(e.data)));
+    stream.addEventListener('error', () => {
+        // 不使用浏览器的固定间隔自动重连
+        closeStream();
+        streamRetryTimer = setTimeout(openStream, streamRetryMs);
+        streamRetryMs = Math.min(streamRetryMs * 2, STREAM_RETRY_MAX_MS);
+    });
+}
+
+function closeStream() {
+    clearTimeout(streamRetryTimer);
+    if (stream) {
+        stream.close();
+        stream = null;
+    }
+}
+
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'visible') {
+        refreshAll();
+        openStream();
+    } else {
+        closeStream();
+    }
+});
+
+// 初始化
+document.addEventListener('DOMContentLoaded', () => {
+    const boot = window.__BOOT;
+    if (boot) {
+        renderStatus(boot.status);
+        renderPools(boot.pools);
+        renderAlerts(boot.alerts);
+    } else {
+        refreshAll();
+    }
+    openStream();
+});
+
+// 点击模态框外部关闭
+document.getElementById('run-modal').addEventListener('click', (e) => {
+    if (e.target.id === 'run-modal') {
+        closeRunModal();
+    }
+});
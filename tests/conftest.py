@@ -0,0 +1,18 @@
+"""测试公共配置"""
+
+import numpy as np
+import pytest
+
+from gmx_mm.execution import _kernels as risk_kernels
+from gmx_mm.strategy import _kernels as strategy_kernels
+
+
+@pytest.fixture(scope="session", autouse=True)
+def numba_warmup():
+    """安装 numba 时在会话开始前编译各数值内核 (cache=True，之后的运行直接加载缓存)"""
+    if strategy_kernels.njit is None:
+        return
+
+    ones = np.ones(1)
+    strategy_kernels.score_pools_kernel(ones, ones, ones, ones, 30.0, 100.0, 5e7, np.ones(4))
+    risk_kernels.drawdown_levels_kernel(np.zeros(1), ones, 10.0, 15.0)
@@ -0,0 +1,84 @@
+"""热点路径性能基准 (需要 pytest-benchmark，未安装时跳过)"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from gmx_mm.config import Config
+from gmx_mm.data.models import Market, PoolStats, Position
+from gmx_mm.execution.risk import RiskManager
+from gmx_mm.strategy.balanced import BalancedStrategy
+from gmx_mm.utils.positions import PositionBatch
+
+N = 10_000
+
+
+@pytest.fixture(scope="module")
+def positions():
+    """合成持仓 (部分触发回撤/止损)"""
+    return [
+        Position(
+            market_key=f"0x{i:x}",
+            name=f"POOL-{i}",
+            value_usd=1000.0 - i % 200,
+            cost_basis=1000.0,
+            unrealized_pnl=-float(i % 200),
+        )
+        for i in range(N)
+    ]
+
+
+@pytest.fixture(scope="module")
+def markets():
+    """合成市场"""
+    return [
+        Market(
+            market_key=f"0x{i:x}",
+            index_token="0xeth",
+            long_token="0xeth",
+            short_token="0xusdc",
+            name=f"POOL-{i}",
+            pool_tvl=1e6 * (i % 50 + 1),
+            long_oi=500000 + i % 1000,
+            short_oi=500000,
+        )
+        for i in range(N)
+    ]
+
+
+@pytest.fixture(scope="module")
+def stats(markets):
+    """合成池子统计"""
+    return {
+        m.market_key: PoolStats(market_key=m.market_key, name=m.name, apy=5.0 + i % 40)
+        for i, m in enumerate(markets)
+    }
+
+
+class TestRiskBenchmarks:
+    """风控基准"""
+
+    def test_check_drawdown(self, benchmark, positions):
+        """基准: 回撤检查"""
+        benchmark.group = "drawdown"
+        risk_manager = RiskManager(Config())
+        batch = PositionBatch.from_positions(positions)
+
+        alerts = benchmark.pedantic(
+            risk_manager._check_drawdown, args=(batch,), rounds=20, warmup_rounds=5
+        )
+        assert alerts
+
+
+class TestStrategyBenchmarks:
+    """策略基准"""
+
+    def test_score_pools(self, benchmark, markets, stats):
+        """基准: 批量评分"""
+        benchmark.group = "score_pools"
+        strategy = BalancedStrategy(Config())
+
+        scores = benchmark.pedantic(
+            strategy.score_pools, args=(markets, stats), rounds=20, warmup_rounds=5
+        )
+        assert len(scores) == N
@@ -1,8 +1,8 @@
 """配置模块测试 (白盒测试)"""
 
 import os
-import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 import yaml
@@ -14,6 +14,7 @@ from gmx_mm.config import (
     StrategyConfig,
     RiskConfig,
     PoolsConfig,
+    _load_dotenv,
 )
 
 
@@ -103,16 +104,11 @@ class TestPoolsConfig:
 class TestConfig:
     """主配置类测试"""
 
-    def test_default_config(self):
-        """测试默认配置"""
-        config = Config()
-        assert config.network.chain == "arbitrum"
-        assert config.strategy.type == "balanced"
-        assert config.risk.max_position_usd == 10000.0
-
-    def test_load_from_yaml(self):
-        """测试从 YAML 文件加载"""
-        yaml_content = """
+    @pytest.fixture(scope="class")
+    def yaml_config_file(self, tmp_path_factory):
+        """写入一次、供本类测试共用的 YAML 配置文件"""
+        config_file = tmp_path_factory.mktemp("config") / "config.yaml"
+        config_file.write_text("""
 network:
   chain: avalanche
   rpc_url: https://custom.rpc
@@ -124,19 +120,88 @@ strategy:
 risk:
   max_position_usd: 50000
   stop_loss_pct: 20.0
-"""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
+""")
+        return config_file
 
-            config = Config.load(f.name)
-
-            assert config.network.chain == "avalanche"
-            assert config.strategy.type == "high_yield"
-            assert config.strategy.min_apy == 15.0
-            assert config.risk.max_position_usd == 50000.0
+    def test_default_config(self):
+        """测试默认配置"""
+        config = Config()
+        assert config.network.chain == "arbitrum"
+        assert config.strategy.type == "balanced"
+        assert config.risk.max_position_usd == 10000.0
 
-            os.unlink(f.name)
+    def test_load_from_yaml(self, yaml_config_file):
+        """测试从 YAML 文件加载"""
+        config = Config.load(str(yaml_config_file))
+
+        assert config.network.chain == "avalanche"
+        assert config.strategy.type == "high_yield"
+        assert config.strategy.min_apy == 15.0
+        assert config.risk.max_position_usd == 50000.0
+
+    def test_load_reparses_changed_file(self, tmp_path):
+        """测试配置文件变化后重新解析"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("strategy:\n  min_apy: 15.0\n")
+
+        first = Config.load(str(config_file))
+        first.pools.whitelist.append("DOGE-USDC")
+        assert first.strategy.min_apy == 15.0
+
+        config_file.write_text("strategy:\n  min_apy: 25.0\n  max_pools: 3\n")
+        second = Config.load(str(config_file))
+
+        assert second.strategy.min_apy == 25.0
+        assert second.strategy.max_pools == 3
+        assert "DOGE-USDC" not in second.pools.whitelist
+
+    def test_load_cached_copy_is_independent(self, tmp_path):
+        """测试缓存的解析结果不会被配置对象修改"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("pools:\n  whitelist:\n    - ETH-USDC\n")
+
+        first = Config.load(str(config_file))
+        first.pools.whitelist.append("BTC-USDC")
+
+        second = Config.load(str(config_file))
+        assert second.pools.whitelist == ["ETH-USDC"]
+
+    def test_from_dict_nested_sections(self):
+        """测试从字典加载分组键和嵌套配置段 (不经过 YAML)"""
+        data = {
+            "strategy": {"rebalance_interval": 3600},
+            "pools": {"filters": {"min_tvl": 5000000}, "whitelist": ["ETH-USDC"]},
+            "notifications": {
+                "telegram": {"enabled": True, "bot_token": "ignored"},
+                "alerts": {"daily_report": False, "apy_change_threshold": 8.0},
+            },
+        }
+
+        config = Config.from_dict(data)
+
+        assert config.strategy.rebalance_interval == 3600
+        assert config.pools.min_tvl == 5000000
+        assert config.notifications.telegram.enabled is True
+        assert config.notifications.telegram.bot_token == ""
+        assert config.notifications.daily_report is False
+        assert config.notifications.apy_change_threshold == 8.0
+
+        config.pools.whitelist.append("BTC-USDC")
+        assert data["pools"]["whitelist"] == ["ETH-USDC"]
+
+    def test_yaml_does_not_override_secrets(self, tmp_path):
+        """测试 YAML 不会覆盖环境变量中的敏感信息"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text('wallet:\n  address: "0xabc"\n  private_key: "from_yaml"\n')
+
+        os.environ["PRIVATE_KEY"] = "from_env"
+        try:
+            config = Config.load(str(config_file))
+        finally:
+            del os.environ["PRIVATE_KEY"]
+
+        assert config.wallet.address == "0xabc"
+        assert config.wallet.private_key == "from_env"
 
     def test_load_from_env(self):
         """测试从环境变量加载"""
@@ -152,45 +217,61 @@ risk:
         del os.environ["PRIVATE_KEY"]
         del os.environ["ARBITRUM_RPC_URL"]
 
-    def test_validate_missing_private_key(self):
-        """测试验证 - 缺少私钥"""
-        config = Config()
-        config.wallet.private_key = ""
-
-        errors = config.validate()
-        assert "PRIVATE_KEY 未设置" in errors
-
-    def test_validate_invalid_apy(self):
-        """测试验证 - 无效 APY"""
+    def test_dotenv_loaded_once(self):
+        """测试 .env 每个进程只加载一次，环境变量仍每次读取"""
+        _load_dotenv.cache_clear()
+        with patch("gmx_mm.config.load_dotenv") as load_dotenv:
+            Config.load()
+            os.environ["ARBITRUM_RPC_URL"] = "https://later.rpc"
+            try:
+                config = Config.load()
+            finally:
+                del os.environ["ARBITRUM_RPC_URL"]
+
+        load_dotenv.assert_called_once()
+        assert config.network.rpc_url == "https://later.rpc"
+
+    @pytest.fixture(scope="class")
+    def base_config(self):
+        """本类共用的有效配置 (用例通过 monkeypatch 修改，结束后自动还原)"""
         config = Config()
         config.wallet.private_key = "test"
-        config.strategy.min_apy = -5.0
+        return config
+
+    @pytest.mark.parametrize(
+        "section, attr, value, expected",
+        [
+            ("wallet", "private_key", "", "PRIVATE_KEY 未设置"),
+            ("strategy", "min_apy", -5.0, "min_apy 不能为负数"),
+            ("risk", "max_position_usd", 0, "max_position_usd 必须大于 0"),
+            ("strategy", "max_single_pool_pct", 150, "max_single_pool_pct 必须在 0-100 之间"),
+        ],
+    )
+    def test_validate_invalid(self, base_config, monkeypatch, section, attr, value, expected):
+        """测试验证 - 缺少私钥 / 无效 APY / 无效仓位 / 无效单池占比"""
+        monkeypatch.setattr(getattr(base_config, section), attr, value)
+
+        assert base_config.validate() == [expected]
 
-        errors = config.validate()
-        assert "min_apy 不能为负数" in errors
-
-    def test_validate_invalid_position(self):
-        """测试验证 - 无效仓位"""
+    def test_validate_success(self):
+        """测试验证 - 成功"""
         config = Config()
-        config.wallet.private_key = "test"
-        config.risk.max_position_usd = 0
+        config.wallet.private_key = "test_key"
 
         errors = config.validate()
-        assert "max_position_usd 必须大于 0" in errors
+        assert len(errors) == 0
 
-    def test_validate_invalid_pool_pct(self):
-        """测试验证 - 无效单池占比"""
+    def test_iter_errors_lazy(self):
+        """测试错误按常见程度排序，is_valid 遇到第一个错误即停止"""
         config = Config()
-        config.wallet.private_key = "test"
+        config.wallet.private_key = ""
         config.strategy.max_single_pool_pct = 150
 
-        errors = config.validate()
-        assert "max_single_pool_pct 必须在 0-100 之间" in errors
+        errors = config.iter_errors()
+        assert next(errors) == "PRIVATE_KEY 未设置"
+        assert config.validate() == ["PRIVATE_KEY 未设置", "max_single_pool_pct 必须在 0-100 之间"]
+        assert config.is_valid() is False
 
-    def test_validate_success(self):
-        """测试验证 - 成功"""
-        config = Config()
         config.wallet.private_key = "test_key"
-
-        errors = config.validate()
-        assert len(errors) == 0
+        config.strategy.max_single_pool_pct = 30
+        assert config.is_valid() is True
@@ -3,13 +3,12 @@
 这些测试模拟真实用户场景，不关心内部实现细节。
 """
 
-import os
-import tempfile
+import copy
 from unittest.mock import Mock, patch, MagicMock
 
 import pytest
 
-from gmx_mm.config import Config
+from gmx_mm.config import Config, ConfigError
 from gmx_mm.data.models import Market, PoolStats, Position
 from gmx_mm.strategy.engine import StrategyEngine
 from gmx_mm.execution.risk import RiskManager
@@ -39,9 +38,9 @@ class MockDataFetcher:
 class TestUserScenarios:
     """用户场景测试"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def mock_markets(self):
-        """模拟市场数据"""
+        """模拟市场数据 (本类共用，修改前需先复制)"""
         return [
             Market(
                 market_key="0x001",
@@ -78,9 +77,14 @@ class TestUserScenarios:
             ),
         ]
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
+    def markets_by_key(self, mock_markets):
+        """market_key -> 市场 (本类共用)"""
+        return {m.market_key: m for m in mock_markets}
+
+    @pytest.fixture(scope="class")
     def mock_stats(self):
-        """模拟池子统计"""
+        """模拟池子统计 (本类共用)"""
         return {
             "0x001": PoolStats(market_key="0x001", name="ETH-USDC", apy=18.5),
             "0x002": PoolStats(market_key="0x002", name="BTC-USDC", apy=15.2),
@@ -118,12 +122,13 @@ class TestUserScenarios:
         assert len(deposit_signals) > 0
 
         # 总投资不超过可用资金
-        total_deposit = sum(s.amount_usd for s in deposit_signals)
-        assert total_deposit <= 1000.0
+        assert signals.total_deposit_usd == sum(s.amount_usd for s in deposit_signals)
+        assert signals.total_deposit_usd <= 1000.0
 
-        # 应该分散到多个池子
-        pools = set(s.market_name for s in deposit_signals)
-        assert len(pools) >= 2
+        # 应该分散到多个池子 (出现第二个不同池子即可)
+        names = (s.market_name for s in deposit_signals)
+        first = next(names)
+        assert any(name != first for name in names)
 
     def test_scenario_exit_low_apy_pool(self, mock_markets, mock_stats):
         """
@@ -162,7 +167,7 @@ class TestUserScenarios:
         assert len(withdraw_signals) > 0
         assert withdraw_signals[0].market_key == "0x001"
 
-    def test_scenario_risk_alert_triggered(self, mock_markets, mock_stats):
+    def test_scenario_risk_alert_triggered(self, markets_by_key, mock_stats):
         """
         场景: 持仓亏损触发风险告警
 
@@ -185,10 +190,8 @@ class TestUserScenarios:
             )
         ]
 
-        markets = {m.market_key: m for m in mock_markets}
-
         risk_manager = RiskManager(config)
-        alerts = risk_manager.check_all(positions, markets, mock_stats)
+        alerts = risk_manager.check_all(positions, markets_by_key, mock_stats)
 
         # 应该有回撤预警
         assert len(alerts) > 0
@@ -196,7 +199,7 @@ class TestUserScenarios:
         assert len(drawdown_alerts) == 1
         assert drawdown_alerts[0].level == "warning"
 
-    def test_scenario_stop_loss_triggered(self, mock_markets, mock_stats):
+    def test_scenario_stop_loss_triggered(self, markets_by_key, mock_stats):
         """
         场景: 持仓亏损触发止损
 
@@ -218,8 +221,6 @@ class TestUserScenarios:
             )
         ]
 
-        markets = {m.market_key: m for m in mock_markets}
-
         risk_manager = RiskManager(config)
 
         # 应该触发紧急退出
@@ -227,7 +228,7 @@ class TestUserScenarios:
         assert should_exit is True
 
         # 应该有止损告警
-        alerts = risk_manager.check_all(positions, markets, mock_stats)
+        alerts = risk_manager.check_all(positions, markets_by_key, mock_stats)
         stop_loss_alerts = [a for a in alerts if a.type == "stop_loss"]
         assert len(stop_loss_alerts) == 1
         assert stop_loss_alerts[0].level == "critical"
@@ -259,7 +260,7 @@ class TestUserScenarios:
         # 第一个应该是最高 APY 的 ARB-USDC (24.3%)
         assert deposit_signals[0].market_name == "ARB-USDC"
 
-    def test_scenario_rebalance_concentrated_position(self, mock_markets, mock_stats):
+    def test_scenario_rebalance_concentrated_position(self, markets_by_key, mock_stats):
         """
         场景: 仓位过于集中需要再平衡
 
@@ -275,16 +276,14 @@ class TestUserScenarios:
             Position(market_key="0x002", name="BTC-USDC", value_usd=300.0),
         ]
 
-        markets = {m.market_key: m for m in mock_markets}
-
         risk_manager = RiskManager(config)
-        alerts = risk_manager.check_all(positions, markets, mock_stats)
+        alerts = risk_manager.check_all(positions, markets_by_key, mock_stats)
 
         # 应该有集中度告警
         concentration_alerts = [a for a in alerts if a.type == "concentration"]
         assert len(concentration_alerts) == 1
 
-    def test_scenario_oi_imbalance_warning(self, mock_markets, mock_stats):
+    def test_scenario_oi_imbalance_warning(self, markets_by_key, mock_stats):
         """
         场景: 多空严重失衡告警
 
@@ -296,15 +295,14 @@ class TestUserScenarios:
         config.risk.max_oi_imbalance = 0.3
 
         # 修改市场数据为严重失衡
-        mock_markets[0].long_oi = 800000
-        mock_markets[0].short_oi = 200000
+        markets = copy.deepcopy(markets_by_key)
+        markets["0x001"].long_oi = 800000
+        markets["0x001"].short_oi = 200000
 
         positions = [
             Position(market_key="0x001", name="ETH-USDC", value_usd=1000.0)
         ]
 
-        markets = {m.market_key: m for m in mock_markets}
-
         risk_manager = RiskManager(config)
         alerts = risk_manager.check_all(positions, markets, mock_stats)
 
@@ -317,15 +315,11 @@ class TestUserScenarios:
 class TestConfigurationScenarios:
     """配置场景测试"""
 
-    def test_scenario_load_config_from_file(self):
-        """
-        场景: 从配置文件加载设置
-
-        Given: 用户创建了配置文件
-        When: 加载配置
-        Then: 应该正确读取所有设置
-        """
-        yaml_content = """
+    @pytest.fixture(scope="class")
+    def config_file(self, tmp_path_factory):
+        """用户创建的配置文件 (写入一次，本类测试共用)"""
+        path = tmp_path_factory.mktemp("config") / "config.yaml"
+        path.write_text("""
 network:
   chain: arbitrum
   rpc_url: https://arb1.arbitrum.io/rpc
@@ -345,21 +339,25 @@ pools:
     - BTC-USDC
   blacklist:
     - DOGE-USDC
-"""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
+""")
+        return path
 
-            config = Config.load(f.name)
+    def test_scenario_load_config_from_file(self, config_file):
+        """
+        场景: 从配置文件加载设置
 
-            assert config.network.chain == "arbitrum"
-            assert config.strategy.min_apy == 15.0
-            assert config.strategy.max_single_pool_pct == 25.0
-            assert config.risk.max_position_usd == 50000
-            assert "ETH-USDC" in config.pools.whitelist
-            assert "DOGE-USDC" in config.pools.blacklist
+        Given: 用户创建了配置文件
+        When: 加载配置
+        Then: 应该正确读取所有设置
+        """
+        config = Config.load(str(config_file))
 
-            os.unlink(f.name)
+        assert config.network.chain == "arbitrum"
+        assert config.strategy.min_apy == 15.0
+        assert config.strategy.max_single_pool_pct == 25.0
+        assert config.risk.max_position_usd == 50000
+        assert "ETH-USDC" in config.pools.whitelist
+        assert "DOGE-USDC" in config.pools.blacklist
 
     def test_scenario_validate_invalid_config(self):
         """
@@ -377,9 +375,9 @@ pools:
         errors = config.validate()
 
         assert len(errors) >= 3
-        assert any("PRIVATE_KEY" in e for e in errors)
-        assert any("min_apy" in e for e in errors)
-        assert any("max_position_usd" in e for e in errors)
+        assert ConfigError.MISSING_PRIVATE_KEY in errors
+        assert ConfigError.NEGATIVE_MIN_APY in errors
+        assert ConfigError.INVALID_MAX_POSITION in errors
 
 
 class TestEdgeCases:
@@ -0,0 +1,462 @@
+"""交易执行器测试 (白盒测试)"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from web3 import Web3
+
+from gmx_mm.config import Config
+from gmx_mm.execution.executor import (
+    ERC20_ABI,
+    ERC20_ENCODERS,
+    EXCHANGE_ROUTER_ABI,
+    MAX_UINT256,
+    ROUTER_ENCODERS,
+    GasFees,
+    TradeExecutor,
+    _cs,
+)
+from gmx_mm.utils.http import json_rpc_batch
+
+TOKEN = "0xaf88d065e77c8cc2239327c5edb3a432268e5831"
+FEE_HISTORY = {"baseFeePerGas": ["0x5f", "0x64"], "reward": [["0x2"]]}
+CHECKSUM_TOKEN = Web3.to_checksum_address(TOKEN)
+SPENDER = "0xF89e77e8Dc11691C9e8757e84aaFbCD8A67d7A55"
+
+
+@pytest.fixture
+def executor():
+    """创建不连接真实 RPC 的执行器"""
+    config = Config()
+    config.wallet.private_key = "0x" + "11" * 32
+    executor = TradeExecutor(config)
+    executor.session = MagicMock(close=AsyncMock())  # 跳过 connect()
+    return executor
+
+
+class TestChecksumCache:
+    """checksum 地址缓存测试"""
+
+    def test_cs_matches_web3(self):
+        """测试缓存结果与 Web3 一致，重复地址命中缓存"""
+        _cs.cache_clear()
+
+        assert _cs(TOKEN) == Web3.to_checksum_address(TOKEN)
+        assert _cs(TOKEN) == CHECKSUM_TOKEN
+        assert _cs.cache_info().hits == 1
+
+
+class TestCallEncoder:
+    """预解析调用编码器测试"""
+
+    def test_matches_web3_encoding(self):
+        """测试编码结果与 web3 合约对象一致 (含 dict 形式的 tuple 参数)"""
+        zero = "0x0000000000000000000000000000000000000000"
+        params = {
+            "receiver": CHECKSUM_TOKEN,
+            "callbackContract": zero,
+            "uiFeeReceiver": zero,
+            "market": CHECKSUM_TOKEN,
+            "longTokenSwapPath": [CHECKSUM_TOKEN],
+            "shortTokenSwapPath": [],
+            "minLongTokenAmount": 1,
+            "minShortTokenAmount": 2,
+            "shouldUnwrapNativeToken": True,
+            "executionFee": 3,
+            "callbackGasLimit": 0,
+        }
+        router = Web3().eth.contract(abi=EXCHANGE_ROUTER_ABI)
+        erc20 = Web3().eth.contract(abi=ERC20_ABI)
+
+        assert (
+            ROUTER_ENCODERS["createWithdrawal"].encode(params, 5).hex()
+            == router.encodeABI(fn_name="createWithdrawal", args=[params, 5])[2:]
+        )
+        assert (
+            ERC20_ENCODERS["allowance"].encode(CHECKSUM_TOKEN, SPENDER).hex()
+            == erc20.encodeABI(fn_name="allowance", args=[CHECKSUM_TOKEN, SPENDER])[2:]
+        )
+
+
+class TestContractCache:
+    """合约查询缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_decimals_cached(self, executor):
+        """测试 decimals 只在首次预检时查询"""
+        batch = AsyncMock(
+            side_effect=[
+                ["0x5", FEE_HISTORY, "0x6", "0x0"],
+                ["0xf4240"],
+            ]
+        )
+        fees = GasFees(base_fee=100, priority_fee=2)
+
+        with patch("gmx_mm.execution.executor.json_rpc_batch", batch):
+            assert await executor._preflight([TOKEN], SPENDER) == (fees, {CHECKSUM_TOKEN: (6, 0)})
+            assert executor._nonce == 5
+
+            # 第二次预检不再查询 decimals 和 nonce，费用使用缓存
+            assert await executor._preflight([TOKEN], SPENDER) == (
+                fees,
+                {CHECKSUM_TOKEN: (6, 10**6)},
+            )
+
+        second_calls = batch.call_args.args[2]
+        assert [method for method, _ in second_calls] == ["eth_call"]
+
+
+class TestAllowance:
+    """代币授权测试"""
+
+    @pytest.mark.asyncio
+    async def test_unlimited_allowance_skips_approve(self, executor):
+        """测试已无限额授权时不发送交易，之后不再查询授权额度"""
+        token_states = {CHECKSUM_TOKEN: (6, MAX_UINT256)}
+        executor._send_transaction = AsyncMock()
+
+        fees = GasFees(base_fee=100, priority_fee=0)
+        assert await executor._ensure_allowance(TOKEN, SPENDER, token_states, fees) is None
+        assert (CHECKSUM_TOKEN, Web3.to_checksum_address(SPENDER)) in executor._approved
+        executor._send_transaction.assert_not_called()
+
+        batch = AsyncMock(return_value=["0x7", FEE_HISTORY, "0x6"])
+        with patch("gmx_mm.execution.executor.json_rpc_batch", batch):
+            _, states = await executor._preflight([TOKEN], SPENDER)
+
+        assert states == {CHECKSUM_TOKEN: (6, MAX_UINT256)}
+        assert len(batch.call_args.args[2]) == 3  # nonce + 费用 + decimals
+
+    @pytest.mark.asyncio
+    async def test_approve_sends_encoded_call(self, executor):
+        """测试额度不足时向代币合约发送 approve 调用"""
+        token_states = {CHECKSUM_TOKEN: (6, 0)}
+        executor._send_transaction = AsyncMock(return_value=b"hash")
+        executor._wait_for_receipt = AsyncMock(return_value={"status": 1})
+
+        fees = GasFees(base_fee=100, priority_fee=0)
+        await (await executor._ensure_allowance(TOKEN, SPENDER, token_states, fees))
+
+        to, data, tx_fees = executor._send_transaction.call_args.args
+        erc20 = Web3().eth.contract(abi=ERC20_ABI)
+        fn, args = erc20.decode_function_input(data)
+        assert to == CHECKSUM_TOKEN
+        assert fn.fn_name == "approve" and args["amount"] == MAX_UINT256
+        assert (CHECKSUM_TOKEN, Web3.to_checksum_address(SPENDER)) in executor._approved
+        assert executor._approvals == {}
+
+    @pytest.mark.asyncio
+    async def test_approve_wait_releases_lock(self, executor):
+        """测试等待授权回执时释放下单锁，授权确认后重新预检再下单"""
+        fees = GasFees(base_fee=100, priority_fee=0)
+        executor._preflight = AsyncMock(
+            side_effect=[
+                (fees, {CHECKSUM_TOKEN: (6, 0)}),
+                (GasFees(base_fee=200, priority_fee=0), {CHECKSUM_TOKEN: (6, MAX_UINT256)}),
+            ]
+        )
+        executor._send_transaction = AsyncMock(return_value=b"approve")
+        executor._send_multicall = AsyncMock(return_value=b"hash")
+
+        async def wait_for_receipt(tx_hash, timeout):
+            assert not executor._submit_lock.locked()
+            return {"status": 1, "gasUsed": 21000}
+
+        executor._wait_for_receipt = AsyncMock(side_effect=wait_for_receipt)
+
+        order = await executor.deposit(
+            "0x" + "22" * 20, "ETH-USDC", TOKEN, TOKEN, 1.0, dry_run=False
+        )
+
+        assert order.status.value == "executed"
+        assert executor._preflight.call_count == 2
+        assert executor._send_multicall.call_args.args[2].base_fee == 200
+
+    @pytest.mark.asyncio
+    async def test_approve_reverted(self, executor):
+        """测试授权交易回滚时订单失败，不记录为已授权，下次预检重新查询授权额度"""
+        executor._preflight = AsyncMock(
+            return_value=(GasFees(base_fee=100, priority_fee=0), {CHECKSUM_TOKEN: (6, 0)})
+        )
+        executor._send_transaction = AsyncMock(return_value=b"hash")
+        executor._wait_for_receipt = AsyncMock(return_value={"status": 0})
+        executor._send_multicall = AsyncMock()
+
+        order = await executor.deposit("0x1", "ETH-USDC", TOKEN, TOKEN, 1.0, dry_run=False)
+
+        assert order.status.value == "failed"
+        assert "授权交易失败" in order.error
+        assert executor._approved == set()
+        executor._send_multicall.assert_not_called()
+
+
+class TestMulticall:
+    """multicall 下单测试"""
+
+    @pytest.mark.asyncio
+    async def test_deposit_bundles_calls(self, executor):
+        """测试执行费、代币转账和创建订单合并为一笔交易"""
+        fees = GasFees(base_fee=10, priority_fee=0)
+        executor._preflight = AsyncMock(return_value=(fees, {CHECKSUM_TOKEN: (6, MAX_UINT256)}))
+        executor._send_multicall = AsyncMock(return_value=b"hash")
+
+        assert await executor._submit_deposit("0x" + "22" * 20, TOKEN, TOKEN, 1.0, 2.0) == b"hash"
+
+        calls, value, tx_fees = executor._send_multicall.call_args.args
+        router = Web3().eth.contract(abi=EXCHANGE_ROUTER_ABI)
+        names = [router.decode_function_input(data)[0].fn_name for data in calls]
+        assert names == ["sendWnt", "sendTokens", "sendTokens", "createDeposit"]
+        assert router.decode_function_input(calls[2])[1]["amount"] == 2 * 10**6
+        assert value == executor._calculate_execution_fee(fees)
+        assert tx_fees == fees
+
+    @pytest.mark.asyncio
+    async def test_multicall_calldata(self, executor):
+        """测试 multicall 调用数据直接编码后发往 ExchangeRouter"""
+        executor._send_transaction = AsyncMock(return_value=b"hash")
+        fees = GasFees(base_fee=10, priority_fee=0)
+
+        await executor._send_multicall([b"\x01", b"\x02"], 7, fees)
+
+        (to, data, _), kwargs = executor._send_transaction.call_args
+        router = Web3().eth.contract(abi=EXCHANGE_ROUTER_ABI)
+        fn, args = router.decode_function_input(data)
+        assert to == executor.exchange_router
+        assert fn.fn_name == "multicall" and args["data"] == [b"\x01", b"\x02"]
+        assert kwargs == {"value": 7, "gas": 500000}
+
+
+class TestNonceManager:
+    """本地 nonce 管理测试"""
+
+    @staticmethod
+    def _patch_send(executor, send_side_effect, sync):
+        """替换签名、广播和 nonce 查询"""
+        eth = executor.w3.eth
+        executor._chain_id = 42161
+        sign = MagicMock(side_effect=lambda tx: MagicMock(raw_transaction=tx["nonce"]))
+        return (
+            patch.object(executor.account, "sign_transaction", sign),
+            patch.object(
+                type(eth), "send_raw_transaction", AsyncMock(side_effect=send_side_effect)
+            ),
+            patch.object(type(eth), "get_transaction_count", sync),
+        )
+
+    @pytest.mark.asyncio
+    async def test_nonce_increments_locally(self, executor):
+        """测试连续交易本地递增 nonce，不再查询节点"""
+        executor._nonce = 10
+        sync = AsyncMock(return_value=20)
+        fees = GasFees(base_fee=1, priority_fee=0)
+
+        sign, send, count = self._patch_send(executor, lambda raw: f"tx{raw}", sync)
+        with sign as sign_tx, send, count:
+            assert await executor._send_transaction(CHECKSUM_TOKEN, b"", fees) == "tx10"
+            assert await executor._send_transaction(CHECKSUM_TOKEN, b"", fees) == "tx11"
+
+        sync.assert_not_called()
+        assert executor._nonce == 12
+        tx = sign_tx.call_args.args[0]
+        assert tx["to"] == CHECKSUM_TOKEN and tx["gas"] == 100000
+        assert tx["chainId"] == 42161 and tx["type"] == 2
+
+    @pytest.mark.asyncio
+    async def test_resync_on_nonce_error(self, executor):
+        """测试节点报 nonce 错误时重新同步并重试"""
+        executor._nonce = 10
+
+        def send_raw(raw):
+            if raw == 10:
+                raise ValueError({"code": -32000, "message": "nonce too low"})
+            return f"tx{raw}"
+
+        sync = AsyncMock(return_value=20)
+        fees = GasFees(base_fee=1, priority_fee=0)
+
+        sign, send, count = self._patch_send(executor, send_raw, sync)
+        with sign, send, count:
+            assert await executor._send_transaction(CHECKSUM_TOKEN, b"", fees) == "tx20"
+
+        assert executor._nonce == 21
+
+
+class TestReceiptPoller:
+    """交易回执批量轮询测试"""
+
+    @pytest.mark.asyncio
+    async def test_pending_hashes_share_batch(self, executor, monkeypatch):
+        """测试多笔待确认交易合并为一次批量查询，未打包的下一轮继续查询"""
+        monkeypatch.setattr("gmx_mm.execution.executor.RECEIPT_POLL_INTERVAL", 0)
+        receipt = {"status": "0x1", "gasUsed": "0x5208"}
+        batch = AsyncMock(side_effect=[[None, receipt], [receipt]])
+
+        with patch("gmx_mm.execution.executor.json_rpc_batch", batch):
+            first, second = await asyncio.gather(
+                executor._wait_for_receipt(b"\x01" * 32, timeout=5),
+                executor._wait_for_receipt(b"\x02" * 32, timeout=5),
+            )
+
+        assert first == second == {"status": 1, "gasUsed": 21000}
+        assert [len(call.args[2]) for call in batch.call_args_list] == [2, 1]
+        assert executor._pending_receipts == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_hash_does_not_block_others(self, executor, monkeypatch):
+        """测试单笔回执查询出错时其他交易照常确认"""
+        monkeypatch.setattr("gmx_mm.execution.executor.RECEIPT_POLL_INTERVAL", 0)
+        receipt = {"status": "0x1", "gasUsed": "0x5208"}
+        batch = AsyncMock(return_value=[RuntimeError("unknown hash"), receipt])
+
+        with patch("gmx_mm.execution.executor.json_rpc_batch", batch):
+            bad = asyncio.create_task(executor._wait_for_receipt(b"\x01" * 32, timeout=0.05))
+            await asyncio.sleep(0)  # 先登记出错的交易
+            good = await executor._wait_for_receipt(b"\x02" * 32, timeout=5)
+            with pytest.raises(TimeoutError):
+                await bad
+
+        assert good == {"status": 1, "gasUsed": 21000}
+        assert batch.call_args.args[3] is True
+        await executor.close()
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, executor, monkeypatch):
+        """测试超时抛出 TimeoutError 并移除等待项"""
+        monkeypatch.setattr("gmx_mm.execution.executor.RECEIPT_POLL_INTERVAL", 0)
+        batch = AsyncMock(return_value=[None])
+
+        with patch("gmx_mm.execution.executor.json_rpc_batch", batch):
+            with pytest.raises(TimeoutError):
+                await executor._wait_for_receipt(b"\x01" * 32, timeout=0.05)
+
+        assert executor._pending_receipts == {}
+        await executor.close()
+
+
+class TestDepositMany:
+    """并发存款测试"""
+
+    @pytest.mark.asyncio
+    async def test_dry_run_preserves_order(self, executor):
+        """测试模拟模式下批量存款按输入顺序返回订单"""
+        orders = await executor.deposit_many(
+            [
+                {
+                    "market_key": key,
+                    "market_name": name,
+                    "long_token": TOKEN,
+                    "short_token": TOKEN,
+                    "long_amount": 1.0,
+                }
+                for key, name in (("0x1", "ETH-USDC"), ("0x2", "BTC-USDC"))
+            ]
+        )
+
+        assert [o.market_name for o in orders] == ["ETH-USDC", "BTC-USDC"]
+        assert all(o.status.value == "executed" for o in orders)
+
+
+class TestFeeCache:
+    """EIP-1559 费用缓存测试"""
+
+    def test_fees_from_history(self, executor):
+        """测试由 feeHistory 计算费用，过期后失效"""
+        fees = executor._update_fees(FEE_HISTORY)
+
+        assert fees == GasFees(base_fee=100, priority_fee=2)
+        assert fees.max_fee == 202
+        assert executor._cached_fees() is fees
+
+        executor._fee_cache = (0.0, fees)
+        assert executor._cached_fees() is None
+
+
+class TestJsonRpcBatch:
+    """JSON-RPC 批量请求测试"""
+
+    @staticmethod
+    def _session(body):
+        response = MagicMock()
+        response.json = AsyncMock(return_value=body)
+        session = MagicMock()
+        session.post.return_value.__aenter__ = AsyncMock(return_value=response)
+        session.post.return_value.__aexit__ = AsyncMock(return_value=False)
+        return session
+
+    @pytest.mark.asyncio
+    async def test_results_aligned_by_id(self):
+        """测试乱序响应按 id 对齐"""
+        session = self._session([{"id": 1, "result": "0x2"}, {"id": 0, "result": "0x1"}])
+
+        results = await json_rpc_batch(session, "http://rpc", [("eth_a", []), ("eth_b", [])])
+
+        assert results == ["0x1", "0x2"]
+
+    @pytest.mark.asyncio
+    async def test_error_raises(self):
+        """测试任一调用出错时抛出异常"""
+        session = self._session([{"id": 0, "error": {"code": -32000, "message": "boom"}}])
+
+        with pytest.raises(RuntimeError):
+            await json_rpc_batch(session, "http://rpc", [("eth_a", [])])
+
+    @pytest.mark.asyncio
+    async def test_return_exceptions(self):
+        """测试 return_exceptions 时失败的调用以异常对象返回，其余结果不受影响"""
+        session = self._session(
+            [{"id": 0, "error": {"code": -32000, "message": "boom"}}, {"id": 1, "result": "0x1"}]
+        )
+
+        calls = [("eth_a", []), ("eth_b", []), ("eth_c", [])]
+        error, result, missing = await json_rpc_batch(
+            session, "http://rpc", calls, return_exceptions=True
+        )
+
+        assert isinstance(error, RuntimeError) and "boom" in str(error)
+        assert result == "0x1"
+        assert isinstance(missing, RuntimeError)
+
+
+class TestSession:
+    """RPC 会话生命周期测试"""
+
+    @pytest.mark.asyncio
+    async def test_connect_and_close(self, executor):
+        """测试 connect 按配置创建连接池并缓存 chain id，close 释放会话"""
+        executor.config.network.rpc_pool_size = 8
+        executor.session = None
+
+        chain_id = AsyncMock(return_value=42161)
+        with (
+            patch.object(type(executor.w3), "is_connected", AsyncMock(return_value=True)),
+            patch.object(type(executor.w3.eth), "chain_id", property(lambda _: chain_id())),
+        ):
+            await executor.connect()
+
+        session = executor.session
+        assert session.connector.limit == 8
+        assert executor._chain_id == 42161
+
+        await executor.close()
+        assert session.closed
+        assert executor.session is None
+
+    @pytest.mark.asyncio
+    async def test_rpc_batch_connects_lazily(self, executor):
+        """测试未调用 connect() 时批量请求先建立连接"""
+        executor.session = None
+        executor._nonce = 7
+
+        async def connect():
+            executor.session = MagicMock()
+
+        batch = AsyncMock(return_value=[FEE_HISTORY])
+        with (
+            patch.object(executor, "connect", AsyncMock(side_effect=connect)) as connect_mock,
+            patch("gmx_mm.execution.executor.json_rpc_batch", batch),
+        ):
+            await executor._preflight([], SPENDER)
+
+        connect_mock.assert_awaited_once()
+        assert batch.call_args.args[0] is executor.session
@@ -0,0 +1,295 @@
+"""数据获取辅助工具测试 (白盒测试)"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gmx_mm.data.models import Market, PoolStats
+from gmx_mm.utils.fetch import CachedFetcher, FetchContext, MarketsIndex, fetch_pool_stats
+
+MARKET = Market(
+    market_key="0x1",
+    index_token="0xeth",
+    long_token="0xeth",
+    short_token="0xusdc",
+    name="ETH-USDC",
+)
+
+
+class CountingFetcher:
+    """记录调用次数的模拟数据获取器"""
+
+    def __init__(self, stats=None):
+        self._stats = stats or {}
+        self.calls = {"markets": 0, "pool_stats": 0, "positions": 0}
+
+    def get_markets(self, force_refresh=False):
+        self.calls["markets"] += 1
+        return [MARKET]
+
+    def get_pool_stats(self, market_key):
+        self.calls["pool_stats"] += 1
+        return self._stats.get(market_key)
+
+    def get_positions(self, address):
+        self.calls["positions"] += 1
+        return ["position"]
+
+
+class TestFetchPoolStats:
+    """并发获取池子统计测试"""
+
+    def test_fetch_all(self):
+        """测试获取全部统计，缺失的市场被跳过"""
+        stats = {
+            "0x001": PoolStats(market_key="0x001", name="ETH-USDC", apy=18.5),
+            "0x002": PoolStats(market_key="0x002", name="BTC-USDC", apy=15.2),
+        }
+        fetcher = CountingFetcher(stats)
+
+        result = fetch_pool_stats(fetcher, ["0x001", "0x002", "0x003"])
+
+        assert set(result) == {"0x001", "0x002"}
+        assert result["0x001"].apy == 18.5
+        assert fetcher.calls["pool_stats"] == 3
+
+    def test_fetch_skips_failed_market(self):
+        """测试线程池路径单个市场失败时返回其余结果"""
+        stats = {f"0x{i}": PoolStats(market_key=f"0x{i}", name=f"POOL-{i}") for i in range(10)}
+
+        class FlakyFetcher(CountingFetcher):
+            def get_pool_stats(self, market_key):
+                if market_key == "0xbad":
+                    raise ConnectionError("rpc error")
+                return super().get_pool_stats(market_key)
+
+        result = fetch_pool_stats(FlakyFetcher(stats), ["0xbad", *stats])
+
+        assert set(result) == set(stats)
+
+    def test_fetch_prefers_multicall(self):
+        """测试获取器支持 multicall 时合并为一次批量查询"""
+        stats = {"0x001": PoolStats(market_key="0x001", name="ETH-USDC", apy=18.5)}
+        fetcher = CountingFetcher(stats)
+        batches = []
+
+        def get_pool_stats_multicall(market_keys):
+            batches.append(market_keys)
+            return {key: stats.get(key) for key in market_keys}
+
+        fetcher.get_pool_stats_multicall = get_pool_stats_multicall
+
+        result = fetch_pool_stats(fetcher, ["0x001", "0x002"])
+
+        assert list(result) == ["0x001"]
+        assert batches == [["0x001", "0x002"]]
+        assert fetcher.calls["pool_stats"] == 0
+
+    def test_multicall_batches(self):
+        """测试超过 batch_size 时分批查询，失败的批次跳过"""
+        batches = []
+
+        def get_pool_stats_multicall(market_keys):
+            batches.append(market_keys)
+            if "0x2" in market_keys:
+                raise ConnectionError("batch too large")
+            return {key: PoolStats(market_key=key, name=key) for key in market_keys}
+
+        fetcher = CountingFetcher()
+        fetcher.get_pool_stats_multicall = get_pool_stats_multicall
+
+        result = fetch_pool_stats(fetcher, ["0x0", "0x1", "0x2", "0x3", "0x4"], batch_size=2)
+
+        assert batches == [["0x0", "0x1"], ["0x2", "0x3"], ["0x4"]]
+        assert list(result) == ["0x0", "0x1", "0x4"]
+
+    def test_fetch_empty(self):
+        """测试空市场列表"""
+        assert fetch_pool_stats(CountingFetcher(), []) == {}
+
+
+class TestCachedFetcher:
+    """TTL 缓存获取器测试"""
+
+    @pytest.fixture
+    def stats(self):
+        return {"0x001": PoolStats(market_key="0x001", name="ETH-USDC", apy=18.5)}
+
+    def test_cache_hit(self, stats):
+        """测试 TTL 内重复调用命中缓存"""
+        inner = CountingFetcher(stats)
+        fetcher = CachedFetcher(inner)
+
+        fetcher.get_markets()
+        fetcher.get_markets()
+        fetcher.get_pool_stats("0x001")
+        fetcher.get_pool_stats("0x001")
+        fetcher.get_positions("0xabc")
+        fetcher.get_positions("0xabc")
+
+        assert inner.calls == {"markets": 1, "pool_stats": 1, "positions": 1}
+
+    def test_cache_expired(self, stats):
+        """测试 TTL 过期后重新获取"""
+        inner = CountingFetcher(stats)
+        fetcher = CachedFetcher(inner, stats_ttl=0)
+
+        fetcher.get_pool_stats("0x001")
+        fetcher.get_pool_stats("0x001")
+
+        assert inner.calls["pool_stats"] == 2
+
+    def test_missing_stats_not_cached(self):
+        """测试空结果不缓存"""
+        inner = CountingFetcher()
+        fetcher = CachedFetcher(inner)
+
+        assert fetcher.get_pool_stats("0x999") is None
+        assert fetcher.get_pool_stats("0x999") is None
+        assert inner.calls["pool_stats"] == 2
+
+    def test_batch_only_fetches_missing(self, stats):
+        """测试批量获取只请求未命中缓存的市场"""
+        stats["0x002"] = PoolStats(market_key="0x002", name="BTC-USDC", apy=15.2)
+        inner = CountingFetcher(stats)
+        fetcher = CachedFetcher(inner)
+
+        fetcher.get_pool_stats("0x001")
+        result = fetch_pool_stats(fetcher, ["0x001", "0x002"])
+
+        assert set(result) == {"0x001", "0x002"}
+        assert inner.calls["pool_stats"] == 2
+
+        fetch_pool_stats(fetcher, ["0x001", "0x002"])
+        assert inner.calls["pool_stats"] == 2
+
+    def test_batch_without_multicall(self, monkeypatch):
+        """测试原获取器不支持 multicall 时逐个走缓存，沿用 max_workers 且保留部分结果"""
+        stats = {f"0x{i}": PoolStats(market_key=f"0x{i}", name=f"POOL-{i}") for i in range(10)}
+
+        class FlakyFetcher(CountingFetcher):
+            def get_pool_stats(self, market_key):
+                if market_key == "0xbad":
+                    raise ConnectionError("rpc error")
+                return super().get_pool_stats(market_key)
+
+        workers = []
+        real_pool = ThreadPoolExecutor
+        monkeypatch.setattr(
+            "gmx_mm.utils.fetch.ThreadPoolExecutor",
+            lambda max_workers: workers.append(max_workers) or real_pool(max_workers),
+        )
+        inner = FlakyFetcher(stats)
+        fetcher = CachedFetcher(inner)
+
+        result = fetch_pool_stats(fetcher, ["0xbad", *stats], max_workers=2)
+        assert set(result) == set(stats)
+        assert workers == [2]
+
+        fetch_pool_stats(fetcher, list(stats), max_workers=2)
+        assert inner.calls["pool_stats"] == 10
+
+    def test_concurrent_requests_coalesce(self, stats):
+        """测试多个线程同时请求同一池子时只请求一次"""
+        started = threading.Event()
+        release = threading.Event()
+
+        class SlowFetcher(CountingFetcher):
+            def get_pool_stats(self, market_key):
+                started.set()
+                release.wait(1)
+                return super().get_pool_stats(market_key)
+
+        inner = SlowFetcher(stats)
+        fetcher = CachedFetcher(inner)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(fetcher.get_pool_stats, "0x001") for _ in range(4)]
+            started.wait(1)
+            time.sleep(0.05)  # 其余线程进入等待
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert inner.calls["pool_stats"] == 1
+        assert all(r is stats["0x001"] for r in results)
+
+    def test_force_refresh_and_invalidate(self, stats):
+        """测试强制刷新和清空缓存"""
+        inner = CountingFetcher(stats)
+        fetcher = CachedFetcher(inner)
+
+        fetcher.get_markets()
+        fetcher.get_markets(force_refresh=True)
+        assert inner.calls["markets"] == 2
+
+        fetcher.invalidate()
+        fetcher.get_markets()
+        assert inner.calls["markets"] == 3
+
+    def test_invalidate_markets(self, stats):
+        """测试只清空市场列表缓存，池子统计缓存保留"""
+        inner = CountingFetcher(stats)
+        fetcher = CachedFetcher(inner)
+        fetcher.get_markets()
+        fetcher.get_pool_stats("0x001")
+
+        fetcher.invalidate_markets()
+        fetcher.get_markets()
+        fetcher.get_pool_stats("0x001")
+
+        assert inner.calls["markets"] == 2
+        assert inner.calls["pool_stats"] == 1
+
+
+class TestMarketsIndex:
+    """市场索引测试"""
+
+    def test_behaves_like_list(self):
+        """测试索引可按列表使用，并可按地址查找"""
+        other = Market(
+            market_key="0x2",
+            index_token="0xbtc",
+            long_token="0xbtc",
+            short_token="0xusdc",
+            name="BTC-USDC",
+        )
+        index = MarketsIndex.from_markets([MARKET, other])
+
+        assert len(index) == 2
+        assert list(index) == [MARKET, other]
+        assert index[:1] == (MARKET,)
+        assert index.by_key["0x2"] is other
+        assert "0x1" in index.by_key
+
+        with pytest.raises(TypeError):
+            index.by_key["0x3"] = other
+
+    def test_cached_index_reused(self):
+        """测试 TTL 窗口内返回同一个索引对象"""
+        fetcher = CachedFetcher(CountingFetcher())
+
+        first = fetcher.get_markets()
+        assert isinstance(first, MarketsIndex)
+        assert fetcher.get_markets() is first
+        assert first.by_key["0x1"] is MARKET
+
+
+class TestFetchContext:
+    """单次任务数据快照测试"""
+
+    def test_memoizes_for_lifetime(self):
+        """测试同一上下文内查询只请求一次，新上下文重新请求"""
+        inner = CountingFetcher()
+
+        ctx = FetchContext(inner)
+        ctx.get_positions("0xabc")
+        ctx.get_positions("0xabc")
+        ctx.get_markets()
+        ctx.get_markets()
+        assert inner.calls["positions"] == 1
+        assert inner.calls["markets"] == 1
+
+        FetchContext(inner).get_positions("0xabc")
+        assert inner.calls["positions"] == 2
@@ -0,0 +1,65 @@
+"""通知模块测试 (白盒测试)"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from gmx_mm.config import Config
+from gmx_mm.utils.notifications import TelegramNotifier
+
+
+@pytest.fixture
+def notifier():
+    """创建已启用、不访问网络的通知器"""
+    config = Config()
+    config.notifications.telegram.enabled = True
+    config.notifications.telegram.bot_token = "token"
+    config.notifications.telegram.chat_id = "42"
+    notifier = TelegramNotifier(config)
+    notifier.session = MagicMock()
+    yield notifier
+    notifier.close()
+
+
+class TestTelegramNotifier:
+    """Telegram 通知器测试"""
+
+    def test_disabled_does_not_queue(self):
+        """测试未启用时不启动后台线程"""
+        notifier = TelegramNotifier(Config())
+
+        assert notifier.send("hello") is False
+        assert notifier._worker is None
+
+    def test_send_is_queued_and_drained(self, notifier):
+        """测试消息放入队列，由后台线程按顺序发送，close 时发送完毕"""
+        assert notifier.send("first") is True
+        assert notifier.send("second") is True
+
+        notifier.close()
+
+        payloads = [call.kwargs["data"] for call in notifier.session.post.call_args_list]
+        assert len(payloads) == 2
+        assert b"first" in payloads[0] and b"second" in payloads[1]
+        assert notifier._worker is None
+
+    def test_send_failure_does_not_stop_worker(self, notifier):
+        """测试单条消息发送失败后继续发送后续消息"""
+        notifier.session.post.side_effect = [ConnectionError("down"), MagicMock()]
+
+        notifier.send("first")
+        notifier.send("second")
+        notifier.close()
+
+        assert notifier.session.post.call_count == 2
+
+    def test_trade_notification_format(self, notifier):
+        """测试交易通知模板 (含交易链接)"""
+        notifier.send = MagicMock(return_value=True)
+
+        notifier.send_trade_notification("withdraw", "ETH-USDC", 1234.5, tx_hash="0xab")
+
+        message = notifier.send.call_args.args[0]
+        assert message.startswith("📤 <b>交易执行</b>\n\n<b>操作:</b> 提取")
+        assert "<b>金额:</b> $1,234.50\n\n<b>交易:</b>" in message
+        assert message.endswith("<a href='https://arbiscan.io/tx/0xab'>查看</a>")
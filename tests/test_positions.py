@@ -0,0 +1,51 @@
+"""持仓批量计算测试 (白盒测试)"""
+
+from gmx_mm.data.models import Position
+from gmx_mm.utils.positions import PositionBatch
+
+
+class TestPositionBatch:
+    """PositionBatch 测试"""
+
+    def test_from_positions(self):
+        """测试从持仓列表构建并汇总"""
+        positions = [
+            Position(market_key="0x001", name="ETH-USDC", value_usd=600.0, unrealized_pnl=100.0),
+            Position(market_key="0x002", name="BTC-USDC", value_usd=400.0, unrealized_pnl=-50.0),
+        ]
+
+        batch = PositionBatch.from_positions(positions)
+
+        assert len(batch) == 2
+        assert list(batch) == positions
+        assert batch.value_usd.tolist() == [600.0, 400.0]
+        assert batch.total_value == 1000.0
+        assert batch.total_pnl == 50.0
+
+    def test_empty(self):
+        """测试空持仓"""
+        batch = PositionBatch.from_positions([])
+
+        assert len(batch) == 0
+        assert batch.total_value == 0.0
+        assert batch.total_pnl == 0.0
+
+    def test_pnl_and_concentration(self):
+        """测试收益率与集中度与逐个计算一致"""
+        positions = [
+            Position(
+                market_key="0x001",
+                name="ETH-USDC",
+                value_usd=750.0,
+                cost_basis=1000.0,
+                unrealized_pnl=-250.0,
+            ),
+            Position(market_key="0x002", name="BTC-USDC", value_usd=250.0, cost_basis=0),
+        ]
+
+        batch = PositionBatch.from_positions(positions)
+
+        assert batch.pnl_pct.tolist() == [p.pnl_pct for p in positions]
+        assert batch.concentration_pct.tolist() == [75.0, 25.0]
+        assert batch.total_cost == 1000.0
+        assert PositionBatch.from_positions([]).concentration_pct.size == 0
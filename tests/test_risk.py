@@ -1,11 +1,24 @@
 """风险管理模块测试 (白盒测试)"""
 
 import pytest
+from dataclasses import replace
 from datetime import datetime
 
 from gmx_mm.config import Config
 from gmx_mm.data.models import Market, PoolStats, Position
-from gmx_mm.execution.risk import RiskManager, RiskAlert
+from gmx_mm.execution.risk import AlertLog, RiskManager, RiskAlert
+from gmx_mm.utils.positions import PositionBatch
+
+# 测试用告警模板，需要多条时用 replace 复制
+_WARNING = RiskAlert(
+    level="warning",
+    type="test",
+    market_key=None,
+    market_name=None,
+    message="",
+    value=0,
+    threshold=0,
+)
 
 
 class TestRiskAlert:
@@ -23,10 +36,8 @@ class TestRiskAlert:
             threshold=-10.0,
         )
 
-        assert alert.level == "warning"
-        assert alert.type == "drawdown"
-        assert alert.acknowledged is False
-        assert alert.timestamp is not None
+        assert (alert.level, alert.type, alert.acknowledged) == ("warning", "drawdown", False)
+        assert isinstance(alert.timestamp, float) and alert.timestamp > 0
 
     def test_alert_emoji(self):
         """测试告警 emoji"""
@@ -43,17 +54,31 @@ class TestRiskAlert:
             message="", value=0, threshold=0
         )
 
-        assert info_alert.emoji == "ℹ️"
-        assert warning_alert.emoji == "⚠️"
-        assert critical_alert.emoji == "🚨"
+        assert (info_alert.emoji, warning_alert.emoji, critical_alert.emoji) == ("ℹ️", "⚠️", "🚨")
+
+    def test_alert_slots(self):
+        """测试告警不带 __dict__"""
+        alert = RiskAlert(
+            level="info",
+            type="test",
+            market_key=None,
+            market_name=None,
+            message="",
+            value=0,
+            threshold=0,
+        )
+
+        assert not hasattr(alert, "__dict__")
+        with pytest.raises(AttributeError):
+            alert.extra = 1
 
 
 class TestRiskManager:
     """风险管理器测试"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def config(self):
-        """创建测试配置"""
+        """创建测试配置 (本类共用，只读)"""
         config = Config()
         config.risk.max_drawdown_pct = 10.0
         config.risk.stop_loss_pct = 15.0
@@ -67,57 +92,40 @@ class TestRiskManager:
         """创建风险管理器"""
         return RiskManager(config)
 
-    def test_check_drawdown_normal(self, risk_manager):
-        """测试回撤检查 - 正常"""
-        positions = [
-            Position(
-                market_key="0x001",
-                name="ETH-USDC",
-                value_usd=1000.0,
-                cost_basis=1000.0,
-                unrealized_pnl=0.0,
-            )
-        ]
-
-        alerts = risk_manager._check_drawdown(positions)
-        assert len(alerts) == 0
-
-    def test_check_drawdown_warning(self, risk_manager):
-        """测试回撤检查 - 预警"""
-        positions = [
-            Position(
-                market_key="0x001",
-                name="ETH-USDC",
-                value_usd=890.0,
-                cost_basis=1000.0,
-                unrealized_pnl=-110.0,  # -11%
-            )
-        ]
-
-        alerts = risk_manager._check_drawdown(positions)
-        assert len(alerts) == 1
-        assert alerts[0].level == "warning"
-        assert alerts[0].type == "drawdown"
-
-    def test_check_drawdown_stop_loss(self, risk_manager):
-        """测试回撤检查 - 止损"""
+    @pytest.mark.parametrize(
+        "pnl, expected",
+        [
+            (0.0, []),  # 正常
+            (-110.0, [("warning", "drawdown")]),  # -11%, 预警
+            (-160.0, [("critical", "stop_loss")]),  # -16%, 止损
+        ],
+        ids=["normal", "warning", "stop_loss"],
+    )
+    def test_check_drawdown(self, risk_manager, pnl, expected):
+        """测试回撤检查 - 正常 / 预警 / 止损"""
         positions = [
             Position(
                 market_key="0x001",
                 name="ETH-USDC",
-                value_usd=840.0,
+                value_usd=1000.0 + pnl,
                 cost_basis=1000.0,
-                unrealized_pnl=-160.0,  # -16%
+                unrealized_pnl=pnl,
             )
         ]
 
         alerts = risk_manager._check_drawdown(positions)
-        assert len(alerts) == 1
-        assert alerts[0].level == "critical"
-        assert alerts[0].type == "stop_loss"
-
-    def test_check_oi_imbalance_normal(self, risk_manager):
-        """测试多空失衡检查 - 正常"""
+        assert [(a.level, a.type) for a in alerts] == expected
+
+    @pytest.mark.parametrize(
+        "long_oi, short_oi, expected",
+        [
+            (500000, 500000, None),  # 平衡
+            (800000, 200000, "多头"),  # 多头偏重
+        ],
+        ids=["normal", "warning"],
+    )
+    def test_check_oi_imbalance(self, risk_manager, long_oi, short_oi, expected):
+        """测试多空失衡检查 - 正常 / 预警"""
         positions = [
             Position(market_key="0x001", name="ETH-USDC")
         ]
@@ -128,58 +136,77 @@ class TestRiskManager:
                 long_token="0x",
                 short_token="0x",
                 name="ETH-USDC",
-                long_oi=500000,
-                short_oi=500000,  # 平衡
+                long_oi=long_oi,
+                short_oi=short_oi,
             )
         }
 
         alerts = risk_manager._check_oi_imbalance(positions, markets)
-        assert len(alerts) == 0
-
-    def test_check_oi_imbalance_warning(self, risk_manager):
-        """测试多空失衡检查 - 预警"""
+        if expected is None:
+            assert len(alerts) == 0
+        else:
+            assert [a.type for a in alerts] == ["imbalance"]
+            assert expected in alerts[0].message
+
+    def test_check_oi_imbalance_batch(self, risk_manager):
+        """测试多个持仓一次检查，只对失衡且有市场数据的持仓告警"""
         positions = [
-            Position(market_key="0x001", name="ETH-USDC")
+            Position(market_key="0x001", name="ETH-USDC"),
+            Position(market_key="0x002", name="BTC-USDC"),
+            Position(market_key="0x003", name="ARB-USDC"),  # 无市场数据
         ]
         markets = {
-            "0x001": Market(
-                market_key="0x001",
+            key: Market(
+                market_key=key,
                 index_token="0x",
                 long_token="0x",
                 short_token="0x",
-                name="ETH-USDC",
-                long_oi=800000,
-                short_oi=200000,  # 多头偏重
+                name=key,
+                long_oi=long_oi,
+                short_oi=short_oi,
             )
+            for key, long_oi, short_oi in [("0x001", 500000, 500000), ("0x002", 100000, 900000)]
         }
 
         alerts = risk_manager._check_oi_imbalance(positions, markets)
-        assert len(alerts) == 1
-        assert alerts[0].type == "imbalance"
-        assert "多头" in alerts[0].message
+        assert [a.market_name for a in alerts] == ["BTC-USDC"]
+        assert "空头" in alerts[0].message
+        assert risk_manager._check_oi_imbalance([], markets) == []
 
-    def test_check_concentration_normal(self, risk_manager):
-        """测试仓位集中度检查 - 正常"""
-        # 最高占比 35%，低于 30%*1.2=36%
+    def test_check_apy_low(self, risk_manager):
+        """测试 APY 低于阈值 (默认 10%) 的持仓产生提示，无统计数据的持仓跳过"""
         positions = [
-            Position(market_key="0x001", name="ETH-USDC", value_usd=350.0),
-            Position(market_key="0x002", name="BTC-USDC", value_usd=350.0),
-            Position(market_key="0x003", name="ARB-USDC", value_usd=300.0),
+            Position(market_key="0x001", name="ETH-USDC"),
+            Position(market_key="0x002", name="BTC-USDC"),
+            Position(market_key="0x003", name="ARB-USDC"),  # 无统计数据
         ]
+        stats = {
+            "0x001": PoolStats(market_key="0x001", name="ETH-USDC", apy=5.0),
+            "0x002": PoolStats(market_key="0x002", name="BTC-USDC", apy=15.0),
+        }
 
-        alerts = risk_manager._check_concentration(positions)
-        assert len(alerts) == 0  # 最高 35%，低于 30%*1.2=36%
-
-    def test_check_concentration_warning(self, risk_manager):
-        """测试仓位集中度检查 - 预警"""
+        alerts = risk_manager._check_apy_changes(positions, stats)
+        assert [(a.type, a.market_name, a.value) for a in alerts] == [("apy_low", "ETH-USDC", 5.0)]
+
+    @pytest.mark.parametrize(
+        "values, expected_count",
+        [
+            ([350.0, 350.0, 300.0], 0),  # 最高 35%，低于 30%*1.2=36%
+            ([100.0, 900.0], 1),  # 90%
+        ],
+        ids=["normal", "warning"],
+    )
+    def test_check_concentration(self, risk_manager, values, expected_count):
+        """测试仓位集中度检查 - 正常 / 预警"""
+        names = ["ETH-USDC", "BTC-USDC", "ARB-USDC"]
         positions = [
-            Position(market_key="0x001", name="ETH-USDC", value_usd=100.0),
-            Position(market_key="0x002", name="BTC-USDC", value_usd=900.0),  # 90%
+            Position(market_key=f"0x00{i + 1}", name=names[i], value_usd=value)
+            for i, value in enumerate(values)
         ]
 
         alerts = risk_manager._check_concentration(positions)
-        assert len(alerts) == 1
-        assert alerts[0].type == "concentration"
+        assert len(alerts) == expected_count
+        assert all(a.type == "concentration" for a in alerts)
 
     def test_check_all_multiple_alerts(self, risk_manager):
         """测试全面检查 - 多个告警"""
@@ -212,6 +239,48 @@ class TestRiskManager:
         # 应该有多个告警
         assert len(alerts) >= 2
 
+    def test_check_all_accepts_batch(self, risk_manager):
+        """测试传入 PositionBatch 时派生列在同一轮检查中复用"""
+        positions = [
+            Position(
+                market_key="0x001",
+                name="ETH-USDC",
+                value_usd=840.0,
+                cost_basis=1000.0,
+                unrealized_pnl=-160.0,
+            )
+        ]
+        batch = PositionBatch.from_positions(positions)
+
+        alerts = risk_manager.check_all(batch, {}, {})
+        pnl_pct = batch.pnl_pct
+
+        assert [a.type for a in alerts] == ["stop_loss", "concentration"]
+        assert risk_manager.should_emergency_exit(batch) is True
+        assert batch.pnl_pct is pnl_pct
+        assert len(risk_manager.position_history["0x001"]) == 1
+
+    def test_stats_keys(self, risk_manager):
+        """测试只需获取持仓所在池子的统计"""
+        positions = [
+            Position(market_key="0x001", name="ETH-USDC", value_usd=500.0),
+            Position(market_key="0x002", name="BTC-USDC", value_usd=500.0),
+        ]
+
+        assert risk_manager.stats_keys(positions) == {"0x001", "0x002"}
+        assert risk_manager.stats_keys([]) == set()
+
+    def test_position_history_bounded(self, risk_manager):
+        """测试持仓历史只保留最近的数据点"""
+        for i in range(150):
+            positions = [Position(market_key="0x001", name="ETH-USDC", value_usd=float(i))]
+            risk_manager.check_all(positions, {}, {})
+
+        history = risk_manager.position_history["0x001"]
+        assert len(history) == 100
+        assert history[0] == 50.0
+        assert history[-1] == 149.0
+
     def test_should_emergency_exit_no(self, risk_manager):
         """测试紧急退出判断 - 否"""
         positions = [
@@ -288,6 +357,47 @@ class TestRiskManager:
         assert summary["max_concentration_pct"] == 60.0  # 600/1000
         assert summary["risk_level"] == "正常"
 
+    def test_alert_log_bounded(self):
+        """测试告警记录定长，丢弃的未确认告警不再计数"""
+        log = AlertLog(maxlen=2)
+        log.extend([replace(_WARNING, level=level) for level in ("critical", "warning", "warning")])
+
+        assert len(log) == 2
+        assert log.active_count("critical") == 0
+        assert log.active_count("warning") == 2
+
+        assert log.acknowledge(0) is True
+        assert log.acknowledge(0) is True  # 重复确认不重复扣减
+        assert log.active_count() == 1
+        assert log.acknowledge(5) is False
+
+    def test_active_alerts_cached(self):
+        """测试未确认告警列表在变更前复用，确认或丢弃后更新"""
+        log = AlertLog(maxlen=2)
+        alerts = [
+            RiskAlert(
+                level="warning",
+                type="test",
+                market_key=None,
+                market_name=str(i),
+                message="",
+                value=0,
+                threshold=0,
+            )
+            for i in range(3)
+        ]
+        log.extend(alerts[:2])
+
+        active = log.active()
+        assert active == alerts[:2]
+        assert log.active() is active
+
+        log.acknowledge(0)
+        assert log.active() == [alerts[1]]
+
+        log.append(alerts[2])  # 丢弃已确认的 alerts[0]
+        assert log.active() == alerts[1:]
+
     def test_calculate_risk_level(self, risk_manager):
         """测试风险等级计算"""
         positions = []
@@ -296,22 +406,37 @@ class TestRiskManager:
         assert risk_manager._calculate_risk_level(positions) == "正常"
 
         # 添加警告
-        for i in range(3):
-            risk_manager.alerts.append(
-                RiskAlert(
-                    level="warning", type="test", market_key=None, market_name=None,
-                    message="", value=0, threshold=0
-                )
-            )
+        risk_manager.alerts.extend([replace(_WARNING) for _ in range(3)])
 
         assert risk_manager._calculate_risk_level(positions) == "较高"
 
         # 添加危险
-        risk_manager.alerts.append(
-            RiskAlert(
-                level="critical", type="test", market_key=None, market_name=None,
-                message="", value=0, threshold=0
-            )
-        )
+        risk_manager.alerts.append(replace(_WARNING, level="critical"))
 
         assert risk_manager._calculate_risk_level(positions) == "危险"
+
+
+class TestRiskKernel:
+    """风控内核测试"""
+
+    def test_drawdown_levels(self):
+        """测试回撤等级: 零成本持仓不检查，止损优先于预警"""
+        import numpy as np
+
+        from gmx_mm.execution import _kernels
+
+        pnl_pct = np.array([0.0, -11.0, -16.0, -50.0])
+        cost_basis = np.array([1000.0, 1000.0, 1000.0, 0.0])
+
+        levels = _kernels._drawdown_levels_numpy(pnl_pct, cost_basis, 10.0, 15.0)
+        assert levels.tolist() == [
+            _kernels.DRAWDOWN_OK,
+            _kernels.DRAWDOWN_WARNING,
+            _kernels.DRAWDOWN_STOP_LOSS,
+            _kernels.DRAWDOWN_OK,
+        ]
+
+        if _kernels.njit is not None:
+            np.testing.assert_array_equal(
+                _kernels._drawdown_levels_jit(pnl_pct, cost_basis, 10.0, 15.0), levels
+            )
@@ -1,11 +1,17 @@
 """策略模块测试 (白盒测试)"""
 
+import copy
+import dataclasses
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
 import pytest
 
 from gmx_mm.config import Config
 from gmx_mm.data.models import Market, PoolStats, Position
 from gmx_mm.strategy.base import BaseStrategy, Signal
 from gmx_mm.strategy.balanced import BalancedStrategy
+from gmx_mm.strategy.engine import STRATEGIES, StrategyEngine
 from gmx_mm.strategy.high_yield import HighYieldStrategy
 
 
@@ -41,13 +47,27 @@ class TestSignal:
         assert "ETH-USDC" in str(signal)
         assert "500.00" in str(signal)
 
+    def test_signal_immutable(self):
+        """测试信号不可修改，可作为集合元素去重"""
+        signal = Signal(
+            action="deposit",
+            market_key="0x123",
+            market_name="ETH-USDC",
+            amount_usd=1000.0,
+            reason="高 APY",
+        )
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            signal.amount_usd = 1.0
+        assert len({signal, dataclasses.replace(signal)}) == 1
+
 
 class TestBalancedStrategy:
     """平衡策略测试"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def config(self):
-        """创建测试配置"""
+        """创建测试配置 (本类共用，用例通过 monkeypatch 修改)"""
         config = Config()
         config.strategy.type = "balanced"
         config.strategy.min_apy = 10.0
@@ -62,9 +82,9 @@ class TestBalancedStrategy:
         """创建策略实例"""
         return BalancedStrategy(config)
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def sample_markets(self):
-        """创建样本市场"""
+        """创建样本市场 (本类共用，不应修改)"""
         return [
             Market(
                 market_key="0x001",
@@ -98,9 +118,9 @@ class TestBalancedStrategy:
             ),
         ]
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def sample_stats(self):
-        """创建样本统计"""
+        """创建样本统计 (本类共用，用例通过 monkeypatch 修改)"""
         return {
             "0x001": PoolStats(market_key="0x001", name="ETH-USDC", apy=18.5),
             "0x002": PoolStats(market_key="0x002", name="BTC-USDC", apy=15.2),
@@ -121,10 +141,43 @@ class TestBalancedStrategy:
         assert score.balance_score > 0
         assert score.total_score > 0
 
+    def test_score_pools_matches_formula(self, strategy, sample_markets, sample_stats):
+        """测试批量评分与逐项公式一致，缺少统计的市场跳过"""
+        stats = dict(sample_stats)
+        del stats["0x002"]
+
+        scores = strategy.score_pools(sample_markets, stats)
+
+        assert [s.market_key for s in scores] == ["0x001", "0x003"]
+        arb = scores[1]
+        market = sample_markets[2]
+        assert arb.apy_score == pytest.approx(24.3 / 30 * 100)
+        assert arb.risk_score == pytest.approx(
+            (10 - stats["0x003"].calculate_risk_score(market)) * 10
+        )
+        assert arb.liquidity_score == pytest.approx(20.0)  # $10M / $50M
+        assert arb.balance_score == pytest.approx((1 - market.oi_imbalance) * 100)
+        for score in scores:
+            # 综合评分与模型的加权和定义一致
+            assert score.total_score == pytest.approx(score.calculate_total_score(strategy.weights))
+        assert scores[0].liquidity_score == 100
+
+    def test_risk_score_cached(self, strategy, sample_markets, sample_stats):
+        """测试同一批数据在打分和信号生成之间只计算一次风险分，新一轮数据重新计算"""
+        with patch.object(PoolStats, "calculate_risk_score", return_value=5.0) as risk:
+            strategy.score_pools(sample_markets, sample_stats)
+            strategy.score_pools(sample_markets, sample_stats)
+            strategy.generate_signals(sample_markets, sample_stats, [], 0)
+            assert risk.call_count == 3
+
+            new_stats = {k: copy.copy(v) for k, v in sample_stats.items()}
+            strategy.generate_signals(sample_markets, new_stats, [], 0)
+            assert risk.call_count == 6
+
     def test_filter_pools_whitelist(self, strategy, sample_markets):
         """测试白名单过滤"""
         # 添加一个不在白名单的市场
-        sample_markets.append(
+        markets = sample_markets + [
             Market(
                 market_key="0x999",
                 index_token="0xdoge",
@@ -132,26 +185,31 @@ class TestBalancedStrategy:
                 short_token="0xusdc",
                 name="DOGE-USDC",
             )
-        )
+        ]
 
-        filtered = strategy.filter_pools(sample_markets)
+        filtered = strategy.filter_pools(markets)
 
         assert len(filtered) == 3
         assert all(m.name in ["ETH-USDC", "BTC-USDC", "ARB-USDC"] for m in filtered)
 
-    def test_filter_pools_blacklist(self, config, sample_markets):
+    def test_filter_pools_blacklist(self, config, sample_markets, monkeypatch):
         """测试黑名单过滤"""
-        config.pools.whitelist = []  # 清空白名单
-        config.pools.blacklist = ["ARB-USDC"]
+        monkeypatch.setattr(config.pools, "whitelist", [])  # 清空白名单
+        monkeypatch.setattr(config.pools, "blacklist", ["ARB-USDC"])
 
         strategy = BalancedStrategy(config)
         filtered = strategy.filter_pools(sample_markets)
 
         assert "ARB-USDC" not in [m.name for m in filtered]
 
-    def test_generate_signals_new_investment(
-        self, strategy, sample_markets, sample_stats
-    ):
+    def test_filter_pools_cached(self, strategy, sample_markets):
+        """测试同一市场列表复用过滤结果"""
+        filtered = strategy.filter_pools(sample_markets)
+
+        assert strategy.filter_pools(sample_markets) is filtered
+        assert strategy.filter_pools(sample_markets[:1]) == sample_markets[:1]
+
+    def test_generate_signals_new_investment(self, strategy, sample_markets, sample_stats):
         """测试生成信号 - 新投资"""
         positions = []  # 无持仓
         available_capital = 1000.0
@@ -161,19 +219,41 @@ class TestBalancedStrategy:
         )
 
         # 应该生成存款信号
-        deposit_signals = [s for s in signals if s.action == "deposit"]
-        assert len(deposit_signals) > 0
+        assert any(s.action == "deposit" for s in signals)
 
         # 总存款不超过可用资金
-        total_deposit = sum(s.amount_usd for s in deposit_signals)
-        assert total_deposit <= available_capital
+        assert sum(s.amount_usd for s in signals if s.action == "deposit") <= available_capital
+
+    def test_generate_signals_top_pools(self, config, sample_markets, sample_stats, monkeypatch):
+        """测试只向评分最高的 max_pools 个池子存款"""
+        monkeypatch.setattr(config.strategy, "max_pools", 1)
+        strategy = BalancedStrategy(config)
+        best = max(strategy.score_pools(sample_markets, sample_stats), key=lambda s: s.total_score)
+
+        signals = strategy.generate_signals(sample_markets, sample_stats, [], 1000.0)
+
+        assert [s.market_key for s in signals] == [best.market_key]
+
+    def test_generate_signals_rebalance(self, strategy, sample_markets, sample_stats):
+        """测试生成信号 - 仓位偏离目标分配时减仓"""
+        positions = [
+            Position(market_key="0x001", name="ETH-USDC", value_usd=900.0),
+            Position(market_key="0x002", name="BTC-USDC", value_usd=100.0),
+        ]
+        eth, btc = strategy.score_pools(sample_markets[:2], sample_stats)
+        target_pct = eth.total_score / (eth.total_score + btc.total_score)
+
+        signals = strategy.generate_signals(sample_markets, sample_stats, positions, 0)
+
+        assert [(s.action, s.priority, s.market_key) for s in signals] == [("withdraw", 4, "0x001")]
+        assert signals[0].amount_usd == pytest.approx((0.9 - target_pct) * 1000)
 
     def test_generate_signals_low_apy_exit(
-        self, strategy, sample_markets, sample_stats
+        self, strategy, sample_markets, sample_stats, monkeypatch
     ):
         """测试生成信号 - 低 APY 退出"""
         # 修改 APY 低于阈值
-        sample_stats["0x001"].apy = 5.0
+        monkeypatch.setattr(sample_stats["0x001"], "apy", 5.0)
 
         positions = [
             Position(
@@ -186,86 +266,112 @@ class TestBalancedStrategy:
         signals = strategy.generate_signals(sample_markets, sample_stats, positions, 0)
 
         # 应该生成退出信号
-        withdraw_signals = [s for s in signals if s.action == "withdraw"]
-        assert len(withdraw_signals) > 0
-        assert withdraw_signals[0].market_key == "0x001"
-
-    def test_check_risk_limits_pass(self, strategy):
-        """测试风控检查 - 通过"""
+        first_withdraw = next((s for s in signals if s.action == "withdraw"), None)
+        assert first_withdraw is not None
+        assert first_withdraw.market_key == "0x001"
+
+    def test_cached_signals(self, strategy, sample_markets, sample_stats, monkeypatch):
+        """测试输入未变化时复用上一次的信号，APY 变化后重新生成"""
+        with patch.object(
+            strategy, "generate_signals", wraps=strategy.generate_signals
+        ) as generate:
+            first = strategy.cached_signals(sample_markets, sample_stats, [], 1000.0)
+            second = strategy.cached_signals(sample_markets, sample_stats, [], 1000.0)
+            assert second == first
+            assert generate.call_count == 1
+
+            strategy.cached_signals(sample_markets, sample_stats, [], 500.0)
+            assert generate.call_count == 2
+
+            monkeypatch.setattr(sample_stats["0x001"], "apy", sample_stats["0x001"].apy + 1.0)
+            strategy.cached_signals(sample_markets, sample_stats, [], 500.0)
+            assert generate.call_count == 3
+
+    @pytest.mark.parametrize(
+        "amount_usd, positions, expected",
+        [
+            (1000.0, [], None),  # 通过
+            (  # 现有仓位已接近上限
+                5000.0,
+                [Position(market_key="0x002", name="BTC-USDC", value_usd=6000.0)],
+                "总仓位限制",
+            ),
+            (  # 该池已有仓位
+                2000.0,
+                [Position(market_key="0x001", name="ETH-USDC", value_usd=2000.0)],
+                "单池限制",
+            ),
+            (50.0, [], "最小仓位"),  # 低于 100
+        ],
+        ids=["pass", "exceed_total", "exceed_single", "below_min"],
+    )
+    def test_check_risk_limits(self, strategy, amount_usd, positions, expected):
+        """测试风控检查 - 通过 / 超出总仓位 / 超出单池限制 / 低于最小仓位"""
         signal = Signal(
             action="deposit",
             market_key="0x001",
             market_name="ETH-USDC",
-            amount_usd=1000.0,
+            amount_usd=amount_usd,
             reason="test",
         )
 
-        positions = []  # 无持仓
-
         result = strategy.check_risk_limits(signal, positions)
-        assert result is None  # 通过
+        if expected is None:
+            assert result is None
+        else:
+            assert expected in result
 
-    def test_check_risk_limits_exceed_total(self, strategy):
-        """测试风控检查 - 超出总仓位"""
+    def test_check_risk_limits_precomputed(self, strategy):
+        """测试使用调用方预先计算的持仓索引"""
         signal = Signal(
             action="deposit",
             market_key="0x001",
             market_name="ETH-USDC",
-            amount_usd=5000.0,
+            amount_usd=2000.0,
             reason="test",
         )
 
-        # 现有仓位已接近上限
+        result = strategy.check_risk_limits(
+            signal, [], total_position=2000.0, pos_value_by_key={"0x001": 2000.0}
+        )
+        assert "单池限制" in result
+
+    def test_position_values_cached(self, strategy):
+        """测试同一持仓列表复用持仓索引，新列表重新计算"""
         positions = [
-            Position(market_key="0x002", name="BTC-USDC", value_usd=6000.0)
+            Position(market_key="0x001", name="ETH-USDC", value_usd=2000.0),
+            Position(market_key="0x002", name="BTC-USDC", value_usd=500.0),
         ]
 
-        result = strategy.check_risk_limits(signal, positions)
-        assert result is not None
-        assert "总仓位限制" in result
+        values, total = strategy.position_values(positions)
+        assert values == {"0x001": 2000.0, "0x002": 500.0}
+        assert total == 2500.0
+        assert strategy.position_values(positions)[0] is values
 
-    def test_check_risk_limits_exceed_single(self, strategy):
-        """测试风控检查 - 超出单池限制"""
-        signal = Signal(
-            action="deposit",
-            market_key="0x001",
-            market_name="ETH-USDC",
-            amount_usd=2000.0,
-            reason="test",
-        )
+        assert strategy.position_values(positions[:1]) == ({"0x001": 2000.0}, 2000.0)
 
-        # 该池已有仓位
-        positions = [
-            Position(market_key="0x001", name="ETH-USDC", value_usd=2000.0)
-        ]
+    def test_base_scoring_defaults(self, config, sample_markets, sample_stats):
+        """测试只实现抽象方法的子类使用基类的评分参数和权重"""
 
-        result = strategy.check_risk_limits(signal, positions)
-        assert result is not None
-        assert "单池限制" in result
+        class MinimalStrategy(BaseStrategy):
+            def score_pool(self, market, stats):
+                return self.score_pools([market], {market.market_key: stats})[0]
 
-    def test_check_risk_limits_below_min(self, strategy):
-        """测试风控检查 - 低于最小仓位"""
-        signal = Signal(
-            action="deposit",
-            market_key="0x001",
-            market_name="ETH-USDC",
-            amount_usd=50.0,  # 低于 100
-            reason="test",
-        )
+            def generate_signals(self, markets, stats, positions, available_capital):
+                return []
 
-        positions = []
+        scores = MinimalStrategy(config).score_pools(sample_markets, sample_stats)
 
-        result = strategy.check_risk_limits(signal, positions)
-        assert result is not None
-        assert "最小仓位" in result
+        assert len(scores) == len(sample_markets)
+        assert all(0 <= s.total_score <= 100 for s in scores)
 
 
 class TestHighYieldStrategy:
     """高收益策略测试"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def config(self):
-        """创建测试配置"""
+        """创建测试配置 (本类共用，只读)"""
         config = Config()
         config.strategy.type = "high_yield"
         config.strategy.min_apy = 10.0
@@ -333,11 +439,9 @@ class TestHighYieldStrategy:
 
         signals = strategy.generate_signals(markets, stats, positions, available_capital)
 
-        deposit_signals = [s for s in signals if s.action == "deposit"]
-        assert len(deposit_signals) > 0
-
         # 应该优先投入高 APY 池
-        top_signal = deposit_signals[0]
+        top_signal = next((s for s in signals if s.action == "deposit"), None)
+        assert top_signal is not None
         assert top_signal.market_name == "ARB-USDC"
 
     def test_generate_signals_switch_pools(self, strategy):
@@ -373,8 +477,107 @@ class TestHighYieldStrategy:
         signals = strategy.generate_signals(markets, stats, positions, 0)
 
         # 应该有退出当前池和进入新池的信号
-        withdraw_signals = [s for s in signals if s.action == "withdraw"]
-        deposit_signals = [s for s in signals if s.action == "deposit"]
+        assert any(s.action == "withdraw" for s in signals)
+        assert any(s.action == "deposit" for s in signals)
+
+
+class TestScoreKernel:
+    """评分内核测试"""
+
+    def test_jit_matches_numpy(self):
+        """测试 numba 单循环实现与 NumPy 实现结果逐位一致"""
+        pytest.importorskip("numba")
+        import numpy as np
+
+        from gmx_mm.strategy import _kernels
+
+        args = (
+            np.array([5.0, 30.0, 80.0]),
+            np.array([1e6, 5e7, 9e7]),
+            np.array([0.0, 0.2, 0.9]),
+            np.array([5.0, 6.5, 9.0]),
+            30.0,
+            100.0,
+            5e7,
+        )
+
+        np.testing.assert_array_equal(
+            _kernels._score_components_jit(*args), _kernels._score_components_numpy(*args)
+        )
+
+
+class TestStrategyEngine:
+    """策略引擎测试"""
+
+    @pytest.fixture
+    def fetcher(self):
+        """计数的模拟数据获取器"""
+        fetcher = MagicMock()
+        fetcher.get_markets.return_value = [
+            Market(
+                market_key="0x001",
+                index_token="0xeth",
+                long_token="0xeth",
+                short_token="0xusdc",
+                name="ETH-USDC",
+                pool_tvl=50_000_000,
+            )
+        ]
+        fetcher.get_pool_stats.return_value = PoolStats(
+            market_key="0x001", name="ETH-USDC", apy=20.0
+        )
+        del fetcher.get_pool_stats_multicall
+        return fetcher
+
+    def test_run_and_rankings_share_fetch(self, fetcher):
+        """测试 run 和 get_pool_rankings 共用缓存数据，refresh 后重新获取"""
+        engine = StrategyEngine(Config(), fetcher)
+
+        engine.run(available_capital=1000.0)
+        rankings = engine.get_pool_rankings()
+
+        assert [r["market_key"] for r in rankings] == ["0x001"]
+        assert fetcher.get_markets.call_count == 1
+        assert fetcher.get_pool_stats.call_count == 1
+
+        engine.refresh()
+        engine.get_pool_rankings()
+        assert fetcher.get_markets.call_count == 2
+
+    def test_status_last_run(self, fetcher):
+        """测试 last_run 记录为 epoch 秒，状态中输出不带时区后缀的 UTC ISO 时间"""
+        engine = StrategyEngine(Config(), fetcher)
+        assert engine.get_status()["last_run"] is None
+
+        engine.run()
+
+        assert isinstance(engine.last_run, float)
+        last_run = datetime.fromisoformat(engine.get_status()["last_run"])
+        assert last_run.tzinfo is None
+        assert last_run == datetime.fromtimestamp(engine.last_run, tz=timezone.utc).replace(
+            tzinfo=None
+        )
+
+    def test_strategy_registry(self, fetcher, monkeypatch):
+        """测试按注册表加载策略，未知类型报错"""
+        config = Config()
+        config.strategy.type = "custom"
+
+        with pytest.raises(ValueError):
+            StrategyEngine(config, fetcher)
+
+        monkeypatch.setitem(STRATEGIES, "custom", HighYieldStrategy)
+        assert isinstance(StrategyEngine(config, fetcher).strategy, HighYieldStrategy)
+
+    def test_signals_history_bounded(self, fetcher):
+        """测试信号记录定长"""
+        config = Config()
+        config.execution.history_size = 2
+        engine = StrategyEngine(config, fetcher)
+
+        for _ in range(3):
+            engine.run(available_capital=1000.0)
+            engine.refresh()
 
-        assert len(withdraw_signals) > 0
-        assert len(deposit_signals) > 0
+        assert len(engine.signals_history) == 2
+        assert engine.get_status()["signals_count"] == 2
@@ -0,0 +1,290 @@
+"""Web 应用测试 (白盒测试)"""
+
+import asyncio
+import re
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from gmx_mm.config import Config
+from gmx_mm.data.models import Market, PoolStats, Position
+from gmx_mm.web.app import MAX_POOLS, EventBroadcaster, _isoformat, create_app
+
+MARKET = Market(
+    market_key="0x1",
+    index_token="0xeth",
+    long_token="0xeth",
+    short_token="0xusdc",
+    name="ETH-USDC",
+)
+
+
+@pytest.fixture
+def fetcher():
+    """模拟数据获取器"""
+    fetcher = MagicMock()
+    fetcher.get_markets.return_value = [MARKET]
+    fetcher.get_pool_stats.return_value = PoolStats(market_key="0x1", name="ETH-USDC", apy=20.0)
+    fetcher.get_positions.return_value = [Position(market_key="0x1", name="ETH-USDC")]
+    del fetcher.get_pool_stats_multicall
+    return fetcher
+
+
+def _make_client(fetcher) -> TestClient:
+    """创建使用模拟获取器的测试客户端"""
+    config = Config()
+    config.wallet.address = "0xwallet"
+    with patch("gmx_mm.web.app.GMXDataFetcher", return_value=fetcher):
+        app = create_app(config)
+    return TestClient(app)
+
+
+@pytest.fixture
+def client(fetcher):
+    """测试客户端 (逐个获取池子统计)"""
+    return _make_client(fetcher)
+
+
+@pytest.fixture
+def multicall_client():
+    """测试客户端 (支持批量获取池子统计)"""
+    fetcher = MagicMock()
+    return _make_client(fetcher), fetcher
+
+
+class TestResponseCache:
+    """接口响应缓存测试"""
+
+    def test_pools_cached(self, client, fetcher):
+        """测试 TTL 内重复请求池子列表不再请求 RPC"""
+        first = client.get("/api/pools")
+        second = client.get("/api/pools")
+
+        assert first.json()["data"][0]["apy"] == 20.0
+        assert second.content == first.content
+        assert fetcher.get_markets.call_count == 1
+
+    def test_etag_not_modified(self, client, fetcher):
+        """测试内容未变化时返回 304，ETag 在 TTL 内只计算一次"""
+        first = client.get("/api/alerts")
+        etag = first.headers["etag"]
+
+        second = client.get("/api/alerts", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+        stale = client.get("/api/alerts", headers={"If-None-Match": '"stale"'})
+        assert stale.status_code == 200
+        assert stale.content == first.content
+
+    def test_failure_not_cached(self, client, fetcher):
+        """测试失败的响应不缓存"""
+        fetcher.get_markets.side_effect = [ConnectionError("down"), [MARKET]]
+
+        assert client.get("/api/pools").json()["success"] is False
+        assert client.get("/api/pools").json()["success"] is True
+
+    def test_positions_not_cached(self, client, fetcher):
+        """测试与钱包相关的持仓接口不缓存"""
+        client.get("/api/positions")
+        client.get("/api/positions")
+
+        assert fetcher.get_positions.call_count == 2
+
+
+class TestPositions:
+    """持仓接口测试"""
+
+    def test_no_wallet(self, fetcher):
+        """测试未配置钱包时直接返回空列表，不请求 RPC"""
+        with patch("gmx_mm.web.app.GMXDataFetcher", return_value=fetcher):
+            client = TestClient(create_app(Config()))
+
+        assert client.get("/api/positions").json() == {"success": True, "data": []}
+        fetcher.get_positions.assert_not_called()
+
+
+class TestStatus:
+    """系统状态接口测试"""
+
+    def test_status_timestamp(self, client):
+        """测试状态时间戳序列化为不带时区后缀的 ISO 8601 UTC 时间 (与原接口一致)"""
+        data = client.get("/api/status").json()["data"]
+
+        timestamp = datetime.fromisoformat(data["timestamp"])
+        assert timestamp.tzinfo is None
+        assert abs(datetime.now(timezone.utc).replace(tzinfo=None) - timestamp).total_seconds() < 60
+        assert data["positions_count"] == 1
+
+    def test_alert_timestamp_format(self):
+        """测试告警时间戳输出不带时区后缀的 UTC 时间 (与原接口一致)"""
+        assert _isoformat(0.0) == "1970-01-01T00:00:00"
+
+
+class TestPools:
+    """池子列表接口测试"""
+
+    def test_pools_batch_stats(self, multicall_client):
+        """测试池子统计通过一次批量查询获取，最多返回 MAX_POOLS 个池子"""
+        client, fetcher = multicall_client
+        markets = [
+            Market(
+                market_key=f"0x{i}",
+                index_token="0xeth",
+                long_token="0xeth",
+                short_token="0xusdc",
+                name=f"POOL-{i}",
+            )
+            for i in range(MAX_POOLS + 5)
+        ]
+        fetcher.get_markets.return_value = markets
+        fetcher.get_pool_stats_multicall.side_effect = lambda keys: {
+            key: PoolStats(market_key=key, name=key, apy=10.0) for key in keys[:-1]
+        }
+
+        data = client.get("/api/pools").json()["data"]
+
+        assert len(data) == MAX_POOLS
+        assert [p["apy"] for p in data[-2:]] == [10.0, 0]
+        fetcher.get_pool_stats_multicall.assert_called_once()
+        fetcher.get_pool_stats.assert_not_called()
+
+
+class TestDashboard:
+    """仪表盘页面测试"""
+
+    def test_etag(self, client):
+        """测试返回 ETag，内容未变化时返回 304"""
+        first = client.get("/")
+        etag = first.headers["etag"]
+
+        assert first.status_code == 200
+        assert first.headers["content-type"].startswith("text/html")
+        assert "<!DOCTYPE html>" in first.text
+
+        second = client.get("/", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+
+    def test_boot_data_inlined(self, client, fetcher):
+        """测试首屏数据内嵌到页面，并与接口共用响应缓存"""
+        page = client.get("/").text
+
+        assert "window.__BOOT = {" in page
+        assert '"name":"ETH-USDC"' in page
+        assert "__BOOT__" not in page
+
+        client.get("/api/pools")
+        assert fetcher.get_markets.call_count == 1
+
+    def test_static_assets(self, client):
+        """测试 CSS/JS 以带内容哈希的 URL 提供，可永久缓存"""
+        page = client.get("/").text
+        urls = re.findall(r"(/static/dashboard\.[0-9a-f]{12}\.(?:css|js))", page)
+        assert len(urls) == 2
+
+        for url in urls:
+            asset = client.get(url)
+            assert asset.status_code == 200
+            assert "immutable" in asset.headers["cache-control"]
+
+        assert "renderPools" in client.get(urls[1]).text
+        assert client.get("/static/dashboard.css").status_code == 404
+
+    def test_gzip(self, client):
+        """测试支持 gzip 的客户端收到压缩的页面"""
+        plain = client.get("/", headers={"Accept-Encoding": "identity"})
+        compressed = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in plain.headers
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.text == plain.text
+        assert int(compressed.headers["content-length"]) < len(plain.content)
+
+
+class TestDependencies:
+    """依赖注入测试"""
+
+    def test_components_on_app_state(self, fetcher):
+        """测试组件保存在 app.state，可按应用替换"""
+        config = Config()
+        with patch("gmx_mm.web.app.GMXDataFetcher", return_value=fetcher):
+            app = create_app(config)
+
+        assert app.state.config is config
+        assert app.state.fetcher.fetcher is fetcher
+        assert app.state.engine is not None and app.state.risk_manager is not None
+
+        app.state.risk_manager = None
+        assert TestClient(app).get("/api/alerts").json() == {"success": True, "data": []}
+
+
+class TestPoolsSnapshot:
+    """池子快照后台刷新测试"""
+
+    def test_healthz(self, fetcher):
+        """测试启动后后台刷新池子快照，请求直接读取快照"""
+        with patch("gmx_mm.web.app.GMXDataFetcher", return_value=fetcher):
+            app = create_app(Config())
+
+        assert TestClient(app).get("/healthz").status_code == 503
+
+        with TestClient(app) as client:
+            for _ in range(100):  # 等待第一次后台刷新完成
+                health = client.get("/healthz")
+                if health.status_code == 200:
+                    break
+                time.sleep(0.01)
+            assert health.status_code == 200
+            assert health.json()["pools_age"] >= 0
+
+            calls = fetcher.get_markets.call_count
+            assert client.get("/api/pools").json()["data"][0]["name"] == "ETH-USDC"
+            assert fetcher.get_markets.call_count == calls
+
+
+class TestEventBroadcaster:
+    """SSE 事件广播测试"""
+
+    @pytest.mark.asyncio
+    async def test_publish(self):
+        """测试推送给所有订阅者，内容未变化时不重复推送，新订阅者收到最新事件"""
+        broadcaster = EventBroadcaster()
+        first = broadcaster.subscribe()
+
+        broadcaster.publish("pools", b'{"success":true}')
+        broadcaster.publish("pools", b'{"success":true}')
+        assert first.qsize() == 1
+        assert first.get_nowait() == b'event: pools\ndata: {"success":true}\n\n'
+
+        second = broadcaster.subscribe()
+        assert second.qsize() == 1
+
+        broadcaster.unsubscribe(first)
+        broadcaster.publish("pools", b'{"success":false}')
+        assert first.empty()
+        assert second.qsize() == 2
+
+    @pytest.mark.asyncio
+    async def test_run_refreshes_only_with_subscribers(self):
+        """测试后台任务只在有订阅者时刷新数据"""
+        calls = []
+
+        async def refresh():
+            calls.append(1)
+            return {"status": b'{"n":1}'}
+
+        broadcaster = EventBroadcaster(interval=0.01)
+        task = asyncio.create_task(broadcaster.run(refresh))
+        await asyncio.sleep(0.03)
+        assert calls == []
+
+        queue = broadcaster.subscribe()
+        message = await asyncio.wait_for(queue.get(), 1)
+        task.cancel()
+
+        assert message.startswith(b"event: status\n")